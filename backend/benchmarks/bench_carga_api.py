@@ -0,0 +1,401 @@
+"""Benchmark de carga das rotas da API e da geração de PDFs.
+
+Cria (ou reutiliza) um banco SQLite com dados sintéticos gerados de forma
+determinística (src/services/dados_sinteticos.py), inicia a aplicação de
+src/main.py sobre ele e executa cada cenário com vários clientes concorrentes,
+pelo test client do Flask ou por HTTP em um servidor WSGI local. A vazão e as
+latências (p50, p95, p99) de cada cenário são gravadas em JSON com o commit e
+os parâmetros da execução; --comparar confronta o resultado com o de uma
+execução anterior e termina com código 1 se algum cenário piorar além da
+tolerância.
+
+O banco gerado fica em benchmarks/dados e é reutilizado enquanto a quantidade
+de registros e a semente forem as mesmas. O cache de PDFs é desativado, para
+que os cenários de PDF meçam a geração.
+
+Uso (a partir do diretório backend):
+    python benchmarks/bench_carga_api.py [--servidores 50000] [--prestacoes 500000]
+        [--clientes 8] [--requisicoes 400] [--modo test-client|wsgi]
+        [--cenarios calcular_totais,cargos,...] [--saida resultados.json]
+        [--comparar resultados_anteriores.json] [--tolerancia 10]
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+from time import perf_counter
+
+DIRETORIO_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRETORIO_BENCHMARKS = os.path.join(DIRETORIO_BACKEND, "benchmarks")
+sys.path.insert(0, DIRETORIO_BACKEND)
+
+# Versão do formato do arquivo de resultados.
+VERSAO_RESULTADOS = 1
+
+# Versão dos dados gerados; incrementar ao mudar o gerador para não reutilizar bancos antigos.
+VERSAO_DADOS = 3
+
+# Prefixos usados na busca de servidores por nome.
+PREFIXOS_BUSCA = ("Ana", "Bruno", "Carla", "Lucas", "Mariana", "Pedro")
+
+
+def _prestacao(rng, limites):
+    return rng.randint(*limites["prestacoes"])
+
+
+# Cenários: nome -> (função que monta o caminho da requisição, é geração de PDF).
+CENARIOS = {
+    "calcular_totais": (lambda rng, limites: f"/api/prestacoes/{_prestacao(rng, limites)}/calcular-totais", False),
+    "prestacao_full": (lambda rng, limites: f"/api/prestacoes/{_prestacao(rng, limites)}/full", False),
+    "prestacoes": (lambda rng, limites: "/api/prestacoes", False),
+    "servidores": (lambda rng, limites: "/api/servidores", False),
+    "servidores_busca": (lambda rng, limites: f"/api/servidores?busca={rng.choice(PREFIXOS_BUSCA)}", False),
+    "cargos": (lambda rng, limites: "/api/cargos", False),
+    "presidentes": (lambda rng, limites: "/api/presidentes", False),
+    "pdf_diaria": (lambda rng, limites: f"/api/prestacoes/{_prestacao(rng, limites)}/pdf/diaria", True),
+    "pdf_passagem": (lambda rng, limites: f"/api/prestacoes/{_prestacao(rng, limites)}/pdf/passagem", True),
+    "pdf_parecer": (lambda rng, limites: f"/api/prestacoes/{_prestacao(rng, limites)}/pdf/parecer", True),
+}
+
+
+def ler_argumentos():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--servidores", type=int, default=50000)
+    parser.add_argument("--prestacoes", type=int, default=500000)
+    parser.add_argument("--semente", type=int, default=1, help="Semente dos dados e da escolha das requisições.")
+    parser.add_argument("--banco", help="Arquivo SQLite (padrão: benchmarks/dados/carga_<servidores>_<prestacoes>_<semente>.db).")
+    parser.add_argument("--clientes", type=int, default=8, help="Clientes concorrentes.")
+    parser.add_argument("--requisicoes", type=int, default=400, help="Requisições por cenário.")
+    parser.add_argument("--requisicoes-pdf", type=int, default=100, help="Requisições por cenário de PDF.")
+    parser.add_argument("--aquecimento", type=int, default=10, help="Requisições descartadas antes de cada cenário.")
+    parser.add_argument("--modo", choices=("test-client", "wsgi"), default="test-client")
+    parser.add_argument("--pdf-workers", type=int, default=2, help="PDF_RENDER_WORKERS (0 = geração síncrona).")
+    parser.add_argument("--cenarios", default=",".join(CENARIOS), help="Cenários separados por vírgula.")
+    parser.add_argument("--saida", help="Arquivo JSON de resultados (padrão: benchmarks/resultados/<data>_<commit>.json).")
+    parser.add_argument("--comparar", help="Resultados de uma execução anterior para comparação.")
+    parser.add_argument("--tolerancia", type=float, default=10.0,
+                        help="Piora aceita, em %%, no p95 e na vazão ao comparar.")
+    args = parser.parse_args()
+
+    args.cenarios = [nome.strip() for nome in args.cenarios.split(",") if nome.strip()]
+    desconhecidos = [nome for nome in args.cenarios if nome not in CENARIOS]
+    if desconhecidos:
+        parser.error(f"cenários desconhecidos: {', '.join(desconhecidos)}")
+    if args.clientes < 1 or args.requisicoes < 1 or args.requisicoes_pdf < 1:
+        parser.error("--clientes, --requisicoes e --requisicoes-pdf devem ser positivos")
+    if args.prestacoes < 1:
+        parser.error("--prestacoes deve ser positivo")
+    if not args.banco:
+        args.banco = os.path.join(
+            DIRETORIO_BENCHMARKS, "dados", f"carga_{args.servidores}_{args.prestacoes}_{args.semente}.db"
+        )
+    return args
+
+
+def _git(*argumentos):
+    """Executa um comando do git no repositório; retorna a saída ou None."""
+    try:
+        return subprocess.run(
+            ("git",) + argumentos, cwd=DIRETORIO_BACKEND, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _descricao_dados(args):
+    return {"versao": VERSAO_DADOS, "servidores": args.servidores, "prestacoes": args.prestacoes, "semente": args.semente}
+
+
+def preparar_banco(args):
+    """Remove o banco se ele não tiver sido gerado com os mesmos parâmetros; retorna se será reutilizado."""
+    descricao = f"{args.banco}.json"
+    try:
+        with open(descricao, encoding="utf-8") as arquivo:
+            if json.load(arquivo) == _descricao_dados(args) and os.path.exists(args.banco):
+                return True
+    except (OSError, ValueError):
+        pass
+    for caminho in (args.banco, f"{args.banco}-wal", f"{args.banco}-shm", descricao):
+        if os.path.exists(caminho):
+            os.remove(caminho)
+    os.makedirs(os.path.dirname(os.path.abspath(args.banco)), exist_ok=True)
+    return False
+
+
+def criar_aplicacao(args):
+    """Importa a aplicação de src/main.py configurada para o banco do benchmark."""
+    os.environ.update({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.abspath(args.banco)}",
+        "PDF_CACHE_DIR": "",
+        "PDF_RENDER_WORKERS": str(args.pdf_workers),
+        "MIGRACOES_AUTOMATICAS": "1",
+        "INSTRUMENTACAO": "0",
+        "CONSULTAS_LENTAS_MS": "0",
+        "CONSULTAS_REPETIDAS_LIMITE": "0",
+    })
+    from src.main import app
+    return app
+
+
+def gerar_banco(app, args):
+    """Grava os dados sintéticos e reconstrói os totais materializados."""
+    from src.extensions import db
+    from src.services.dados_sinteticos import gerar_dados
+    from src.services.totais_materializados import reconstruir_totais
+
+    inicio = perf_counter()
+    with app.app_context():
+        with db.engine.connect() as conexao:
+            contagem = gerar_dados(
+                conexao, args.servidores, args.prestacoes, semente=args.semente, confirmar_blocos=True,
+                ao_progredir=lambda c: print(f"\r  {c.prestacoes}/{args.prestacoes} prestações gravadas", end="")
+            )
+            conexao.commit()
+        print(f"\n  {contagem.total} registros em {perf_counter() - inicio:.1f} s; reconstruindo totais...")
+        for _ in reconstruir_totais():
+            pass
+    with open(f"{args.banco}.json", "w", encoding="utf-8") as arquivo:
+        json.dump(_descricao_dados(args), arquivo)
+    print(f"  Banco pronto em {perf_counter() - inicio:.1f} s.")
+
+
+def contar_registros(app):
+    """Retorna a quantidade de registros de cada tabela e o intervalo de IDs das prestações."""
+    from sqlalchemy import func, select
+    from src.extensions import db
+    from src.models.prestacao_contas import (
+        Servidor, Cargo, Presidente, PrestacaoContas,
+        Adiantamento, DespesaDiaria, DocumentoComprovacao, DespesaPassagem
+    )
+    with app.app_context():
+        contagens = {
+            modelo.__tablename__: db.session.execute(select(func.count()).select_from(modelo)).scalar()
+            for modelo in (Servidor, Cargo, Presidente, PrestacaoContas,
+                           Adiantamento, DespesaDiaria, DocumentoComprovacao, DespesaPassagem)
+        }
+        menor, maior = db.session.execute(select(func.min(PrestacaoContas.id), func.max(PrestacaoContas.id))).one()
+    return contagens, {"prestacoes": (menor, maior)}
+
+
+def cabecalhos_autenticacao(app):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        return {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+
+
+class ClienteTeste:
+    """Cliente pelo test client do Flask (sem rede); um por thread."""
+
+    def __init__(self, app, cabecalhos):
+        self.cliente = app.test_client()
+        self.cabecalhos = cabecalhos
+
+    def get(self, caminho):
+        resposta = self.cliente.get(caminho, headers=self.cabecalhos)
+        return resposta.status_code, resposta.get_data()
+
+    def fechar(self):
+        pass
+
+
+class ClienteHTTP:
+    """Cliente HTTP com conexão persistente ao servidor WSGI local; um por thread."""
+
+    def __init__(self, porta, cabecalhos):
+        self.porta = porta
+        self.cabecalhos = cabecalhos
+        self.conexao = None
+
+    def get(self, caminho):
+        for tentativa in range(2):
+            if self.conexao is None:
+                self.conexao = http.client.HTTPConnection("127.0.0.1", self.porta, timeout=120)
+            try:
+                self.conexao.request("GET", caminho, headers=self.cabecalhos)
+                resposta = self.conexao.getresponse()
+                return resposta.status, resposta.read()
+            except (http.client.HTTPException, ConnectionError):
+                # O servidor pode ter fechado a conexão ociosa; reconecta uma vez.
+                self.fechar()
+                if tentativa:
+                    raise
+
+    def fechar(self):
+        if self.conexao is not None:
+            self.conexao.close()
+            self.conexao = None
+
+
+def percentil(valores_ordenados, p):
+    """Percentil pelo método do posto mais próximo."""
+    indice = max(0, min(len(valores_ordenados) - 1, -(-len(valores_ordenados) * p // 100) - 1))
+    return valores_ordenados[int(indice)]
+
+
+def executar_cenario(nome, novo_cliente, limites, args):
+    """Executa as requisições de um cenário com os clientes concorrentes e resume as medidas."""
+    montar_caminho, pdf = CENARIOS[nome]
+    total = args.requisicoes_pdf if pdf else args.requisicoes
+
+    cliente = novo_cliente()
+    rng = random.Random(f"{args.semente}:{nome}:aquecimento")
+    for _ in range(args.aquecimento):
+        cliente.get(montar_caminho(rng, limites))
+    cliente.fechar()
+
+    def executar_cliente(indice):
+        # Cada cliente tem sua sequência de requisições, determinada pela semente.
+        rng = random.Random(f"{args.semente}:{nome}:{indice}")
+        cliente = novo_cliente()
+        latencias, erros = [], []
+        try:
+            for _ in range(total // args.clientes + (indice < total % args.clientes)):
+                caminho = montar_caminho(rng, limites)
+                inicio = perf_counter()
+                status, corpo = cliente.get(caminho)
+                latencias.append(perf_counter() - inicio)
+                if status != 200:
+                    erros.append(f"{status} {caminho}: {corpo[:200].decode('utf-8', 'replace')}")
+        finally:
+            cliente.fechar()
+        return latencias, erros
+
+    inicio = perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clientes) as executor:
+        resultados = list(executor.map(executar_cliente, range(args.clientes)))
+    duracao = perf_counter() - inicio
+
+    latencias = sorted(latencia for parcial, _ in resultados for latencia in parcial)
+    erros = [erro for _, parcial in resultados for erro in parcial]
+    return {
+        "requisicoes": len(latencias),
+        "erros": len(erros),
+        "exemplo_erro": erros[0] if erros else None,
+        "duracao_s": round(duracao, 4),
+        "vazao_rps": round(len(latencias) / duracao, 2),
+        "latencia_ms": {
+            "media": round(sum(latencias) / len(latencias) * 1000, 3),
+            "p50": round(percentil(latencias, 50) * 1000, 3),
+            "p95": round(percentil(latencias, 95) * 1000, 3),
+            "p99": round(percentil(latencias, 99) * 1000, 3),
+            "max": round(latencias[-1] * 1000, 3),
+        },
+    }
+
+
+def iniciar_servidor_wsgi(app):
+    """Inicia o servidor WSGI do Werkzeug (uma thread por requisição) em uma porta livre."""
+    from werkzeug.serving import make_server
+    # Sem o registro de cada requisição no terminal.
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    servidor = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def comparar(atual, anterior, tolerancia):
+    """Imprime a variação de cada cenário em relação à execução anterior; retorna os que pioraram."""
+    print(f"\nComparação com {anterior.get('commit') or '?'} ({anterior.get('data')}):")
+    for chave in ("parametros", "dados"):
+        if atual[chave] != anterior.get(chave):
+            print(f"  Atenção: {chave} diferentes dos da execução anterior; a comparação pode não ser significativa.")
+    pioraram = []
+    for nome, medidas in atual["cenarios"].items():
+        referencia = anterior.get("cenarios", {}).get(nome)
+        if not referencia:
+            continue
+        variacao_p95 = (medidas["latencia_ms"]["p95"] / referencia["latencia_ms"]["p95"] - 1) * 100
+        variacao_vazao = (medidas["vazao_rps"] / referencia["vazao_rps"] - 1) * 100
+        piorou = variacao_p95 > tolerancia or variacao_vazao < -tolerancia
+        if piorou:
+            pioraram.append(nome)
+        print(f"  {nome:18} p95 {variacao_p95:+7.1f}%  vazão {variacao_vazao:+7.1f}%{'  PIOROU' if piorou else ''}")
+    return pioraram
+
+
+def main():
+    args = ler_argumentos()
+    reutilizado = preparar_banco(args)
+    app = criar_aplicacao(args)
+    if reutilizado:
+        print(f"Reutilizando o banco {args.banco}.")
+    else:
+        print(f"Gerando o banco {args.banco}...")
+        gerar_banco(app, args)
+    contagens, limites = contar_registros(app)
+    cabecalhos = cabecalhos_autenticacao(app)
+
+    servidor = None
+    if args.modo == "wsgi":
+        servidor = iniciar_servidor_wsgi(app)
+        novo_cliente = lambda: ClienteHTTP(servidor.server_port, cabecalhos)
+    else:
+        novo_cliente = lambda: ClienteTeste(app, cabecalhos)
+
+    commit = _git("rev-parse", "--short", "HEAD")
+    resultados = {
+        "versao": VERSAO_RESULTADOS,
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "alteracoes_nao_commitadas": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "sqlite": sqlite3.sqlite_version,
+            "cpus": os.cpu_count(),
+        },
+        "parametros": {
+            "modo": args.modo,
+            "clientes": args.clientes,
+            "requisicoes": args.requisicoes,
+            "requisicoes_pdf": args.requisicoes_pdf,
+            "aquecimento": args.aquecimento,
+            "pdf_workers": args.pdf_workers,
+            "semente": args.semente,
+        },
+        "dados": contagens,
+        "cenarios": {},
+    }
+
+    print(f"{'cenário':18} {'req':>6} {'erros':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    try:
+        for nome in args.cenarios:
+            medidas = executar_cenario(nome, novo_cliente, limites, args)
+            resultados["cenarios"][nome] = medidas
+            latencia = medidas["latencia_ms"]
+            print(f"{nome:18} {medidas['requisicoes']:6} {medidas['erros']:5} {medidas['vazao_rps']:9.1f} "
+                  f"{latencia['p50']:9.2f} {latencia['p95']:9.2f} {latencia['p99']:9.2f}")
+            if medidas["exemplo_erro"]:
+                print(f"  {medidas['exemplo_erro']}", file=sys.stderr)
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+
+    saida = args.saida or os.path.join(
+        DIRETORIO_BENCHMARKS, "resultados",
+        f"{datetime.now():%Y%m%d_%H%M%S}_{commit or 'sem_commit'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {saida}.")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            pioraram = comparar(resultados, json.load(arquivo), args.tolerancia)
+        if pioraram:
+            print(f"Cenários com piora acima de {args.tolerancia:g}%: {', '.join(pioraram)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Micro-benchmark do custo de preparação do PDFGenerator por requisição.
+
+Compara a criação do registro de estilos a cada requisição (comportamento
+anterior, em que PDFGenerator() chamava getSampleStyleSheet() e recriava os
+estilos personalizados) com o uso do registro compartilhado do módulo.
+
+Uso (a partir do diretório backend):
+    python benchmarks/bench_estilos_pdf.py [--repeticoes 2000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.pdf_generator import PDFGenerator, _criar_estilos
+
+
+def medir(funcao, repeticoes):
+    """Retorna o melhor tempo médio, em microssegundos, de uma chamada da função."""
+    tempos = timeit.repeat(funcao, number=repeticoes, repeat=5)
+    return min(tempos) / repeticoes * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=2000)
+    args = parser.parse_args()
+
+    antes = medir(_criar_estilos, args.repeticoes)
+    depois = medir(PDFGenerator, args.repeticoes)
+
+    print(f"Estilos recriados por requisição: {antes:10.2f} µs")
+    print(f"Registro compartilhado:           {depois:10.2f} µs")
+    print(f"Ganho por requisição:             {antes - depois:10.2f} µs ({antes / depois:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
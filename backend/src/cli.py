@@ -0,0 +1,315 @@
+import os
+import sys
+from time import perf_counter
+
+import click
+from flask.cli import with_appcontext
+
+from src.services.carga_lote import ErroValidacao
+from src.services.exportacao_prestacoes import FORMATOS_EXPORTACAO, iterar_prestacoes, serializar
+from src.services.importacao_prestacoes import (
+    FORMATOS_IMPORTACAO, TAMANHO_LOTE_IMPORTACAO,
+    ler_fluxo, importar_prestacoes, ler_checkpoint, gravar_checkpoint
+)
+from src.extensions import db
+from src.services.dados_sinteticos import QUANTIDADE_PRESIDENTES, TAMANHO_BLOCO, Distribuicoes, gerar_dados
+from src.services.migracoes import (
+    ErroMigracao, carregar_migracoes, versao_mais_recente, versoes_aplicadas, migrar,
+    nome_arquivo_migracao, diretorio_migracoes
+)
+from src.services.planos_consulta import criar_dados_exemplo, verificar_planos
+from src.services.totais_materializados import (
+    TAMANHO_BLOCO_RECONSTRUCAO, reconstruir_totais, verificar_totais
+)
+
+
+def registrar_comandos(app):
+    """Registra os comandos de linha de comando da aplicação (flask --app src.main <comando>)."""
+    app.cli.add_command(importar_prestacoes_comando)
+    app.cli.add_command(exportar_prestacoes_comando)
+    app.cli.add_command(reconstruir_totais_comando)
+    app.cli.add_command(verificar_totais_comando)
+    app.cli.add_command(migrar_comando)
+    app.cli.add_command(versao_esquema_comando)
+    app.cli.add_command(criar_migracao_comando)
+    app.cli.add_command(verificar_planos_comando)
+    app.cli.add_command(gerar_dados_sinteticos_comando)
+
+
+def _formato_arquivo(arquivo, formato):
+    """Usa o formato informado ou o deduz pela extensão do arquivo."""
+    if formato:
+        return formato
+    extensao = os.path.splitext(arquivo)[1].lower().lstrip(".")
+    return "ndjson" if extensao in ("ndjson", "jsonl", "json") else "csv"
+
+
+# Comando para importar prestações históricas de um arquivo CSV ou NDJSON.
+@click.command("importar-prestacoes")
+@click.argument("arquivo", type=click.Path(exists=True, dir_okay=False))
+@click.option("--formato", type=click.Choice(FORMATOS_IMPORTACAO), help="Padrão: deduzido pela extensão.")
+@click.option("--checkpoint", help="Arquivo de checkpoint (padrão: ARQUIVO.checkpoint).")
+@click.option("--tamanho-lote", default=TAMANHO_LOTE_IMPORTACAO, show_default=True, help="Prestações por transação.")
+@with_appcontext
+def importar_prestacoes_comando(arquivo, formato, checkpoint, tamanho_lote):
+    """Importa prestações de contas com adiantamentos, despesas, documentos e passagens.
+
+    Após cada bloco gravado, a última linha confirmada é registrada no
+    checkpoint; executar o comando novamente retoma a partir dela.
+    """
+    formato = _formato_arquivo(arquivo, formato)
+    checkpoint = checkpoint or f"{arquivo}.checkpoint"
+    try:
+        retomar_apos = ler_checkpoint(checkpoint, arquivo)
+    except ErroValidacao as e:
+        raise click.ClickException(str(e))
+    if retomar_apos:
+        click.echo(f"Retomando após a linha {retomar_apos}.")
+
+    progresso = {"linha": retomar_apos, "importadas": 0, "erros": 0}
+    with open(arquivo, "rb") as fluxo:
+        registros = ler_fluxo(fluxo, formato, pular_ate=retomar_apos)
+        for progresso in importar_prestacoes(registros, tamanho_lote):
+            for erro in progresso["erros_bloco"]:
+                click.echo(f"Linha {erro['linha']}: {erro['erro']}", err=True)
+            gravar_checkpoint(checkpoint, arquivo, progresso)
+            click.echo(
+                f"Linha {progresso['linha']}: {progresso['importadas']} prestações importadas, "
+                f"{progresso['erros']} com erro."
+            )
+    click.echo(f"Importação concluída: {progresso['importadas']} prestações importadas, {progresso['erros']} com erro.")
+
+
+# Comando para exportar as prestações com seus totais em CSV ou NDJSON.
+@click.command("exportar-prestacoes")
+@click.option("--formato", type=click.Choice(FORMATOS_EXPORTACAO), default="csv", show_default=True)
+@click.option("--saida", default="-", help="Arquivo de saída (padrão: saída padrão).")
+@click.option("--data-inicio", type=click.DateTime(formats=["%Y-%m-%d"]), help="AAAA-MM-DD, inclusiva.")
+@click.option("--data-fim", type=click.DateTime(formats=["%Y-%m-%d"]), help="AAAA-MM-DD, inclusiva.")
+@click.option("--servidor-id", type=int)
+@with_appcontext
+def exportar_prestacoes_comando(formato, saida, data_inicio, data_fim, servidor_id):
+    """Exporta as prestações de contas com os totais calculados, em streaming."""
+    registros = iterar_prestacoes(
+        data_inicio.date() if data_inicio else None,
+        data_fim.date() if data_fim else None,
+        servidor_id
+    )
+    destino = sys.stdout if saida == "-" else open(saida, "w", encoding="utf-8", newline="")
+    try:
+        for bloco in serializar(registros, formato):
+            destino.write(bloco)
+    finally:
+        if destino is not sys.stdout:
+            destino.close()
+
+
+# Comando para recalcular toda a tabela prestacao_totais.
+@click.command("reconstruir-totais")
+@click.option("--tamanho-bloco", default=TAMANHO_BLOCO_RECONSTRUCAO, show_default=True, help="Prestações por transação.")
+@with_appcontext
+def reconstruir_totais_comando(tamanho_bloco):
+    """Recalcula os totais materializados de todas as prestações.
+
+    Use após a criação da tabela ou quando verificar-totais apontar divergências.
+    """
+    processadas = 0
+    for processadas in reconstruir_totais(tamanho_bloco):
+        click.echo(f"{processadas} prestações recalculadas.")
+    click.echo(f"Reconstrução concluída: {processadas} prestações.")
+
+
+# Comando para conferir a tabela prestacao_totais com o cálculo direto.
+@click.command("verificar-totais")
+@click.option("--tamanho-bloco", default=TAMANHO_BLOCO_RECONSTRUCAO, show_default=True, help="Prestações por consulta.")
+@click.option("--limite", default=50, show_default=True, help="Máximo de divergências exibidas.")
+@with_appcontext
+def verificar_totais_comando(tamanho_bloco, limite):
+    """Confere os totais materializados; termina com código 1 se houver divergências."""
+    quantidade = 0
+    for divergencia in verificar_totais(tamanho_bloco):
+        quantidade += 1
+        if quantidade <= limite:
+            campos = f" ({', '.join(divergencia['campos'])})" if divergencia["campos"] else ""
+            click.echo(f"Prestação {divergencia['prestacao_id']}: {divergencia['problema']}{campos}", err=True)
+    if quantidade:
+        raise click.ClickException(f"{quantidade} divergências encontradas; execute reconstruir-totais.")
+    click.echo("Totais materializados consistentes.")
+
+
+# Comando para aplicar as migrações de esquema pendentes.
+@click.command("migrar")
+@click.option("--ate", type=int, help="Versão final (padrão: a mais recente).")
+@with_appcontext
+def migrar_comando(ate):
+    """Aplica, em ordem, as migrações de src/migrations ainda não registradas no banco."""
+    try:
+        aplicadas = migrar(db.engine, ate, ao_aplicar=lambda migracao: click.echo(f"Aplicando {migracao.nome}..."))
+    except ErroMigracao as e:
+        raise click.ClickException(str(e))
+    if aplicadas:
+        click.echo(f"{len(aplicadas)} migrações aplicadas.")
+    else:
+        click.echo("Nenhuma migração pendente.")
+
+
+# Comando para exibir a versão do esquema do banco e as migrações pendentes.
+@click.command("versao-esquema")
+@with_appcontext
+def versao_esquema_comando():
+    """Mostra as migrações aplicadas ao banco e as pendentes."""
+    with db.engine.connect() as conexao:
+        aplicadas = versoes_aplicadas(conexao)
+    for linha in aplicadas:
+        click.echo(f"v{linha.versao:04d}  {linha.aplicada_em:%Y-%m-%d %H:%M:%S}  {linha.descricao}")
+    atual = aplicadas[-1].versao if aplicadas else 0
+    pendentes = [migracao for migracao in carregar_migracoes() if migracao.versao > atual]
+    for migracao in pendentes:
+        click.echo(f"v{migracao.versao:04d}  pendente             {migracao.descricao}")
+    click.echo(f"Versão do banco: {atual}; versão do código: {versao_mais_recente()}.")
+
+
+# Comando para criar o arquivo de uma nova migração.
+@click.command("criar-migracao")
+@click.argument("descricao")
+@click.option("--nao-transacional", is_flag=True, help="Para CREATE INDEX CONCURRENTLY no PostgreSQL.")
+@with_appcontext
+def criar_migracao_comando(descricao, nao_transacional):
+    """Cria em src/migrations o módulo da próxima versão, a partir de um modelo."""
+    caminho = os.path.join(diretorio_migracoes(), nome_arquivo_migracao(descricao))
+    linhas = [
+        f'"""{descricao}."""',
+        "import sqlalchemy as sa",
+        "",
+        "from src.services.migracoes import criar_indice",
+        "",
+        f"VERSAO = {versao_mais_recente() + 1}",
+        f"DESCRICAO = {descricao!r}",
+    ]
+    if nao_transacional:
+        linhas.append("TRANSACIONAL = False")
+    linhas += ["", "", "def aplicar(conexao):", "    raise NotImplementedError", ""]
+    with open(caminho, "x", encoding="utf-8") as arquivo:
+        arquivo.write("\n".join(linhas))
+    click.echo(f"Migração criada: {os.path.relpath(caminho)}")
+
+
+# Comando para conferir os planos de execução das consultas das rotas.
+@click.command("verificar-planos")
+@click.option("--dados-exemplo", is_flag=True,
+              help="Grava registros de exemplo e inclui rotas de escrita (use com um banco de teste).")
+@click.option("--mostrar-consultas", is_flag=True, help="Exibe a quantidade de consultas de cada rota.")
+@with_appcontext
+def verificar_planos_comando(dados_exemplo, mostrar_consultas):
+    """Falha (código 1) se alguma rota ler por inteiro uma tabela volumosa, sem índice.
+
+    Para rodar isolado do banco da aplicação:
+    SQLALCHEMY_DATABASE_URI=sqlite:// flask --app src.main verificar-planos --dados-exemplo
+    """
+    if dados_exemplo:
+        criar_dados_exemplo()
+    regressoes = 0
+    try:
+        for resultado in verificar_planos(incluir_escritas=dados_exemplo):
+            if resultado.status >= 400:
+                raise click.ClickException(f"{resultado.nome}: a rota respondeu {resultado.status}")
+            if mostrar_consultas:
+                click.echo(f"{resultado.nome}: {resultado.consultas} consultas")
+            for detalhe, sql in resultado.varreduras:
+                regressoes += 1
+                click.echo(f"{resultado.nome}: {detalhe}\n    {sql}", err=True)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if regressoes:
+        raise click.ClickException(f"{regressoes} leituras completas de tabela encontradas.")
+    click.echo("Nenhuma leitura completa de tabela volumosa nas consultas das rotas.")
+
+
+def _faixa_passagens(ctx, param, valor):
+    """Converte "N" ou "MIN-MAX" em (mínimo, máximo)."""
+    try:
+        minimo, _, maximo = valor.partition("-")
+        return int(minimo), int(maximo or minimo)
+    except ValueError:
+        raise click.BadParameter("use N ou MIN-MAX, por exemplo 2 ou 1-4")
+
+
+# Comando para gerar dados sintéticos em volume, para testes de carga.
+@click.command("gerar-dados-sinteticos")
+@click.option("--servidores", default=1000, show_default=True, help="Servidores criados (0 usa os existentes).")
+@click.option("--prestacoes", default=10000, show_default=True, help="Prestações criadas, com os registros filhos.")
+@click.option("--semente", default=1, show_default=True, help="Mesma semente e parâmetros geram os mesmos dados.")
+@click.option("--presidentes", default=QUANTIDADE_PRESIDENTES, show_default=True,
+              help="Presidentes criados se a tabela estiver vazia.")
+@click.option("--adiantamento-diaria", default=Distribuicoes.adiantamento_diaria, show_default=True,
+              help="Probabilidade de a prestação ter adiantamento de diária.")
+@click.option("--adiantamento-passagem", default=Distribuicoes.adiantamento_passagem, show_default=True,
+              help="Probabilidade de a prestação ter adiantamento de passagem (e viagens).")
+@click.option("--despesa-diaria", default=Distribuicoes.despesa_diaria, show_default=True,
+              help="Probabilidade de a prestação ter despesa de diária.")
+@click.option("--documentos-media", default=Distribuicoes.documentos_media, show_default=True,
+              help="Média (Poisson) de documentos por prestação.")
+@click.option("--documentos-maximo", default=Distribuicoes.documentos_maximo, show_default=True)
+@click.option("--viagens-media", default=Distribuicoes.viagens_media, show_default=True,
+              help="Média (Poisson) de viagens por prestação com adiantamento de passagem.")
+@click.option("--viagens-maximo", default=Distribuicoes.viagens_maximo, show_default=True)
+@click.option("--passagens-por-viagem", default=f"{Distribuicoes.passagens_minimo}", show_default=True,
+              callback=_faixa_passagens, help="Trechos por viagem: N ou MIN-MAX (metade ida, metade volta).")
+@click.option("--tamanho-bloco", default=TAMANHO_BLOCO, show_default=True, help="Prestações por transação.")
+@click.option("--sem-totais", is_flag=True, help="Não reconstrói os totais materializados ao final.")
+@with_appcontext
+def gerar_dados_sinteticos_comando(servidores, prestacoes, semente, presidentes, adiantamento_diaria,
+                                   adiantamento_passagem, despesa_diaria, documentos_media, documentos_maximo,
+                                   viagens_media, viagens_maximo, passagens_por_viagem, tamanho_bloco, sem_totais):
+    """Grava servidores e prestações sintéticos com adiantamentos, despesas, documentos e passagens.
+
+    Os dados são gerados e gravados em blocos, sem manter o volume todo em
+    memória. Use com um banco de teste:
+    SQLALCHEMY_DATABASE_URI=sqlite:///carga.db flask --app src.main gerar-dados-sinteticos --prestacoes 1000000
+    """
+    try:
+        distribuicoes = Distribuicoes(
+            adiantamento_diaria=adiantamento_diaria,
+            adiantamento_passagem=adiantamento_passagem,
+            despesa_diaria=despesa_diaria,
+            documentos_media=documentos_media,
+            documentos_maximo=documentos_maximo,
+            viagens_media=viagens_media,
+            viagens_maximo=viagens_maximo,
+            passagens_minimo=passagens_por_viagem[0],
+            passagens_maximo=passagens_por_viagem[1],
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if tamanho_bloco < 1:
+        raise click.ClickException("--tamanho-bloco deve ser positivo")
+
+    inicio = perf_counter()
+
+    def exibir_progresso(contagem):
+        decorrido = perf_counter() - inicio
+        click.echo(
+            f"{contagem.servidores} servidores, {contagem.prestacoes} prestações, "
+            f"{contagem.total} registros ({contagem.total / decorrido:,.0f} registros/s)."
+        )
+
+    try:
+        with db.engine.connect() as conexao:
+            contagem = gerar_dados(
+                conexao, servidores, prestacoes, semente=semente, distribuicoes=distribuicoes,
+                presidentes=presidentes, tamanho_bloco=tamanho_bloco, confirmar_blocos=True,
+                ao_progredir=exibir_progresso
+            )
+            conexao.commit()
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    decorrido = perf_counter() - inicio
+    for tabela, quantidade in contagem.como_dict().items():
+        click.echo(f"  {tabela}: {quantidade}")
+    click.echo(f"{contagem.total} registros gerados em {decorrido:.1f} s ({contagem.total / decorrido:,.0f} registros/s).")
+
+    if not sem_totais:
+        processadas = 0
+        for processadas in reconstruir_totais(tamanho_bloco):
+            pass
+        click.echo(f"Totais materializados reconstruídos: {processadas} prestações.")
@@ -0,0 +1,99 @@
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Banco padrão: SQLite em src/database/app.db.
+URI_PADRAO = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+
+# Valores aceitos nos PRAGMAs configuráveis do SQLite.
+MODOS_JOURNAL_SQLITE = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+MODOS_SYNCHRONOUS_SQLITE = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+def _env_int(nome, padrao):
+    return int(os.environ.get(nome, padrao))
+
+
+def _env_bool(nome, padrao):
+    return os.environ.get(nome, str(padrao)).strip().lower() in ("1", "true", "sim", "yes")
+
+
+def uri_banco():
+    """Lê a URI do banco de SQLALCHEMY_DATABASE_URI ou DATABASE_URL (nessa ordem).
+
+    Aceita o prefixo postgres:// usado por alguns provedores, que o SQLAlchemy
+    não reconhece, convertendo-o para postgresql://.
+    """
+    uri = os.environ.get("SQLALCHEMY_DATABASE_URI") or os.environ.get("DATABASE_URL") or URI_PADRAO
+    if uri.startswith("postgres://"):
+        uri = "postgresql://" + uri[len("postgres://"):]
+    return uri
+
+
+def opcoes_engine(uri):
+    """Monta SQLALCHEMY_ENGINE_OPTIONS a partir das variáveis de ambiente.
+
+    Para bancos servidores (PostgreSQL, MySQL...) configura o pool de conexões:
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (segundos), DB_POOL_RECYCLE
+    (segundos) e DB_POOL_PRE_PING. O SQLite usa o pool padrão do SQLAlchemy,
+    com o tempo de espera por bloqueio de SQLITE_BUSY_TIMEOUT_MS.
+    """
+    if make_url(uri).get_backend_name() == "sqlite":
+        return {"connect_args": {"timeout": _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000) / 1000}}
+    return {
+        "pool_size": _env_int("DB_POOL_SIZE", 10),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 20),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+
+def configurar_banco(app):
+    """Define SQLALCHEMY_DATABASE_URI, SQLALCHEMY_ENGINE_OPTIONS e os PRAGMAs do SQLite no app.config."""
+    uri = uri_banco()
+    journal_mode = os.environ.get("SQLITE_JOURNAL_MODE", "WAL").upper()
+    synchronous = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+    if journal_mode not in MODOS_JOURNAL_SQLITE:
+        raise ValueError(f"SQLITE_JOURNAL_MODE deve ser um de: {', '.join(MODOS_JOURNAL_SQLITE)}")
+    if synchronous not in MODOS_SYNCHRONOUS_SQLITE:
+        raise ValueError(f"SQLITE_SYNCHRONOUS deve ser um de: {', '.join(MODOS_SYNCHRONOUS_SQLITE)}")
+
+    app.config["SQLALCHEMY_DATABASE_URI"] = uri
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = opcoes_engine(uri)
+    app.config["SQLITE_JOURNAL_MODE"] = journal_mode
+    app.config["SQLITE_SYNCHRONOUS"] = synchronous
+    app.config["SQLITE_BUSY_TIMEOUT_MS"] = _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+
+
+def ativar_pragmas_sqlite(app, db):
+    """Aplica os PRAGMAs do SQLite a cada nova conexão (após db.init_app).
+
+    O modo WAL permite leituras simultâneas a uma escrita; busy_timeout faz as
+    escritas concorrentes aguardarem o bloqueio em vez de falhar com "database
+    is locked"; synchronous=NORMAL é seguro em WAL e evita um fsync por commit.
+    Bancos em memória mantêm o journal padrão.
+    """
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != "sqlite":
+        return
+
+    em_memoria = engine.url.database in (None, "", ":memory:")
+    journal_mode = app.config.get("SQLITE_JOURNAL_MODE", "WAL")
+    synchronous = app.config.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    if journal_mode not in MODOS_JOURNAL_SQLITE or synchronous not in MODOS_SYNCHRONOUS_SQLITE:
+        raise ValueError("SQLITE_JOURNAL_MODE ou SQLITE_SYNCHRONOUS inválido")
+    busy_timeout = int(app.config.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+    @event.listens_for(engine, "connect")
+    def _aplicar_pragmas(conexao_dbapi, registro_conexao):
+        cursor = conexao_dbapi.cursor()
+        try:
+            cursor.execute(f"PRAGMA busy_timeout = {busy_timeout}")
+            if not em_memoria:
+                cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+            cursor.execute(f"PRAGMA synchronous = {synchronous}")
+        finally:
+            cursor.close()
@@ -12,6 +12,17 @@ from src.routes.user import user_bp
 from src.routes.auth import auth_bp
 from src.routes.prestacao_contas import prestacao_bp
 from src.routes.pdf_routes import pdf_bp
+from src.routes.relatorios import relatorios_bp
+from src.routes.monitoramento import monitoramento_bp
+from src.services.pdf_renderer import renderizador_pdf
+from src.services.pdf_cache import cache_pdf
+from src.services.relatorios import cache_relatorios
+from src.services.dados_referencia import cache_referencia
+from src.services.instrumentacao import instrumentacao
+from src.services.diagnostico_consultas import diagnostico_consultas
+from src.cli import registrar_comandos
+from src.config import configurar_banco, ativar_pragmas_sqlite
+from src.services.migracoes import verificar_esquema
 
 # Inicializa a aplicação Flask e configura a pasta de arquivos estáticos.
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
@@ -24,21 +35,64 @@ app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key-
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
 app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=30)
 
-# Configura a URI do banco de dados SQLAlchemy (SQLite neste caso).
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+# Configura a URI e as opções do banco de dados a partir das variáveis de ambiente
+# (padrão: SQLite em src/database/app.db; ver src/config.py).
+configurar_banco(app)
 # Desabilita o rastreamento de modificações do SQLAlchemy para economizar recursos.
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Configurações da geração de PDFs em pool de processos (0 workers = geração síncrona).
+app.config['PDF_RENDER_WORKERS'] = int(os.environ.get('PDF_RENDER_WORKERS', 2))
+app.config['PDF_RENDER_MAX_PENDENTES'] = int(os.environ.get('PDF_RENDER_MAX_PENDENTES', 16))
+app.config['PDF_RENDER_TIMEOUT'] = float(os.environ.get('PDF_RENDER_TIMEOUT', 60))
+
+# Cache em disco dos PDFs gerados (PDF_CACHE_DIR vazio desativa o cache).
+app.config['PDF_CACHE_DIR'] = os.environ.get('PDF_CACHE_DIR', os.path.join(os.path.dirname(__file__), 'database', 'cache_pdf'))
+app.config['PDF_CACHE_MAX_BYTES'] = int(os.environ.get('PDF_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+# Validade, em segundos, dos relatórios gerenciais em cache (0 desativa o cache).
+app.config['RELATORIOS_CACHE_TTL'] = float(os.environ.get('RELATORIOS_CACHE_TTL', 60))
+
+# Cache dos cadastros de referência (cargos e presidentes), invalidado pelas rotas de escrita.
+app.config['REFERENCIA_CACHE_TTL'] = float(os.environ.get('REFERENCIA_CACHE_TTL', 300))
+
+# Diretórios opcionais (em disco local compartilhado) para que os workers compartilhem esses caches.
+app.config['REFERENCIA_CACHE_DIR'] = os.environ.get('REFERENCIA_CACHE_DIR', '')
+app.config['RELATORIOS_CACHE_DIR'] = os.environ.get('RELATORIOS_CACHE_DIR', '')
+
+# Máximo de entradas de cada cache em memória e, por grupo, em cada diretório compartilhado.
+app.config['REFERENCIA_CACHE_MAX_ENTRADAS'] = int(os.environ.get('REFERENCIA_CACHE_MAX_ENTRADAS', 256))
+app.config['RELATORIOS_CACHE_MAX_ENTRADAS'] = int(os.environ.get('RELATORIOS_CACHE_MAX_ENTRADAS', 256))
+
+# Medição do tempo de cada fase das requisições (cabeçalho Server-Timing e GET /api/metrics).
+app.config['INSTRUMENTACAO'] = os.environ.get('INSTRUMENTACAO', '0').strip().lower() in ('1', 'true', 'sim', 'yes')
+app.config['INSTRUMENTACAO_METRICAS_TOKEN'] = os.environ.get('INSTRUMENTACAO_METRICAS_TOKEN', '')
+
+# Registro no log de consultas lentas (em ms) e de consultas repetidas na mesma requisição (N+1); 0 desativa.
+app.config['CONSULTAS_LENTAS_MS'] = float(os.environ.get('CONSULTAS_LENTAS_MS', 500))
+app.config['CONSULTAS_REPETIDAS_LIMITE'] = int(os.environ.get('CONSULTAS_REPETIDAS_LIMITE', 10))
+
+# Aplica as migrações pendentes na inicialização; por padrão, só no servidor de desenvolvimento
+# (python src/main.py). Com gunicorn ou "flask run", execute antes "flask --app src.main migrar".
+app.config['MIGRACOES_AUTOMATICAS'] = os.environ.get('MIGRACOES_AUTOMATICAS', '1' if __name__ == '__main__' else '0').strip().lower() in ('1', 'true', 'sim', 'yes')
+
 # Inicializa extensões
 db.init_app(app)
+ativar_pragmas_sqlite(app, db)
 bcrypt.init_app(app)
 jwt.init_app(app)
+renderizador_pdf.init_app(app)
+cache_pdf.init_app(app)
+cache_relatorios.init_app(app)
+cache_referencia.init_app(app)
+instrumentacao.init_app(app)
+diagnostico_consultas.init_app(app)
 
 # Configurar CORS para permitir requisições do frontend
 CORS(app, resources={
     r"/api/*": {
         "origins": ["http://localhost:5173", "http://127.0.0.1:5173", "http://localhost:5000", "http://127.0.0.1:5000"],
-        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
         "allow_headers": ["Content-Type", "Authorization"]
     }
 })
@@ -48,17 +102,21 @@ app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(prestacao_bp, url_prefix='/api')
 app.register_blueprint(pdf_bp, url_prefix='/api')
+app.register_blueprint(relatorios_bp, url_prefix='/api')
+app.register_blueprint(monitoramento_bp, url_prefix='/api')
+
+# Registra os comandos de linha de comando (flask --app src.main <comando>).
+registrar_comandos(app)
 
-# Importa todos os modelos para garantir que as tabelas sejam criadas no banco de dados.
+# Importa todos os modelos para registrá-los no SQLAlchemy.
 from src.models.user import User
 from src.models.prestacao_contas import (
     Servidor, Cargo, Presidente, PrestacaoContas, 
-    Adiantamento, DespesaDiaria, DocumentoComprovacao, DespesaPassagem
+    Adiantamento, DespesaDiaria, DocumentoComprovacao, DespesaPassagem, PrestacaoTotais, VersaoDados
 )
 
-# Cria todas as tabelas do banco de dados dentro do contexto da aplicação.
-with app.app_context():
-    db.create_all()
+# Confere a versão do esquema do banco (src/migrations) e aplica as migrações pendentes.
+verificar_esquema(app, db)
 
 # Rota para servir arquivos estáticos e o index.html do frontend.
 @app.route('/', defaults={'path': ''})
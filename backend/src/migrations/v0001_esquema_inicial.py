@@ -0,0 +1,134 @@
+"""Esquema inicial: tabelas e índices existentes antes das migrações versionadas.
+
+As tabelas são declaradas aqui explicitamente (e não importadas dos modelos),
+para que esta migração continue criando o mesmo esquema quando os modelos
+mudarem. Em bancos criados pelo antigo db.create_all() só são criadas as
+tabelas e índices que faltarem.
+"""
+import sqlalchemy as sa
+
+VERSAO = 1
+DESCRICAO = "Esquema inicial"
+
+
+def _tabelas(metadata):
+    sa.Table(
+        "user", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("username", sa.String(80), nullable=False),
+        sa.Column("email", sa.String(120), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("last_login", sa.DateTime),
+        sa.Column("is_active", sa.Boolean),
+        sa.Index("ix_user_username", "username", unique=True),
+        sa.Index("ix_user_email", "email", unique=True),
+    )
+    sa.Table(
+        "servidores", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("nome", sa.String(200), nullable=False),
+        sa.Column("cargo", sa.String(100), nullable=False),
+        sa.Index("ix_servidores_nome", "nome"),
+        sa.Index("ix_servidores_cargo", "cargo"),
+    )
+    sa.Table(
+        "cargos", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("nome_cargo", sa.String(100), nullable=False, unique=True),
+        sa.Column("valor_diaria_dentro_estado", sa.Float, nullable=False),
+        sa.Column("valor_diaria_fora_estado", sa.Float, nullable=False),
+    )
+    sa.Table(
+        "presidentes", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("nome", sa.String(200), nullable=False),
+    )
+    sa.Table(
+        "prestacoes_contas", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("servidor_id", sa.Integer, sa.ForeignKey("servidores.id"), nullable=False),
+        sa.Column("presidente_id", sa.Integer, sa.ForeignKey("presidentes.id"), nullable=False),
+        sa.Column("data_criacao", sa.DateTime),
+        sa.Index("ix_prestacoes_contas_servidor_id", "servidor_id"),
+        sa.Index("ix_prestacoes_contas_presidente_id", "presidente_id"),
+        sa.Index("ix_prestacoes_contas_data_criacao", "data_criacao"),
+    )
+    sa.Table(
+        "adiantamentos", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("prestacao_id", sa.Integer, sa.ForeignKey("prestacoes_contas.id"), nullable=False),
+        sa.Column("tipo", sa.String(20), nullable=False),
+        sa.Column("numero_adiantamento", sa.String(50), nullable=False),
+        sa.Column("numero_empenho", sa.String(50), nullable=False),
+        sa.Column("valor", sa.Float, nullable=False),
+        sa.Column("data_adiantamento", sa.Date, nullable=False),
+        sa.Index("ix_adiantamentos_prestacao_id", "prestacao_id"),
+        sa.Index("ix_adiantamentos_tipo", "tipo"),
+    )
+    sa.Table(
+        "despesas_diarias", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("prestacao_id", sa.Integer, sa.ForeignKey("prestacoes_contas.id"), nullable=False),
+        sa.Column("diarias_dentro_estado", sa.Integer),
+        sa.Column("refeicoes_dentro_estado", sa.Integer),
+        sa.Column("diarias_fora_estado", sa.Integer),
+        sa.Column("refeicoes_fora_estado", sa.Integer),
+        sa.Index("ix_despesas_diarias_prestacao_id", "prestacao_id"),
+    )
+    sa.Table(
+        "documentos_comprovacao", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("prestacao_id", sa.Integer, sa.ForeignKey("prestacoes_contas.id"), nullable=False),
+        sa.Column("tipo_documento", sa.String(50), nullable=False),
+        sa.Column("descricao", sa.Text, nullable=False),
+        sa.Column("data_documento", sa.Date),
+        sa.Column("valor", sa.Float),
+        sa.Index("ix_documentos_comprovacao_prestacao_id", "prestacao_id"),
+        sa.Index("ix_documentos_comprovacao_tipo_documento", "tipo_documento"),
+    )
+    sa.Table(
+        "despesas_passagens", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("prestacao_id", sa.Integer, sa.ForeignKey("prestacoes_contas.id"), nullable=False),
+        sa.Column("bpe", sa.String(50), nullable=False),
+        sa.Column("valor", sa.Float, nullable=False),
+        sa.Column("tipo_viagem", sa.String(10), nullable=False),
+        sa.Index("ix_despesas_passagens_prestacao_id", "prestacao_id"),
+    )
+    valor = lambda nome: sa.Column(nome, sa.Numeric(14, 2), nullable=False, default=0)
+    quantidade = lambda nome: sa.Column(nome, sa.Integer, nullable=False, default=0)
+    sa.Table(
+        "prestacao_totais", metadata,
+        sa.Column("prestacao_id", sa.Integer, sa.ForeignKey("prestacoes_contas.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("cargo_encontrado", sa.Boolean, nullable=False, default=False),
+        sa.Column("possui_despesa", sa.Boolean, nullable=False, default=False),
+        quantidade("diarias_dentro_estado"),
+        quantidade("refeicoes_dentro_estado"),
+        quantidade("diarias_fora_estado"),
+        quantidade("refeicoes_fora_estado"),
+        valor("valor_diaria_dentro_estado"),
+        valor("valor_diaria_fora_estado"),
+        valor("total_diarias"),
+        valor("total_refeicoes"),
+        valor("total_geral"),
+        valor("valor_adiantamento_diaria"),
+        valor("diferenca"),
+        valor("total_passagens"),
+        sa.Column("atualizado_em", sa.DateTime),
+    )
+
+
+def aplicar(conexao):
+    metadata = sa.MetaData()
+    _tabelas(metadata)
+
+    totais_existia = sa.inspect(conexao).has_table("prestacao_totais")
+    metadata.create_all(conexao, checkfirst=True)
+    # Índices de tabelas que já existiam (create_all não os cria nesse caso).
+    for tabela in metadata.sorted_tables:
+        for indice in tabela.indexes:
+            indice.create(conexao, checkfirst=True)
+
+    if not totais_existia and conexao.execute(sa.text("SELECT 1 FROM prestacoes_contas LIMIT 1")).first():
+        print("prestacao_totais foi criada vazia: execute 'flask --app src.main reconstruir-totais'.")
@@ -0,0 +1,26 @@
+"""Índices compostos para as buscas mais frequentes.
+
+- adiantamentos (prestacao_id, tipo): adiantamento de diária ou de passagem de
+  uma prestação (totais, exportação e PDFs);
+- prestacoes_contas (servidor_id, data_criacao, id): listagem e exportação
+  filtradas por servidor, na ordem da paginação, sem ordenação em memória.
+
+Os índices de coluna única em adiantamentos.prestacao_id e
+prestacoes_contas.servidor_id passam a ser prefixos dos novos e são removidos.
+Roda fora de transação para usar CREATE INDEX CONCURRENTLY no PostgreSQL.
+"""
+from src.services.migracoes import criar_indice, remover_indice
+
+VERSAO = 2
+DESCRICAO = "Índices compostos de adiantamentos e prestações"
+TRANSACIONAL = False
+
+
+def aplicar(conexao):
+    criar_indice(conexao, "ix_adiantamentos_prestacao_id_tipo", "adiantamentos", ["prestacao_id", "tipo"])
+    criar_indice(
+        conexao, "ix_prestacoes_contas_servidor_id_data_criacao", "prestacoes_contas",
+        ["servidor_id", "data_criacao", "id"]
+    )
+    remover_indice(conexao, "ix_adiantamentos_prestacao_id", "adiantamentos")
+    remover_indice(conexao, "ix_prestacoes_contas_servidor_id", "prestacoes_contas")
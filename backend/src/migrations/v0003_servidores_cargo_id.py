@@ -0,0 +1,29 @@
+"""Chave estrangeira servidores.cargo_id, preenchida pelo nome do cargo.
+
+Até aqui o servidor era ligado ao cargo comparando servidores.cargo com
+cargos.nome_cargo. A coluna nova recebe o ID do cargo com esse nome; servidores
+cujo nome de cargo não corresponde a nenhum cadastro ficam com cargo_id nulo,
+como antes ficavam sem cargo encontrado, e os totais não mudam.
+"""
+import sqlalchemy as sa
+
+from src.services.migracoes import criar_indice
+
+VERSAO = 3
+DESCRICAO = "Chave estrangeira do cargo do servidor"
+
+
+def aplicar(conexao):
+    colunas = {coluna["name"] for coluna in sa.inspect(conexao).get_columns("servidores")}
+    if "cargo_id" not in colunas:
+        conexao.execute(sa.text("ALTER TABLE servidores ADD COLUMN cargo_id INTEGER REFERENCES cargos (id)"))
+    criar_indice(conexao, "ix_servidores_cargo_id", "servidores", ["cargo_id"])
+
+    conexao.execute(sa.text(
+        "UPDATE servidores SET cargo_id = "
+        "(SELECT cargos.id FROM cargos WHERE cargos.nome_cargo = servidores.cargo) "
+        "WHERE cargo_id IS NULL"
+    ))
+    sem_cargo = conexao.execute(sa.text("SELECT COUNT(*) FROM servidores WHERE cargo_id IS NULL")).scalar()
+    if sem_cargo:
+        print(f"{sem_cargo} servidores sem cargo cadastrado com o mesmo nome (cargo_id nulo).")
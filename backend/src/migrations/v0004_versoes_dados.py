@@ -0,0 +1,20 @@
+"""Tabela versoes_dados, com os contadores usados nos ETags das rotas GET.
+
+A tabela começa vazia: conjuntos sem linha têm versão 0 até a primeira
+alteração, o que não muda nenhuma resposta.
+"""
+import sqlalchemy as sa
+
+VERSAO = 4
+DESCRICAO = "Versões dos dados para requisições condicionais"
+
+
+def aplicar(conexao):
+    metadata = sa.MetaData()
+    tabela = sa.Table(
+        "versoes_dados", metadata,
+        sa.Column("chave", sa.String(100), primary_key=True),
+        sa.Column("versao", sa.Integer, nullable=False),
+        sa.Column("alterado_em", sa.DateTime, nullable=False),
+    )
+    tabela.create(conexao, checkfirst=True)
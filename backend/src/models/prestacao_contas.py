@@ -9,15 +9,21 @@ class Servidor(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     # Nome completo do servidor.
     nome = db.Column(db.String(200), nullable=False, index=True)
-    # Cargo ocupado pelo servidor.
+    # Nome do cargo ocupado pelo servidor (mantido igual a Cargo.nome_cargo quando há cargo_id).
     cargo = db.Column(db.String(100), nullable=False, index=True)
+    # ID do cargo cadastrado; nulo quando o nome não corresponde a nenhum cargo.
+    cargo_id = db.Column(db.Integer, db.ForeignKey('cargos.id'), index=True)
+    
+    # Relacionamento com o modelo Cargo (valores das diárias do servidor).
+    cargo_associado = db.relationship('Cargo', backref='servidores')
     
     # Converte o objeto Servidor em um dicionário.
     def to_dict(self):
         return {
             'id': self.id,
             'nome': self.nome,
-            'cargo': self.cargo
+            'cargo': self.cargo,
+            'cargo_id': self.cargo_id
         }
 
 # Modelo para representar um cargo e seus valores de diária associados.
@@ -61,11 +67,15 @@ class Presidente(db.Model):
 # Modelo para gerenciar as prestações de contas.
 class PrestacaoContas(db.Model):
     __tablename__ = 'prestacoes_contas'
+    # Índice composto para listagens e exportações filtradas por servidor e ordenadas por data.
+    __table_args__ = (
+        db.Index('ix_prestacoes_contas_servidor_id_data_criacao', 'servidor_id', 'data_criacao', 'id'),
+    )
     
     # Identificador único da prestação de contas.
     id = db.Column(db.Integer, primary_key=True)
     # ID do servidor associado à prestação de contas.
-    servidor_id = db.Column(db.Integer, db.ForeignKey('servidores.id'), nullable=False, index=True)
+    servidor_id = db.Column(db.Integer, db.ForeignKey('servidores.id'), nullable=False)
     # ID do presidente associado à prestação de contas.
     presidente_id = db.Column(db.Integer, db.ForeignKey('presidentes.id'), nullable=False, index=True)
     # Data de criação da prestação de contas.
@@ -90,11 +100,15 @@ class PrestacaoContas(db.Model):
 # Modelo para registrar adiantamentos de diárias ou passagens.
 class Adiantamento(db.Model):
     __tablename__ = 'adiantamentos'
+    # Índice composto para a busca do adiantamento de um tipo em uma prestação.
+    __table_args__ = (
+        db.Index('ix_adiantamentos_prestacao_id_tipo', 'prestacao_id', 'tipo'),
+    )
     
     # Identificador único do adiantamento.
     id = db.Column(db.Integer, primary_key=True)
     # ID da prestação de contas à qual este adiantamento pertence.
-    prestacao_id = db.Column(db.Integer, db.ForeignKey('prestacoes_contas.id'), nullable=False, index=True)
+    prestacao_id = db.Column(db.Integer, db.ForeignKey('prestacoes_contas.id'), nullable=False)
     # Tipo de adiantamento: 'diaria' ou 'passagem'.
     tipo = db.Column(db.String(20), nullable=False, index=True)  # 'diaria' ou 'passagem'
     # Número do adiantamento.
@@ -210,3 +224,59 @@ class DespesaPassagem(db.Model):
             'valor': self.valor,
             'tipo_viagem': self.tipo_viagem
         }
+
+# Modelo com os totais de diárias e refeições de cada prestação, mantidos a cada commit.
+# É uma cópia desnormalizada de DespesaDiaria x Cargo x Adiantamento para leituras rápidas.
+class PrestacaoTotais(db.Model):
+    __tablename__ = 'prestacao_totais'
+    
+    # ID da prestação de contas (uma linha por prestação).
+    prestacao_id = db.Column(db.Integer, db.ForeignKey('prestacoes_contas.id', ondelete='CASCADE'), primary_key=True)
+    # Indica se o cargo do servidor foi encontrado.
+    cargo_encontrado = db.Column(db.Boolean, nullable=False, default=False)
+    # Indica se a prestação possui despesa de diária.
+    possui_despesa = db.Column(db.Boolean, nullable=False, default=False)
+    # Quantidades da despesa de diária considerada no cálculo.
+    diarias_dentro_estado = db.Column(db.Integer, nullable=False, default=0)
+    refeicoes_dentro_estado = db.Column(db.Integer, nullable=False, default=0)
+    diarias_fora_estado = db.Column(db.Integer, nullable=False, default=0)
+    refeicoes_fora_estado = db.Column(db.Integer, nullable=False, default=0)
+    # Valores de diária do cargo no momento do cálculo.
+    valor_diaria_dentro_estado = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    valor_diaria_fora_estado = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    # Totais calculados.
+    total_diarias = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    total_refeicoes = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    total_geral = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    valor_adiantamento_diaria = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    diferenca = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    # Soma das despesas de passagens (usada nos relatórios).
+    total_passagens = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    # Data da última atualização dos totais.
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Converte o objeto PrestacaoTotais em um dicionário.
+    def to_dict(self):
+        return {
+            'prestacao_id': self.prestacao_id,
+            'total_diarias': float(self.total_diarias),
+            'total_refeicoes': float(self.total_refeicoes),
+            'total_geral': float(self.total_geral),
+            'valor_adiantamento_diaria': float(self.valor_adiantamento_diaria),
+            'diferenca': float(self.diferenca),
+            'total_passagens': float(self.total_passagens),
+            'atualizado_em': self.atualizado_em.isoformat() if self.atualizado_em else None
+        }
+
+# Modelo com o contador de versão de cada conjunto de dados servido pela API.
+# A chave é o nome de uma tabela, "prestacoes" (qualquer prestação) ou "prestacao:<id>";
+# o contador é incrementado no commit que altera o conjunto (ver src/services/versoes.py).
+class VersaoDados(db.Model):
+    __tablename__ = 'versoes_dados'
+    
+    # Nome do conjunto de dados.
+    chave = db.Column(db.String(100), primary_key=True)
+    # Contador incrementado a cada alteração.
+    versao = db.Column(db.Integer, nullable=False, default=0)
+    # Data da última alteração.
+    alterado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
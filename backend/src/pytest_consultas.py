@@ -0,0 +1,87 @@
+"""Plugin do pytest que falha testes com mais consultas SQL por requisição que o declarado.
+
+Ativação (executando o pytest em backend/):
+
+    pytest -p src.pytest_consultas
+    # ou, no conftest.py: pytest_plugins = ["src.pytest_consultas"]
+
+Uso, com o marcador orcamento_consultas em testes que fazem requisições pelo
+test client do Flask:
+
+    @pytest.mark.orcamento_consultas(3)          # cada requisição do teste
+    def test_servidores(client): ...
+
+    @pytest.mark.orcamento_consultas({
+        "GET /api/servidores": 2,                 # método e rota
+        "/api/prestacoes/<int:prestacao_id>/full": 6,  # rota, qualquer método
+    })
+    def test_tela_prestacao(client): ...
+
+Rotas fora do dicionário não são limitadas. A fixture consultas_requisicoes
+retorna os ResumoRequisicao das requisições do teste, para verificações
+próprias (por exemplo, de consultas repetidas).
+"""
+import pytest
+
+from src.services.diagnostico_consultas import diagnostico_consultas
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "orcamento_consultas(limite): máximo de consultas SQL por requisição; "
+        "um número para todas ou um dicionário {\"MÉTODO rota\" ou \"rota\": máximo}"
+    )
+
+
+def limite_da_requisicao(orcamento, resumo):
+    """Retorna o máximo de consultas declarado para a requisição, ou None se não houver."""
+    if isinstance(orcamento, int):
+        return orcamento
+    if resumo.endpoint in orcamento:
+        return orcamento[resumo.endpoint]
+    return orcamento.get(resumo.rota)
+
+
+def requisicoes_excedentes(orcamento, resumos):
+    """Retorna as mensagens das requisições que passaram do orçamento."""
+    mensagens = []
+    for resumo in resumos:
+        limite = limite_da_requisicao(orcamento, resumo)
+        if limite is not None and resumo.total > limite:
+            repetida, vezes = resumo.repeticoes.most_common(1)[0]
+            mensagens.append(
+                f"{resumo.endpoint}: {resumo.total} consultas (máximo {limite}); "
+                f"mais repetida ({vezes}x): {' '.join(repetida.split())[:200]}"
+            )
+    return mensagens
+
+
+@pytest.fixture
+def consultas_requisicoes():
+    """Lista, preenchida ao final de cada requisição, com o resumo das consultas executadas."""
+    resumos = []
+    diagnostico_consultas.observar(resumos.append)
+    yield resumos
+    diagnostico_consultas.deixar_de_observar(resumos.append)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marcador = item.get_closest_marker("orcamento_consultas")
+    if marcador is None:
+        return (yield)
+    if len(marcador.args) != 1 or not isinstance(marcador.args[0], (int, dict)):
+        raise pytest.UsageError("orcamento_consultas espera um número ou um dicionário {rota: máximo}")
+
+    resumos = []
+    diagnostico_consultas.observar(resumos.append)
+    try:
+        resultado = yield
+    finally:
+        diagnostico_consultas.deixar_de_observar(resumos.append)
+
+    mensagens = requisicoes_excedentes(marcador.args[0], resumos)
+    if mensagens:
+        pytest.fail("Orçamento de consultas excedido:\n" + "\n".join(mensagens), pytrace=False)
+    return resultado
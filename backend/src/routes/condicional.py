@@ -0,0 +1,76 @@
+from functools import wraps
+import hashlib
+import json
+
+from flask import current_app, g, make_response, request
+
+from src.services.versoes import chave_prestacao, obter_versoes
+
+# Incluída no ETag: alterar quando mudar o formato de alguma resposta, para que
+# os clientes não reaproveitem respostas no formato anterior.
+VERSAO_FORMATO = 2
+
+
+def _calcular_etag(versoes):
+    """Calcula o ETag a partir da rota, dos parâmetros e das versões dos dados."""
+    conteudo = json.dumps([
+        VERSAO_FORMATO,
+        request.endpoint,
+        sorted(request.args.items(multi=True)),
+        sorted((chave, versao) for chave, (versao, _) in versoes.items()),
+    ])
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()[:32]
+
+
+def _nao_modificado(etag, alterado_em):
+    """Indica se a cópia do cliente (If-None-Match ou If-Modified-Since) ainda vale."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and alterado_em is not None:
+        # O cabeçalho tem precisão de segundos.
+        return alterado_em.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def _definir_cabecalhos(resposta, etag, alterado_em):
+    resposta.set_etag(etag, weak=True)
+    if alterado_em is not None:
+        resposta.last_modified = alterado_em
+    # O navegador pode guardar a resposta, mas deve revalidá-la a cada uso.
+    resposta.cache_control.private = True
+    resposta.cache_control.no_cache = True
+
+
+def condicional(*chaves, prestacao=False):
+    """Responde 304 Not Modified quando os dados da rota não mudaram desde a cópia do cliente.
+
+    chaves são as versões (ver src/services/versoes.py) das quais a resposta
+    depende; com prestacao=True, inclui a versão da prestação do parâmetro
+    prestacao_id da rota. Rotas servidas de caches com validade devem incluir
+    as mesmas versões na chave do cache (versao_atual). A comparação custa uma consulta a versoes_dados e a
+    rota só é executada quando a cópia do cliente está desatualizada. Usar
+    abaixo de @jwt_required(), para que a autenticação seja conferida antes.
+    """
+    def decorador(funcao):
+        @wraps(funcao)
+        def rota(*args, **kwargs):
+            lista = list(chaves)
+            if prestacao:
+                lista.append(chave_prestacao(kwargs["prestacao_id"]))
+            versoes = obter_versoes(lista)
+            # Reaproveitadas pelos caches da rota (versao_atual), para que o corpo corresponda ao ETag.
+            g.versoes_dados = versoes
+            etag = _calcular_etag(versoes)
+            alterado_em = max((data for _, data in versoes.values() if data is not None), default=None)
+
+            if _nao_modificado(etag, alterado_em):
+                resposta = current_app.response_class(status=304)
+                _definir_cabecalhos(resposta, etag, alterado_em)
+                return resposta
+
+            resposta = make_response(funcao(*args, **kwargs))
+            if resposta.status_code == 200:
+                _definir_cabecalhos(resposta, etag, alterado_em)
+            return resposta
+        return rota
+    return decorador
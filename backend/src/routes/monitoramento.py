@@ -0,0 +1,35 @@
+import hmac
+
+from flask import Blueprint, Response, jsonify, request
+from flask_jwt_extended import jwt_required
+
+from src.services.dados_referencia import cache_referencia
+from src.services.instrumentacao import instrumentacao
+from src.services.relatorios import cache_relatorios
+
+# Define o Blueprint para as rotas de monitoramento da aplicação.
+monitoramento_bp = Blueprint("monitoramento", __name__)
+
+# Rota para obter os contadores de acertos, faltas e invalidações dos caches em memória.
+# Os contadores são do processo que atende a requisição.
+@monitoramento_bp.route("/monitoramento/caches", methods=["GET"])
+@jwt_required()
+def get_estatisticas_caches():
+    return jsonify({
+        "referencia": cache_referencia.estatisticas(),
+        "relatorios": cache_relatorios.estatisticas(),
+    })
+
+# Rota para obter as métricas de tempo das requisições no formato de texto do Prometheus.
+# Disponível apenas com INSTRUMENTACAO habilitada; não usa JWT, para que o coletor
+# possa consultá-la, mas exige o token de INSTRUMENTACAO_METRICAS_TOKEN, se definido.
+# As métricas são do processo que atende a requisição.
+@monitoramento_bp.route("/metrics", methods=["GET"])
+def get_metricas():
+    if not instrumentacao.habilitada:
+        return jsonify({"error": "Instrumentação desabilitada"}), 404
+    if instrumentacao.token_metricas:
+        esperado = f"Bearer {instrumentacao.token_metricas}"
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), esperado):
+            return jsonify({"error": "Token inválido"}), 401
+    return Response(instrumentacao.medidas_prometheus(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,136 @@
+from datetime import date, datetime
+import base64
+import json
+
+from flask import jsonify, request
+from src.extensions import db
+
+# Quantidade padrão e máxima de itens por página nas listagens.
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+
+
+def ler_limite(args, padrao=LIMITE_PADRAO, maximo=LIMITE_MAXIMO):
+    """Lê o parâmetro 'limite' da query string, validando o intervalo permitido."""
+    valor = args.get("limite", padrao)
+    try:
+        limite = int(valor)
+    except (TypeError, ValueError):
+        raise ValueError("limite deve ser um número inteiro")
+    if limite < 1 or limite > maximo:
+        raise ValueError(f"limite deve estar entre 1 e {maximo}")
+    return limite
+
+
+def ler_data(valor, nome):
+    """Converte um parâmetro AAAA-MM-DD em date; retorna None se ausente."""
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"{nome} deve estar no formato AAAA-MM-DD")
+
+
+def codificar_cursor(*valores):
+    """Codifica os valores da chave de ordenação do último item em um cursor opaco."""
+    conteudo = json.dumps(list(valores), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(conteudo.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(cursor, quantidade):
+    """Decodifica um cursor gerado por codificar_cursor; retorna None se ausente."""
+    if not cursor:
+        return None
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + preenchimento).decode("utf-8"))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("cursor inválido")
+    if not isinstance(valores, list) or len(valores) != quantidade:
+        raise ValueError("cursor inválido")
+    return valores
+
+
+def pagina(itens, limite, chave_cursor):
+    """Monta a resposta de uma página a partir de até limite+1 itens consultados.
+
+    `chave_cursor` recebe o último item da página e retorna a tupla de valores
+    usada como cursor da próxima página.
+    """
+    proximo_cursor = None
+    if len(itens) > limite:
+        itens = itens[:limite]
+        proximo_cursor = codificar_cursor(*chave_cursor(itens[-1]))
+    return itens, proximo_cursor
+
+
+def _serializar_valor(valor):
+    """Converte datas para o formato ISO, como nos métodos to_dict() dos modelos."""
+    return valor.isoformat() if isinstance(valor, (date, datetime)) else valor
+
+
+def ler_campos(valor, disponiveis, parametro="fields"):
+    """Lê um parâmetro de lista separada por vírgulas ('fields'); retorna None se ausente."""
+    if not valor:
+        return None
+    campos = list(dict.fromkeys(c.strip() for c in valor.split(",") if c.strip()))
+    invalidos = [c for c in campos if c not in disponiveis]
+    if invalidos or not campos:
+        raise ValueError(f"{parametro} aceita apenas: {', '.join(disponiveis)}")
+    return campos
+
+
+def responder_catalogo(modelo, campos_disponiveis, ordem=None, filtros=()):
+    """Responde a listagem de um catálogo com projeção e paginação opcionais.
+
+    Parâmetros lidos da query string:
+    - fields: colunas a retornar; apenas elas são selecionadas no SQL.
+    - limite/cursor: ativam a paginação por cursor (keyset) sobre `ordem`
+      (por padrão, o ID) e a resposta passa a ser {"itens", "proximo_cursor"}.
+    Sem esses parâmetros, a resposta continua sendo a lista completa de
+    registros serializados com to_dict().
+    """
+    args = request.args
+    ordem = list(ordem or [modelo.id])
+    nomes_ordem = [coluna.key for coluna in ordem]
+    paginado = "limite" in args or "cursor" in args
+
+    try:
+        campos = ler_campos(args.get("fields"), campos_disponiveis)
+        limite = ler_limite(args) if paginado else None
+        cursor = decodificar_cursor(args.get("cursor"), len(ordem))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if campos is None:
+        consulta = modelo.query
+    else:
+        selecionados = list(dict.fromkeys(campos + nomes_ordem))
+        consulta = db.session.query(*[getattr(modelo, campo) for campo in selecionados])
+
+    consulta = consulta.filter(*filtros)
+    if cursor:
+        if len(ordem) == 1:
+            consulta = consulta.filter(ordem[0] > cursor[0])
+        else:
+            consulta = consulta.filter(db.tuple_(*ordem) > tuple(cursor))
+    consulta = consulta.order_by(*ordem)
+    if paginado:
+        consulta = consulta.limit(limite + 1)
+
+    linhas = consulta.all()
+    proximo_cursor = None
+    if paginado:
+        linhas, proximo_cursor = pagina(
+            linhas, limite, lambda linha: tuple(getattr(linha, nome) for nome in nomes_ordem)
+        )
+
+    if campos is None:
+        itens = [linha.to_dict() for linha in linhas]
+    else:
+        itens = [{campo: _serializar_valor(getattr(linha, campo)) for campo in campos} for linha in linhas]
+
+    if paginado:
+        return jsonify({"itens": itens, "proximo_cursor": proximo_cursor})
+    return jsonify(itens)
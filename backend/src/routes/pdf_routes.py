@@ -1,149 +1,222 @@
-from flask import Blueprint, request, jsonify, send_file
-from src.extensions import db
-from src.models.prestacao_contas import (
-    PrestacaoContas, Adiantamento, DespesaDiaria, 
-    DocumentoComprovacao, DespesaPassagem, Cargo, Servidor, Presidente
-)
+from flask import Blueprint, request, jsonify, send_file, Response, stream_with_context
 from flask_jwt_extended import jwt_required
 
-from src.services.pdf_generator import PDFGenerator
+from src.services.pdf_generator import TIPOS_PDF
+from src.services.pdf_renderer import renderizador_pdf, FilaRenderizacaoCheia, TempoRenderizacaoEsgotado
+from src.services.pdf_cache import cache_pdf
+from src.services.agregado_prestacao import carregar_agregado, carregar_agregados
+from src.services.totais import totais_de_agregado
+from collections import deque
 from datetime import datetime
+import io
+import zipfile
 
 # Define o Blueprint para as rotas relacionadas à geração de PDF.
 pdf_bp = Blueprint("pdf", __name__)
 
+# Prefixo do nome do arquivo para cada tipo de PDF.
+PREFIXOS_ARQUIVO_PDF = {
+    "diaria": "prestacao_contas_diaria",
+    "passagem": "prestacao_contas_passagem",
+    "parecer": "parecer_tecnico",
+}
+
+# Número máximo de prestações aceitas em uma única requisição de lote.
+LIMITE_LOTE_PDF = 1000
+
 # Rota para gerar PDFs de prestação de contas (diária, passagem ou parecer).
 @pdf_bp.route("/prestacoes/<int:prestacao_id>/pdf/<string:tipo>", methods=["GET"])
 @jwt_required()
 def gerar_pdf(prestacao_id, tipo):
+    if tipo not in TIPOS_PDF:
+        return jsonify({"error": "Tipo de PDF inválido"}), 400
+
     try:
-        # Busca os dados da prestação de contas, incluindo informações do servidor e presidente.
-        prestacao = PrestacaoContas.query.options(db.joinedload(PrestacaoContas.servidor), db.joinedload(PrestacaoContas.presidente)).get_or_404(prestacao_id)
-        
-        # Busca os adiantamentos associados à prestação de contas.
-        adiantamentos = Adiantamento.query.filter_by(prestacao_id=prestacao_id).all()
-        adiantamento_diaria = next((a for a in adiantamentos if a.tipo == "diaria"), None)
-        adiantamento_passagem = next((a for a in adiantamentos if a.tipo == "passagem"), None)
-        
-        # Busca as despesas de diárias.
-        despesa_diaria = DespesaDiaria.query.filter_by(prestacao_id=prestacao_id).first()
-        
-        # Busca os documentos de comprovação.
-        documentos = DocumentoComprovacao.query.filter_by(prestacao_id=prestacao_id).all()
-        
-        # Busca as despesas de passagens.
-        passagens = DespesaPassagem.query.filter_by(prestacao_id=prestacao_id).all()
-        
-        # Busca o cargo do servidor para cálculos de valores.
-        cargo = None
-        if prestacao.servidor and prestacao.servidor.cargo:
-            cargo = Cargo.query.filter_by(nome_cargo=prestacao.servidor.cargo).first()
-        
-        # Calcula os totais da prestação de contas.
-        totais = calcular_totais_prestacao(prestacao_id, cargo, despesa_diaria, adiantamento_diaria)
+        # Busca a prestação de contas e todos os registros associados em poucas consultas.
+        agregado = carregar_agregado(prestacao_id)
+        if agregado is None:
+            return jsonify({"error": "Prestação de contas não encontrada"}), 404
+        prestacao = agregado.prestacao
         
         # Prepara os dados para a geração do PDF, tratando casos onde não há dados.
-        prestacao_data = {
-            "servidor": prestacao.servidor.to_dict() if prestacao.servidor else {},
-            "presidente": prestacao.presidente.to_dict() if prestacao.presidente else {},
-            "adiantamento_diaria": adiantamento_diaria.to_dict() if adiantamento_diaria else None,
-            "adiantamento_passagem": adiantamento_passagem.to_dict() if adiantamento_passagem else None,
-            "despesa_diaria": despesa_diaria.to_dict() if despesa_diaria else {},
-            "documentos": [doc.to_dict() for doc in documentos],
-            "passagens": [passagem.to_dict() for passagem in passagens],
-            "totais": totais,
-            "cargo": cargo.to_dict() if cargo else None
-        }
-        
-        # Instancia o gerador de PDF.
-        pdf_generator = PDFGenerator()
-        
-        # Define o nome base do arquivo PDF.
-        filename_base = prestacao.servidor.nome.replace(" ", "_") if prestacao.servidor else "desconhecido"
-
-        # Gera o PDF com base no tipo solicitado.
-        if tipo == "diaria":
-            pdf_buffer = pdf_generator.gerar_pdf_diaria(prestacao_data)
-            filename = f"prestacao_contas_diaria_{filename_base}.pdf"
-        elif tipo == "passagem":
-            pdf_buffer = pdf_generator.gerar_pdf_passagem(prestacao_data)
-            filename = f"prestacao_contas_passagem_{filename_base}.pdf"
-        elif tipo == "parecer":
-            pdf_buffer = pdf_generator.gerar_pdf_parecer(prestacao_data)
-            filename = f"parecer_tecnico_{filename_base}.pdf"
-        else:
-            return jsonify({"error": "Tipo de PDF inválido"}), 400
+        prestacao_data = montar_dados_pdf(agregado)
+
+        # A chave do cache também é o ETag: se o cliente já possui este PDF, nada é enviado.
+        chave = cache_pdf.chave(prestacao_data, tipo)
+        if chave in request.if_none_match:
+            resposta = Response(status=304)
+            resposta.set_etag(chave)
+            resposta.cache_control.private = True
+            resposta.cache_control.no_cache = True
+            return resposta
+
+        pdf_bytes = cache_pdf.obter(prestacao_id, tipo, chave)
+        if pdf_bytes is None:
+            # Gera o PDF com base no tipo solicitado, fora da thread da requisição.
+            try:
+                pdf_bytes = renderizador_pdf.renderizar(tipo, prestacao_data).getvalue()
+            except FilaRenderizacaoCheia:
+                return jsonify({"error": "Servidor ocupado gerando PDFs, tente novamente em instantes"}), 503
+            except TempoRenderizacaoEsgotado:
+                return jsonify({"error": "Tempo limite excedido na geração do PDF"}), 504
+            cache_pdf.armazenar(prestacao_id, tipo, chave, pdf_bytes)
         
         # Retorna o PDF gerado como anexo.
-        return send_file(
-            pdf_buffer,
+        resposta = send_file(
+            io.BytesIO(pdf_bytes),
             as_attachment=True,
-            download_name=filename,
-            mimetype="application/pdf"
+            download_name=nome_arquivo_pdf(prestacao, tipo),
+            mimetype="application/pdf",
+            etag=chave
         )
+        resposta.cache_control.private = True
+        resposta.cache_control.no_cache = True
+        return resposta
         
     except Exception as e:
         # Em caso de erro, imprime o erro e retorna uma mensagem de erro ao cliente.
         print(f"Erro ao gerar PDF: {str(e)}")
         return jsonify({"error": f"Erro interno do servidor: {str(e)}"}), 500
 
-def calcular_totais_prestacao(prestacao_id, cargo, despesa_diaria, adiantamento_diaria):
-    """Calcula os totais de diárias e refeições para uma prestação de contas."""
-    # Se o cargo ou as despesas de diária não existirem, retorna totais zerados.
-    if not cargo or not despesa_diaria:
-        return {
-            "total_diarias": 0,
-            "total_refeicoes": 0,
-            "total_geral": 0,
-            "valor_adiantamento_diaria": 0,
-            "diferenca": 0,
-            "detalhes": {}
-        }
-    
-    # Realiza o cálculo dos totais de diárias e refeições com base nos dados fornecidos.
-    total_diarias_dentro = despesa_diaria.diarias_dentro_estado * cargo.valor_diaria_dentro_estado
-    total_diarias_fora = despesa_diaria.diarias_fora_estado * cargo.valor_diaria_fora_estado
-    
-    total_refeicoes_dentro = despesa_diaria.refeicoes_dentro_estado * (cargo.valor_diaria_dentro_estado * 0.15)
-    total_refeicoes_fora = despesa_diaria.refeicoes_fora_estado * (cargo.valor_diaria_fora_estado * 0.15)
-    
-    total_diarias = total_diarias_dentro + total_diarias_fora
-    total_refeicoes = total_refeicoes_dentro + total_refeicoes_fora
-    total_geral = total_diarias + total_refeicoes
+# Rota para gerar, em um único arquivo ZIP, os PDFs de várias prestações de contas.
+# Corpo esperado: {"prestacao_ids": [1, 2, ...], "tipos": ["diaria", "passagem", "parecer"]}.
+# O ZIP é enviado em streaming, à medida que cada PDF é gerado; PDFs que falharem
+# ou excederem o tempo limite são listados em erros.txt, no final do arquivo.
+@pdf_bp.route("/prestacoes/pdf/lote", methods=["POST"])
+@jwt_required()
+def gerar_pdf_lote():
+    data = request.get_json(silent=True) or {}
+    prestacao_ids = data.get("prestacao_ids")
+    tipos = data.get("tipos", list(TIPOS_PDF))
+
+    # Validação dos parâmetros da requisição.
+    if not isinstance(prestacao_ids, list) or not prestacao_ids:
+        return jsonify({"error": "prestacao_ids deve ser uma lista não vazia"}), 400
+    if not all(isinstance(i, int) and not isinstance(i, bool) for i in prestacao_ids):
+        return jsonify({"error": "prestacao_ids deve conter apenas números inteiros"}), 400
+    if len(prestacao_ids) > LIMITE_LOTE_PDF:
+        return jsonify({"error": f"Máximo de {LIMITE_LOTE_PDF} prestações por lote"}), 400
+    if not isinstance(tipos, list) or not tipos or any(t not in TIPOS_PDF for t in tipos):
+        return jsonify({"error": f"tipos deve conter apenas: {', '.join(TIPOS_PDF)}"}), 400
+
+    # Remove IDs e tipos repetidos preservando a ordem solicitada.
+    prestacao_ids = list(dict.fromkeys(prestacao_ids))
+    tipos = list(dict.fromkeys(tipos))
+
+    # Carrega todos os dados necessários antes de iniciar o streaming da resposta.
+    dados_lote = carregar_dados_pdf_lote(prestacao_ids)
+    faltantes = [i for i in prestacao_ids if i not in dados_lote]
+    if faltantes:
+        return jsonify({"error": "Prestações não encontradas", "prestacao_ids": faltantes}), 404
+
+    def gerar_zip():
+        # Mantém alguns PDFs sendo gerados em paralelo enquanto os anteriores são enviados.
+        janela = max(renderizador_pdf.workers, 1)
+        pendentes = deque()
+        erros = []
+        saida = _SaidaStreaming()
+
+        def gravar_proximo(arquivo_zip):
+            nome, prestacao_id, tipo, chave, conteudo = pendentes.popleft()
+            if not isinstance(conteudo, bytes):
+                # Com a resposta já iniciada, a falha de um PDF vai para erros.txt e o ZIP continua válido.
+                try:
+                    conteudo = renderizador_pdf.aguardar(conteudo).getvalue()
+                except TempoRenderizacaoEsgotado:
+                    erros.append(f"{nome}: tempo limite excedido na geração do PDF")
+                    return
+                except Exception as e:
+                    print(f"Erro ao gerar PDF do lote ({nome}): {str(e)}")
+                    erros.append(f"{nome}: falha na geração do PDF ({str(e)})")
+                    return
+                cache_pdf.armazenar(prestacao_id, tipo, chave, conteudo)
+            arquivo_zip.writestr(nome, conteudo)
+
+        try:
+            with zipfile.ZipFile(saida, mode="w", compression=zipfile.ZIP_STORED) as arquivo_zip:
+                for prestacao_id in prestacao_ids:
+                    prestacao, prestacao_data = dados_lote[prestacao_id]
+                    for tipo in tipos:
+                        # PDFs em cache são gravados diretamente; os demais são agendados no pool.
+                        chave = cache_pdf.chave(prestacao_data, tipo)
+                        conteudo = cache_pdf.obter(prestacao_id, tipo, chave)
+                        if conteudo is None:
+                            conteudo = renderizador_pdf.submeter(tipo, prestacao_data, bloquear=True)
+                        pendentes.append((f"{prestacao_id}/{nome_arquivo_pdf(prestacao, tipo)}", prestacao_id, tipo, chave, conteudo))
+                        while len(pendentes) >= janela:
+                            gravar_proximo(arquivo_zip)
+                            yield saida.esvaziar()
+                while pendentes:
+                    gravar_proximo(arquivo_zip)
+                    yield saida.esvaziar()
+                if erros:
+                    arquivo_zip.writestr("erros.txt", "\n".join(erros) + "\n")
+            yield saida.esvaziar()
+        finally:
+            # Cliente desconectado ou erro inesperado: descarta os PDFs ainda na fila do pool.
+            for _, _, _, _, conteudo in pendentes:
+                if not isinstance(conteudo, bytes):
+                    conteudo.cancel()
+
+    return Response(
+        stream_with_context(gerar_zip()),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=prestacoes_contas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"}
+    )
+
+class _SaidaStreaming(io.RawIOBase):
+    """Destino de escrita não posicionável que acumula os bytes do ZIP até serem enviados."""
+
+    def __init__(self):
+        self._partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def esvaziar(self):
+        """Retorna e descarta os bytes acumulados desde a última chamada."""
+        dados = b"".join(self._partes)
+        self._partes = []
+        return dados
+
+def nome_arquivo_pdf(prestacao, tipo):
+    """Monta o nome do arquivo PDF a partir do tipo e do nome do servidor."""
+    filename_base = prestacao.servidor.nome.replace(" ", "_") if prestacao.servidor else "desconhecido"
+    return f"{PREFIXOS_ARQUIVO_PDF[tipo]}_{filename_base}.pdf"
+
+def montar_dados_pdf(agregado):
+    """Monta o dicionário de dados consumido pelo gerador de PDF a partir do agregado da prestação."""
+    adiantamento_diaria = agregado.adiantamento_diaria
+    adiantamento_passagem = agregado.adiantamento_passagem
+    despesa_diaria = agregado.despesa_diaria
+    cargo = agregado.cargo
     
-    # Obtém o valor do adiantamento de diária, se existir.
-    valor_adiantamento_diaria = adiantamento_diaria.valor if adiantamento_diaria else 0
-    # Calcula a diferença entre o total geral e o adiantamento.
-    diferenca = total_geral - valor_adiantamento_diaria
+    # Calcula os totais da prestação de contas com os registros já carregados.
+    totais = totais_de_agregado(agregado).como_dict()
     
-    # Retorna um dicionário com os totais calculados e detalhes.
     return {
-        "total_diarias": total_diarias,
-        "total_refeicoes": total_refeicoes,
-        "total_geral": total_geral,
-        "valor_adiantamento_diaria": valor_adiantamento_diaria,
-        "diferenca": diferenca,
-        "detalhes": {
-            "diarias_dentro_estado": {
-                "quantidade": despesa_diaria.diarias_dentro_estado,
-                "valor_unitario": cargo.valor_diaria_dentro_estado,
-                "total": total_diarias_dentro
-            },
-            "diarias_fora_estado": {
-                "quantidade": despesa_diaria.diarias_fora_estado,
-                "valor_unitario": cargo.valor_diaria_fora_estado,
-                "total": total_diarias_fora
-            },
-            "refeicoes_dentro_estado": {
-                "quantidade": despesa_diaria.refeicoes_dentro_estado,
-                "valor_unitario": cargo.valor_diaria_dentro_estado * 0.15,
-                "total": total_refeicoes_dentro
-            },
-            "refeicoes_fora_estado": {
-                "quantidade": despesa_diaria.refeicoes_fora_estado,
-                "valor_unitario": cargo.valor_diaria_fora_estado * 0.15,
-                "total": total_refeicoes_fora
-            }
-        }
+        "servidor": agregado.servidor.to_dict() if agregado.servidor else {},
+        "presidente": agregado.presidente.to_dict() if agregado.presidente else {},
+        "adiantamento_diaria": adiantamento_diaria.to_dict() if adiantamento_diaria else None,
+        "adiantamento_passagem": adiantamento_passagem.to_dict() if adiantamento_passagem else None,
+        "despesa_diaria": despesa_diaria.to_dict() if despesa_diaria else {},
+        "documentos": [doc.to_dict() for doc in agregado.documentos],
+        "passagens": [passagem.to_dict() for passagem in agregado.passagens],
+        "totais": totais,
+        "cargo": cargo.to_dict() if cargo else None
     }
 
+def carregar_dados_pdf_lote(prestacao_ids):
+    """Carrega os dados de PDF de várias prestações com consultas por conjunto.
+
+    Usa um número fixo de consultas para todo o lote, em vez de seis consultas
+    por prestação. Retorna um dicionário {id: (prestacao, prestacao_data)}.
+    """
+    return {
+        prestacao_id: (agregado.prestacao, montar_dados_pdf(agregado))
+        for prestacao_id, agregado in carregar_agregados(prestacao_ids).items()
+    }
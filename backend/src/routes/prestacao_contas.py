@@ -1,43 +1,100 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, abort, Response, stream_with_context
 from src.extensions import db
 from src.models.prestacao_contas import (
     Servidor, Cargo, Presidente, PrestacaoContas, 
     Adiantamento, DespesaDiaria, DocumentoComprovacao, DespesaPassagem
 )
 from flask_jwt_extended import jwt_required
+from src.routes.paginacao import ler_limite, ler_data, ler_campos, decodificar_cursor, pagina, responder_catalogo
+from src.routes.condicional import condicional
+from src.services.totais_materializados import obter_totais_lote, obter_totais_prestacao
+from src.services.versoes import CHAVE_PRESTACOES
+from src.services.agregado_prestacao import FILHOS_PRESTACAO, carregar_agregado
+from src.services.totais import totais_de_agregado
+from src.services.lote_prestacao import ErroOperacao, aplicar_operacoes
+from src.services.carga_lote import (
+    ErroValidacao, ler_registros, carregar_servidores, carregar_cargos, carregar_presidentes
+)
+from src.services.importacao_prestacoes import FORMATOS_IMPORTACAO, ler_fluxo, importar_prestacoes
+from src.services.exportacao_prestacoes import FORMATOS_EXPORTACAO, iterar_prestacoes, serializar
+from src.services.dados_referencia import (
+    listar_cargos, listar_presidentes, invalidar_cargos, invalidar_presidentes
+)
 
-from datetime import datetime
+from datetime import datetime, time, timedelta
+import json
 
 prestacao_bp = Blueprint('prestacao', __name__)
 
+# Campos que podem ser selecionados com o parâmetro fields nas listagens de catálogo.
+CAMPOS_SERVIDOR = ("id", "nome", "cargo", "cargo_id")
+CAMPOS_CARGO = ("id", "nome_cargo", "valor_diaria_dentro_estado", "valor_diaria_fora_estado")
+CAMPOS_PRESIDENTE = ("id", "nome")
+
+# Partes que podem ser selecionadas com o parâmetro include em /prestacoes/<id>/full.
+PARTES_PRESTACAO = FILHOS_PRESTACAO + ("totais",)
+
+# Coleções necessárias para calcular os totais a partir do agregado.
+FILHOS_TOTAIS = ("adiantamentos", "despesas_diarias", "despesas_passagens")
+
+# Número máximo de prestações aceitas no cálculo de totais em lote.
+LIMITE_LOTE_TOTAIS = 5000
+
 # Rotas para Servidores
-# Rota para obter todos os servidores cadastrados.
+# Rota para obter os servidores cadastrados.
+# Aceita fields, limite/cursor (ver responder_catalogo) e busca, que filtra pelo
+# prefixo do nome (sensível a maiúsculas) usando o índice de Servidor.nome.
 @prestacao_bp.route("/servidores", methods=["GET"])
 @jwt_required()
+@condicional("servidores", "cargos")
 def get_servidores():
-    servidores = Servidor.query.all()
-    return jsonify([servidor.to_dict() for servidor in servidores])
+    busca = request.args.get("busca")
+    if busca:
+        # Intervalo [busca, busca + maior caractere) equivale a LIKE 'busca%', mas usa o índice.
+        return responder_catalogo(
+            Servidor, CAMPOS_SERVIDOR,
+            ordem=[Servidor.nome, Servidor.id],
+            filtros=[Servidor.nome >= busca, Servidor.nome < busca + "\U0010ffff"]
+        )
+    return responder_catalogo(Servidor, CAMPOS_SERVIDOR)
 
 # Rota para criar um novo servidor.
+# O cargo pode ser informado pelo ID (cargo_id) ou pelo nome (cargo); pelo nome,
+# o servidor é associado ao cargo cadastrado com esse nome, se houver.
 @prestacao_bp.route("/servidores", methods=["POST"])
 @jwt_required()
 def create_servidor():
     data = request.get_json()
-    servidor = Servidor(
-        nome=data["nome"],
-        cargo=data["cargo"]
-    )
+    if data.get("cargo_id") is not None:
+        cargo = Cargo.query.get_or_404(data["cargo_id"])
+        servidor = Servidor(nome=data["nome"], cargo_associado=cargo)
+    else:
+        servidor = Servidor(
+            nome=data["nome"],
+            cargo=data["cargo"]
+        )
     db.session.add(servidor)
     db.session.commit()
     return jsonify(servidor.to_dict()), 201
 
+# Rota para criar ou atualizar servidores em lote.
+# Aceita um array JSON ou NDJSON (Content-Type: application/x-ndjson); registros com
+# "id" atualizam o servidor existente. Retorna o resultado de cada linha.
+@prestacao_bp.route("/servidores/lote", methods=["POST"])
+@jwt_required()
+def create_servidores_lote():
+    return _responder_carga(carregar_servidores)
+
 # Rotas para Cargos
-# Rota para obter todos os cargos cadastrados.
+# Rota para obter os cargos cadastrados (aceita fields e limite/cursor).
+# A lista completa, sem parâmetros, vem do cache de dados de referência.
 @prestacao_bp.route("/cargos", methods=["GET"])
 @jwt_required()
+@condicional("cargos")
 def get_cargos():
-    cargos = Cargo.query.all()
-    return jsonify([cargo.to_dict() for cargo in cargos])
+    if not request.args:
+        return jsonify(listar_cargos())
+    return responder_catalogo(Cargo, CAMPOS_CARGO)
 
 # Rota para criar um novo cargo.
 @prestacao_bp.route("/cargos", methods=["POST"])
@@ -51,6 +108,7 @@ def create_cargo():
     )
     db.session.add(cargo)
     db.session.commit()
+    invalidar_cargos()
     return jsonify(cargo.to_dict()), 201
 
 # Rota para atualizar um cargo existente.
@@ -65,15 +123,25 @@ def update_cargo(cargo_id):
     cargo.valor_diaria_fora_estado = data.get("valor_diaria_fora_estado", cargo.valor_diaria_fora_estado)
     
     db.session.commit()
+    invalidar_cargos()
     return jsonify(cargo.to_dict())
 
+# Rota para criar ou atualizar cargos em lote (upsert pelo nome_cargo).
+@prestacao_bp.route("/cargos/lote", methods=["POST"])
+@jwt_required()
+def create_cargos_lote():
+    return _responder_carga(carregar_cargos, invalidar_cargos)
+
 # Rotas para Presidentes
-# Rota para obter todos os presidentes cadastrados.
+# Rota para obter os presidentes cadastrados (aceita fields e limite/cursor).
+# A lista completa, sem parâmetros, vem do cache de dados de referência.
 @prestacao_bp.route("/presidentes", methods=["GET"])
 @jwt_required()
+@condicional("presidentes")
 def get_presidentes():
-    presidentes = Presidente.query.all()
-    return jsonify([presidente.to_dict() for presidente in presidentes])
+    if not request.args:
+        return jsonify(listar_presidentes())
+    return responder_catalogo(Presidente, CAMPOS_PRESIDENTE)
 
 # Rota para criar um novo presidente.
 @prestacao_bp.route("/presidentes", methods=["POST"])
@@ -83,8 +151,26 @@ def create_presidente():
     presidente = Presidente(nome=data["nome"])
     db.session.add(presidente)
     db.session.commit()
+    invalidar_presidentes()
     return jsonify(presidente.to_dict()), 201
 
+# Rota para criar ou atualizar presidentes em lote.
+@prestacao_bp.route("/presidentes/lote", methods=["POST"])
+@jwt_required()
+def create_presidentes_lote():
+    return _responder_carga(carregar_presidentes, invalidar_presidentes)
+
+def _responder_carga(carregar, invalidar_cache=None):
+    """Executa uma carga em lote com os registros do corpo da requisição."""
+    try:
+        registros = ler_registros(request)
+    except ErroValidacao as e:
+        return jsonify({"error": str(e)}), 400
+    resumo = carregar(registros)
+    if invalidar_cache:
+        invalidar_cache()
+    return jsonify(resumo)
+
 # Rotas para Prestações de Contas
 # Rota para criar uma nova prestação de contas.
 @prestacao_bp.route("/prestacoes", methods=["POST"])
@@ -99,13 +185,178 @@ def create_prestacao():
     db.session.commit()
     return jsonify(prestacao.to_dict()), 201
 
+# Rota para listar prestações de contas, das mais recentes para as mais antigas.
+# Usa paginação por cursor (keyset) sobre (data_criacao, id), cujo custo não cresce
+# com a profundidade da página como ocorreria com OFFSET.
+# Filtros opcionais: servidor_id, presidente_id, data_inicio e data_fim (AAAA-MM-DD,
+# inclusivas). Com incluir_totais=true, cada item traz os totais calculados.
+@prestacao_bp.route("/prestacoes", methods=["GET"])
+@jwt_required()
+@condicional(CHAVE_PRESTACOES)
+def listar_prestacoes():
+    try:
+        limite = ler_limite(request.args)
+        cursor = decodificar_cursor(request.args.get("cursor"), 2)
+        data_inicio = ler_data(request.args.get("data_inicio"), "data_inicio")
+        data_fim = ler_data(request.args.get("data_fim"), "data_fim")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    consulta = PrestacaoContas.query.options(
+        db.joinedload(PrestacaoContas.servidor), db.joinedload(PrestacaoContas.presidente)
+    )
+
+    servidor_id = request.args.get("servidor_id", type=int)
+    if servidor_id is not None:
+        consulta = consulta.filter(PrestacaoContas.servidor_id == servidor_id)
+    presidente_id = request.args.get("presidente_id", type=int)
+    if presidente_id is not None:
+        consulta = consulta.filter(PrestacaoContas.presidente_id == presidente_id)
+    if data_inicio:
+        consulta = consulta.filter(PrestacaoContas.data_criacao >= datetime.combine(data_inicio, time.min))
+    if data_fim:
+        consulta = consulta.filter(PrestacaoContas.data_criacao < datetime.combine(data_fim + timedelta(days=1), time.min))
+    if cursor:
+        try:
+            cursor_data = datetime.fromisoformat(cursor[0])
+            cursor_id = int(cursor[1])
+        except (TypeError, ValueError):
+            return jsonify({"error": "cursor inválido"}), 400
+        consulta = consulta.filter(
+            db.tuple_(PrestacaoContas.data_criacao, PrestacaoContas.id) < (cursor_data, cursor_id)
+        )
+
+    prestacoes = consulta.order_by(
+        PrestacaoContas.data_criacao.desc(), PrestacaoContas.id.desc()
+    ).limit(limite + 1).all()
+    prestacoes, proximo_cursor = pagina(
+        prestacoes, limite, lambda p: (p.data_criacao.isoformat(), p.id)
+    )
+
+    itens = [prestacao.to_dict() for prestacao in prestacoes]
+    if request.args.get("incluir_totais", "").lower() in ("1", "true", "sim"):
+        totais = obter_totais_lote([prestacao.id for prestacao in prestacoes])
+        for item in itens:
+            item["totais"] = totais[item["id"]].como_dict()
+
+    return jsonify({"itens": itens, "proximo_cursor": proximo_cursor})
+
+# Rota para importar prestações históricas com todos os registros filhos.
+# O corpo (CSV ou NDJSON, ver src/services/importacao_prestacoes.py) é lido em streaming
+# e gravado em blocos; a resposta é um fluxo NDJSON com o progresso de cada bloco.
+# Para retomar uma importação interrompida, reenviar o arquivo com retomar_apos=<linha>
+# igual à última linha confirmada.
+@prestacao_bp.route("/prestacoes/importar", methods=["POST"])
+@jwt_required()
+def importar_prestacoes_historicas():
+    formato = request.args.get("formato", "csv" if request.mimetype == "text/csv" else "ndjson")
+    if formato not in FORMATOS_IMPORTACAO:
+        return jsonify({"error": f"formato deve ser um de: {', '.join(FORMATOS_IMPORTACAO)}"}), 400
+    retomar_apos = request.args.get("retomar_apos", 0, type=int)
+
+    def gerar_progresso():
+        try:
+            for progresso in importar_prestacoes(ler_fluxo(request.stream, formato, pular_ate=retomar_apos)):
+                yield json.dumps(progresso, ensure_ascii=False) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": f"Importação interrompida: {e}"}, ensure_ascii=False) + "\n"
+
+    return Response(stream_with_context(gerar_progresso()), mimetype="application/x-ndjson")
+
+# Rota para exportar as prestações com seus totais em CSV ou NDJSON (streaming).
+# Filtros opcionais: servidor_id, data_inicio e data_fim (AAAA-MM-DD, inclusivas).
+@prestacao_bp.route("/prestacoes/exportar", methods=["GET"])
+@jwt_required()
+def exportar_prestacoes():
+    formato = request.args.get("formato", "csv")
+    if formato not in FORMATOS_EXPORTACAO:
+        return jsonify({"error": f"formato deve ser um de: {', '.join(FORMATOS_EXPORTACAO)}"}), 400
+    try:
+        data_inicio = ler_data(request.args.get("data_inicio"), "data_inicio")
+        data_fim = ler_data(request.args.get("data_fim"), "data_fim")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    registros = iterar_prestacoes(data_inicio, data_fim, request.args.get("servidor_id", type=int))
+    return Response(
+        stream_with_context(serializar(registros, formato)),
+        mimetype="text/csv" if formato == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename=prestacoes_contas.{formato}"}
+    )
+
 # Rota para obter uma prestação de contas específica pelo ID.
 @prestacao_bp.route("/prestacoes/<int:prestacao_id>", methods=["GET"])
 @jwt_required()
+@condicional(prestacao=True)
 def get_prestacao(prestacao_id):
     prestacao = PrestacaoContas.query.get_or_404(prestacao_id)
     return jsonify(prestacao.to_dict())
 
+# Rota para obter uma prestação de contas completa em uma única requisição.
+# Retorna os dados de GET /prestacoes/<id> acrescidos de adiantamentos, despesas_diarias
+# (objeto ou null), documentos, despesas_passagens e totais (formato de calcular-totais;
+# null quando o cargo do servidor não é encontrado). Com include (lista separada por
+# vírgulas), traz apenas as partes informadas. O agregado é carregado com uma consulta
+# para a prestação, o servidor, o cargo e o presidente, mais uma por coleção.
+@prestacao_bp.route("/prestacoes/<int:prestacao_id>/full", methods=["GET"])
+@jwt_required()
+@condicional(prestacao=True)
+def get_prestacao_completa(prestacao_id):
+    try:
+        partes = ler_campos(request.args.get("include"), PARTES_PRESTACAO, "include") or PARTES_PRESTACAO
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    resposta = _prestacao_completa(prestacao_id, partes)
+    if resposta is None:
+        abort(404)
+    return jsonify(resposta)
+
+# Rota para aplicar várias alterações nos registros de uma prestação em uma única transação.
+# Recebe {"operacoes": [{"acao", "recurso", "id", "dados"}, ...]} (ver
+# src/services/lote_prestacao.py) e retorna a prestação completa, como em
+# /prestacoes/<id>/full. Se alguma operação falhar, nada é gravado e o erro
+# informa o índice da operação.
+@prestacao_bp.route("/prestacoes/<int:prestacao_id>/batch", methods=["PATCH"])
+@jwt_required()
+def aplicar_lote_prestacao(prestacao_id):
+    PrestacaoContas.query.get_or_404(prestacao_id)
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "O corpo deve ser um objeto JSON com operacoes"}), 400
+    try:
+        aplicar_operacoes(prestacao_id, data.get("operacoes"))
+    except ErroOperacao as e:
+        return jsonify({"error": str(e), "operacao": e.indice}), 404 if e.nao_encontrado else 400
+    except ErroValidacao as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Erro ao aplicar o lote da prestação {prestacao_id}: {str(e)}")
+        return jsonify({"error": "Falha ao gravar as operações"}), 500
+    return jsonify(_prestacao_completa(prestacao_id, PARTES_PRESTACAO))
+
+def _prestacao_completa(prestacao_id, partes):
+    """Monta a resposta de /prestacoes/<id>/full com as partes informadas (None se não existir)."""
+    filhos = {parte for parte in partes if parte in FILHOS_PRESTACAO}
+    if "totais" in partes:
+        filhos.update(FILHOS_TOTAIS)
+    agregado = carregar_agregado(prestacao_id, tuple(sorted(filhos)))
+    if agregado is None:
+        return None
+
+    resposta = agregado.prestacao.to_dict()
+    if "adiantamentos" in partes:
+        resposta["adiantamentos"] = [adiantamento.to_dict() for adiantamento in agregado.adiantamentos]
+    if "despesas_diarias" in partes:
+        resposta["despesas_diarias"] = agregado.despesa_diaria.to_dict() if agregado.despesa_diaria else None
+    if "documentos" in partes:
+        resposta["documentos"] = [documento.to_dict() for documento in agregado.documentos]
+    if "despesas_passagens" in partes:
+        resposta["despesas_passagens"] = [despesa.to_dict() for despesa in agregado.passagens]
+    if "totais" in partes:
+        resposta["totais"] = _totais_calcular(totais_de_agregado(agregado))
+    return resposta
+
 # Rotas para Adiantamentos
 # Rota para criar um novo adiantamento para uma prestação de contas específica.
 @prestacao_bp.route("/prestacoes/<int:prestacao_id>/adiantamentos", methods=["POST"])
@@ -127,6 +378,7 @@ def create_adiantamento(prestacao_id):
 # Rota para obter todos os adiantamentos de uma prestação de contas específica.
 @prestacao_bp.route("/prestacoes/<int:prestacao_id>/adiantamentos", methods=["GET"])
 @jwt_required()
+@condicional(prestacao=True)
 def get_adiantamentos(prestacao_id):
     adiantamentos = Adiantamento.query.filter_by(prestacao_id=prestacao_id).all()
     return jsonify([adiantamento.to_dict() for adiantamento in adiantamentos])
@@ -151,6 +403,7 @@ def create_despesa_diaria(prestacao_id):
 # Rota para obter as despesas de diária de uma prestação de contas específica.
 @prestacao_bp.route("/prestacoes/<int:prestacao_id>/despesas-diarias", methods=["GET"])
 @jwt_required()
+@condicional(prestacao=True)
 def get_despesa_diaria(prestacao_id):
     despesa = DespesaDiaria.query.filter_by(prestacao_id=prestacao_id).first()
     if despesa:
@@ -198,6 +451,7 @@ def create_documento(prestacao_id):
 # Rota para obter todos os documentos de comprovação de uma prestação de contas específica.
 @prestacao_bp.route("/prestacoes/<int:prestacao_id>/documentos", methods=["GET"])
 @jwt_required()
+@condicional(prestacao=True)
 def get_documentos(prestacao_id):
     documentos = DocumentoComprovacao.query.filter_by(prestacao_id=prestacao_id).all()
     return jsonify([documento.to_dict() for documento in documentos])
@@ -231,6 +485,7 @@ def create_despesa_passagem(prestacao_id):
 # Rota para obter todas as despesas de passagem de uma prestação de contas específica.
 @prestacao_bp.route("/prestacoes/<int:prestacao_id>/despesas-passagens", methods=["GET"])
 @jwt_required()
+@condicional(prestacao=True)
 def get_despesas_passagens(prestacao_id):
     despesas = DespesaPassagem.query.filter_by(prestacao_id=prestacao_id).all()
     return jsonify([despesa.to_dict() for despesa in despesas])
@@ -248,71 +503,56 @@ def delete_despesa_passagem(despesa_id):
 # Rota para calcular os totais de diárias e refeições para uma prestação de contas específica.
 @prestacao_bp.route("/prestacoes/<int:prestacao_id>/calcular-totais", methods=["GET"])
 @jwt_required()
+@condicional(prestacao=True)
 def calcular_totais(prestacao_id):
-    prestacao = PrestacaoContas.query.get_or_404(prestacao_id)
-    servidor = prestacao.servidor
+    resultado = obter_totais_prestacao(prestacao_id)
+    if resultado is None:
+        abort(404)
     
-    # Buscar valores de diária do cargo do servidor.
-    cargo = Cargo.query.filter_by(nome_cargo=servidor.cargo).first()
-    if not cargo:
+    totais = _totais_calcular(resultado)
+    # Sem o cargo do servidor não há valores de diária para o cálculo.
+    if totais is None:
         return jsonify({"error": "Cargo não encontrado"}), 404
+    return jsonify(totais)
+
+def _totais_calcular(resultado):
+    """Converte um ResultadoTotais na resposta de calcular-totais (None se não há cargo)."""
+    if not resultado.entrada.cargo_encontrado:
+        return None
     
-    # Buscar despesas de diárias associadas à prestação de contas.
-    despesa_diaria = DespesaDiaria.query.filter_by(prestacao_id=prestacao_id).first()
-    if not despesa_diaria:
-        return jsonify({
+    # Sem despesas de diárias, os totais são zero e não há detalhes.
+    if not resultado.entrada.possui_despesa:
+        return {
             "total_diarias": 0,
             "total_refeicoes": 0,
             "total_geral": 0,
             "valor_adiantamento_diaria": 0,
             "diferenca": 0
-        })
-    
-    # Calcular totais de diárias e refeições com base nos valores do cargo.
-    total_diarias_dentro = despesa_diaria.diarias_dentro_estado * cargo.valor_diaria_dentro_estado
-    total_diarias_fora = despesa_diaria.diarias_fora_estado * cargo.valor_diaria_fora_estado
-    
-    total_refeicoes_dentro = despesa_diaria.refeicoes_dentro_estado * (cargo.valor_diaria_dentro_estado * 0.15)
-    total_refeicoes_fora = despesa_diaria.refeicoes_fora_estado * (cargo.valor_diaria_fora_estado * 0.15)
-    
-    total_diarias = total_diarias_dentro + total_diarias_fora
-    total_refeicoes = total_refeicoes_dentro + total_refeicoes_fora
-    total_geral = total_diarias + total_refeicoes
-    
-    # Buscar o adiantamento de diária associado à prestação de contas.
-    adiantamento_diaria = Adiantamento.query.filter_by(prestacao_id=prestacao_id, tipo="diaria").first()
-    valor_adiantamento_diaria = adiantamento_diaria.valor if adiantamento_diaria else 0
-    
-    # Calcular a diferença entre o total geral e o valor do adiantamento.
-    diferenca = total_geral - valor_adiantamento_diaria
+        }
     
-    # Retornar os totais calculados e detalhes.
+    return resultado.como_dict()
+
+# Rota para calcular os totais de várias prestações de contas em uma única requisição.
+# Recebe {"prestacao_ids": [...]} e retorna os totais por ID no mesmo formato
+# dos PDFs (zerados, com detalhes vazios, quando falta cargo ou despesa de diária).
+@prestacao_bp.route("/prestacoes/totais", methods=["POST"])
+@jwt_required()
+def calcular_totais_varias():
+    data = request.get_json(silent=True) or {}
+    prestacao_ids = data.get("prestacao_ids")
+
+    # Validação dos parâmetros da requisição.
+    if not isinstance(prestacao_ids, list) or not prestacao_ids:
+        return jsonify({"error": "prestacao_ids deve ser uma lista não vazia"}), 400
+    if not all(isinstance(i, int) and not isinstance(i, bool) for i in prestacao_ids):
+        return jsonify({"error": "prestacao_ids deve conter apenas números inteiros"}), 400
+    if len(prestacao_ids) > LIMITE_LOTE_TOTAIS:
+        return jsonify({"error": f"Máximo de {LIMITE_LOTE_TOTAIS} prestações por lote"}), 400
+
+    # Remove IDs repetidos preservando a ordem solicitada.
+    prestacao_ids = list(dict.fromkeys(prestacao_ids))
+    resultados = obter_totais_lote(prestacao_ids)
     return jsonify({
-        "total_diarias": total_diarias,
-        "total_refeicoes": total_refeicoes,
-        "total_geral": total_geral,
-        "valor_adiantamento_diaria": valor_adiantamento_diaria,
-        "diferenca": diferenca,
-        "detalhes": {
-            "diarias_dentro_estado": {
-                "quantidade": despesa_diaria.diarias_dentro_estado,
-                "valor_unitario": cargo.valor_diaria_dentro_estado,
-                "total": total_diarias_dentro
-            },
-            "diarias_fora_estado": {
-                "quantidade": despesa_diaria.diarias_fora_estado,
-                "valor_unitario": cargo.valor_diaria_fora_estado,
-                "total": total_diarias_fora
-            },
-            "refeicoes_dentro_estado": {
-                "quantidade": despesa_diaria.refeicoes_dentro_estado,
-                "valor_unitario": cargo.valor_diaria_dentro_estado * 0.15,
-                "total": total_refeicoes_dentro
-            },
-            "refeicoes_fora_estado": {
-                "quantidade": despesa_diaria.refeicoes_fora_estado,
-                "valor_unitario": cargo.valor_diaria_fora_estado * 0.15,
-                "total": total_refeicoes_fora
-            }
-        }
+        "totais": {str(i): resultados[i].como_dict() for i in prestacao_ids if i in resultados},
+        "nao_encontradas": [i for i in prestacao_ids if i not in resultados]
     })
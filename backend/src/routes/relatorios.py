@@ -0,0 +1,41 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+
+from src.routes.condicional import condicional
+from src.routes.paginacao import ler_data
+from src.services.relatorios import AGRUPAMENTOS, AGRUPAMENTO_PADRAO, relatorio_gastos
+from src.services.versoes import CHAVE_PRESTACOES
+
+# Define o Blueprint para as rotas de relatórios gerenciais.
+relatorios_bp = Blueprint("relatorios", __name__)
+
+# Rota para obter os gastos com diárias, refeições e passagens agrupados.
+# Parâmetros: agrupar_por (lista separada por vírgulas de ano, mes, cargo e servidor;
+# padrão mes,cargo), data_inicio e data_fim (AAAA-MM-DD, inclusivas), cargo e servidor_id.
+# O resultado é calculado no banco e guardado em cache por alguns segundos.
+@relatorios_bp.route("/relatorios/gastos", methods=["GET"])
+@jwt_required()
+@condicional(CHAVE_PRESTACOES)
+def get_relatorio_gastos():
+    try:
+        data_inicio = ler_data(request.args.get("data_inicio"), "data_inicio")
+        data_fim = ler_data(request.args.get("data_fim"), "data_fim")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    agrupar_por = request.args.get("agrupar_por")
+    if agrupar_por:
+        agrupar_por = tuple(dict.fromkeys(nome.strip() for nome in agrupar_por.split(",") if nome.strip()))
+        if not agrupar_por or any(nome not in AGRUPAMENTOS for nome in agrupar_por):
+            return jsonify({"error": f"agrupar_por aceita apenas: {', '.join(AGRUPAMENTOS)}"}), 400
+    else:
+        agrupar_por = AGRUPAMENTO_PADRAO
+
+    grupos = relatorio_gastos(
+        agrupar_por,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        cargo=request.args.get("cargo") or None,
+        servidor_id=request.args.get("servidor_id", type=int)
+    )
+    return jsonify({"agrupar_por": list(agrupar_por), "grupos": grupos})
@@ -2,15 +2,20 @@ from flask import Blueprint, jsonify, request
 from src.extensions import db
 from src.models.user import User
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from src.routes.paginacao import responder_catalogo
+from src.routes.condicional import condicional
 
 user_bp = Blueprint('user', __name__)
 
-# Rota para obter todos os usuários (protegida).
+# Campos que podem ser selecionados com o parâmetro fields (nunca o hash da senha).
+CAMPOS_USUARIO = ("id", "username", "email", "created_at", "last_login", "is_active")
+
+# Rota para obter os usuários (protegida; aceita fields e limite/cursor).
 @user_bp.route("/users", methods=["GET"])
 @jwt_required()
+@condicional("user")
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    return responder_catalogo(User, CAMPOS_USUARIO)
 
 # Rota para criar um novo usuário (agora apenas para uso administrativo).
 # O registro público deve ser feito através de /api/auth/register
@@ -42,6 +47,7 @@ def create_user():
 # Rota para obter um usuário específico pelo ID (protegida).
 @user_bp.route("/users/<int:user_id>", methods=["GET"])
 @jwt_required()
+@condicional("user")
 def get_user(user_id):
     user = User.query.get_or_404(user_id)
     return jsonify(user.to_dict())
@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from src.extensions import db
+from src.models.prestacao_contas import (
+    Servidor, Cargo, Presidente, PrestacaoContas,
+    Adiantamento, DespesaDiaria, DocumentoComprovacao, DespesaPassagem
+)
+
+# Coleções filhas da prestação que podem ser carregadas junto com o agregado.
+FILHOS_PRESTACAO = ("adiantamentos", "despesas_diarias", "documentos", "despesas_passagens")
+
+# Quantidade de IDs por cláusula IN, respeitando o limite de parâmetros do SQLite.
+TAMANHO_BLOCO_IN = 500
+
+
+@dataclass(frozen=True)
+class AgregadoPrestacao:
+    """Retrato de uma prestação de contas com todos os registros de que dependem
+    os totais e os PDFs, carregado em um número fixo de consultas."""
+
+    prestacao: PrestacaoContas
+    servidor: Optional[Servidor]
+    presidente: Optional[Presidente]
+    cargo: Optional[Cargo]
+    adiantamentos: Tuple[Adiantamento, ...] = ()
+    despesa_diaria: Optional[DespesaDiaria] = None
+    documentos: Tuple[DocumentoComprovacao, ...] = ()
+    passagens: Tuple[DespesaPassagem, ...] = ()
+
+    @property
+    def id(self):
+        return self.prestacao.id
+
+    @property
+    def adiantamento_diaria(self):
+        """Primeiro adiantamento do tipo 'diaria', se houver."""
+        return next((a for a in self.adiantamentos if a.tipo == "diaria"), None)
+
+    @property
+    def adiantamento_passagem(self):
+        """Primeiro adiantamento do tipo 'passagem', se houver."""
+        return next((a for a in self.adiantamentos if a.tipo == "passagem"), None)
+
+
+def _ordenados(registros):
+    """Ordena registros pelo ID, reproduzindo a ordem das consultas individuais."""
+    return tuple(sorted(registros, key=lambda registro: registro.id))
+
+
+def carregar_agregados(prestacao_ids, filhos=FILHOS_PRESTACAO):
+    """Carrega o agregado de várias prestações de contas.
+
+    A prestação, o servidor, o presidente e o cargo do servidor vêm em uma
+    única consulta com JOIN; cada coleção filha informada em
+    `filhos` custa uma consulta adicional (selectinload), independentemente
+    da quantidade de prestações. Retorna um dicionário {id: AgregadoPrestacao}
+    contendo apenas as prestações encontradas.
+    """
+    prestacao_ids = list(prestacao_ids)
+    opcoes = [
+        db.joinedload(PrestacaoContas.servidor).joinedload(Servidor.cargo_associado),
+        db.joinedload(PrestacaoContas.presidente),
+    ] + [db.selectinload(getattr(PrestacaoContas, filho)) for filho in filhos]
+
+    agregados = {}
+    for inicio in range(0, len(prestacao_ids), TAMANHO_BLOCO_IN):
+        bloco = prestacao_ids[inicio:inicio + TAMANHO_BLOCO_IN]
+        consulta = PrestacaoContas.query.options(*opcoes).filter(PrestacaoContas.id.in_(bloco))
+        for prestacao in consulta:
+            despesas = _ordenados(prestacao.despesas_diarias) if "despesas_diarias" in filhos else ()
+            agregados[prestacao.id] = AgregadoPrestacao(
+                prestacao=prestacao,
+                servidor=prestacao.servidor,
+                presidente=prestacao.presidente,
+                cargo=prestacao.servidor.cargo_associado if prestacao.servidor else None,
+                adiantamentos=_ordenados(prestacao.adiantamentos) if "adiantamentos" in filhos else (),
+                despesa_diaria=despesas[0] if despesas else None,
+                documentos=_ordenados(prestacao.documentos) if "documentos" in filhos else (),
+                passagens=_ordenados(prestacao.despesas_passagens) if "despesas_passagens" in filhos else (),
+            )
+    return agregados
+
+
+def carregar_agregado(prestacao_id, filhos=FILHOS_PRESTACAO):
+    """Carrega o agregado de uma prestação de contas ou retorna None se não existir."""
+    return carregar_agregados([prestacao_id], filhos).get(prestacao_id)
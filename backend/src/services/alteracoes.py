@@ -0,0 +1,184 @@
+from sqlalchemy import event, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from src.models.prestacao_contas import (
+    Servidor, Cargo, Presidente, PrestacaoContas,
+    Adiantamento, DespesaDiaria, DocumentoComprovacao, DespesaPassagem
+)
+
+# Chave usada em session.info para acumular as prestações alteradas na transação.
+CHAVE_SESSAO = "prestacoes_alteradas"
+
+# Chave usada em session.info para acumular os nomes das tabelas alteradas na transação.
+CHAVE_TABELAS = "tabelas_alteradas"
+
+# Modelos filhos que apontam diretamente para uma prestação de contas.
+MODELOS_FILHOS = (Adiantamento, DespesaDiaria, DocumentoComprovacao, DespesaPassagem)
+
+# Funções chamadas com o conjunto de IDs de prestações após cada commit.
+_ouvintes_commit = []
+
+# Funções chamadas com a sessão e os IDs de prestações antes de cada commit,
+# ainda dentro da transação.
+_ouvintes_pre_commit = []
+
+
+def ao_confirmar(funcao):
+    """Registra uma função chamada com os IDs das prestações alteradas após cada commit."""
+    if funcao not in _ouvintes_commit:
+        _ouvintes_commit.append(funcao)
+    return funcao
+
+
+def antes_de_confirmar(funcao):
+    """Registra uma função chamada com a sessão e os IDs das prestações alteradas antes
+    de cada commit. O que ela gravar pela conexão da sessão entra na mesma transação.
+    As tabelas alteradas ficam disponíveis em tabelas_alteradas(session).
+    """
+    if funcao not in _ouvintes_pre_commit:
+        _ouvintes_pre_commit.append(funcao)
+    return funcao
+
+
+def _ha_ouvintes():
+    return bool(_ouvintes_commit or _ouvintes_pre_commit)
+
+
+def tabelas_alteradas(session):
+    """Retorna os nomes das tabelas com registros incluídos, alterados ou removidos na transação."""
+    return set(session.info.get(CHAVE_TABELAS, ()))
+
+
+def _valores_atributo(obj, atributo):
+    """Retorna o valor atual e o valor anterior (se alterado) de um atributo."""
+    historico = inspect(obj).attrs[atributo].history
+    valores = set(historico.added or ()) | set(historico.deleted or ()) | set(historico.unchanged or ())
+    valores.add(getattr(obj, atributo))
+    valores.discard(None)
+    return valores
+
+
+def prestacoes_afetadas(session):
+    """Identifica as prestações cujos dados dependem de objetos novos, alterados ou removidos.
+
+    Deve ser chamada durante o flush (evento after_flush), quando os IDs já
+    foram atribuídos e o histórico dos atributos ainda está disponível.
+    """
+    ids = set()
+    servidor_ids = set()
+    presidente_ids = set()
+    cargo_ids = set()
+    nomes_cargos = set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, MODELOS_FILHOS):
+            ids |= _valores_atributo(obj, "prestacao_id")
+        elif isinstance(obj, PrestacaoContas):
+            if obj.id is not None:
+                ids.add(obj.id)
+        elif isinstance(obj, Servidor):
+            if obj.id is not None:
+                servidor_ids.add(obj.id)
+        elif isinstance(obj, Presidente):
+            if obj.id is not None:
+                presidente_ids.add(obj.id)
+        elif isinstance(obj, Cargo):
+            if obj.id is not None:
+                cargo_ids.add(obj.id)
+            # Pelo nome, alcança também os servidores ainda não associados a um cargo criado ou renomeado.
+            nomes_cargos |= _valores_atributo(obj, "nome_cargo")
+
+    ids |= _resolver_prestacoes(session.connection(), servidor_ids, presidente_ids, cargo_ids, nomes_cargos)
+    return ids
+
+
+def marcar_alteracoes(session, prestacao_ids=(), servidor_ids=(), presidente_ids=(), cargo_ids=(), nomes_cargos=(),
+                      tabelas=()):
+    """Registra alterações feitas sem passar pelo flush do ORM (operações em lote).
+
+    Os ouvintes registrados com ao_confirmar e antes_de_confirmar são notificados
+    no próximo commit.
+    """
+    if not _ha_ouvintes():
+        return
+    if tabelas:
+        session.info.setdefault(CHAVE_TABELAS, set()).update(tabelas)
+    ids = set(prestacao_ids) | _resolver_prestacoes(
+        session.connection(), set(servidor_ids), set(presidente_ids), set(cargo_ids), set(nomes_cargos)
+    )
+    if ids:
+        session.info.setdefault(CHAVE_SESSAO, set()).update(ids)
+
+
+def _resolver_prestacoes(conexao, servidor_ids, presidente_ids, cargo_ids, nomes_cargos):
+    """Busca as prestações ligadas aos servidores, presidentes e cargos informados."""
+    ids = set()
+    if servidor_ids:
+        ids.update(conexao.execute(
+            select(PrestacaoContas.id).where(PrestacaoContas.servidor_id.in_(servidor_ids))
+        ).scalars())
+    if presidente_ids:
+        ids.update(conexao.execute(
+            select(PrestacaoContas.id).where(PrestacaoContas.presidente_id.in_(presidente_ids))
+        ).scalars())
+    if cargo_ids or nomes_cargos:
+        ids.update(conexao.execute(
+            select(PrestacaoContas.id)
+            .join(Servidor, Servidor.id == PrestacaoContas.servidor_id)
+            .where(or_(Servidor.cargo_id.in_(cargo_ids), Servidor.cargo.in_(nomes_cargos)))
+        ).scalars())
+    return ids
+
+
+@event.listens_for(Session, "after_flush")
+def _acumular_alteracoes(session, flush_context):
+    """Acumula, ao longo da transação, as prestações afetadas por cada flush."""
+    if not _ha_ouvintes():
+        return
+    tabelas = {
+        obj.__tablename__ for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if hasattr(obj, "__tablename__")
+    }
+    if tabelas:
+        session.info.setdefault(CHAVE_TABELAS, set()).update(tabelas)
+    ids = prestacoes_afetadas(session)
+    if ids:
+        session.info.setdefault(CHAVE_SESSAO, set()).update(ids)
+
+
+@event.listens_for(Session, "before_commit")
+def _preparar_commit(session):
+    """Repassa as prestações alteradas aos ouvintes de antes do commit.
+
+    O flush pendente é feito antes, para que todas as alterações da transação
+    já estejam no banco e acumuladas. Um erro aqui desfaz o commit.
+    """
+    if not _ouvintes_pre_commit:
+        return
+    session.flush()
+    ids = session.info.get(CHAVE_SESSAO)
+    if not ids and not session.info.get(CHAVE_TABELAS):
+        return
+    for funcao in _ouvintes_pre_commit:
+        funcao(session, set(ids or ()))
+
+
+@event.listens_for(Session, "after_commit")
+def _notificar_commit(session):
+    """Notifica os ouvintes registrados sobre as prestações alteradas no commit."""
+    session.info.pop(CHAVE_TABELAS, None)
+    ids = session.info.pop(CHAVE_SESSAO, None)
+    if not ids:
+        return
+    for funcao in _ouvintes_commit:
+        try:
+            funcao(ids)
+        except Exception as e:
+            print(f"Erro ao notificar alteração de prestações: {str(e)}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_alteracoes(session):
+    """Descarta as alterações acumuladas quando a transação é desfeita."""
+    session.info.pop(CHAVE_SESSAO, None)
+    session.info.pop(CHAVE_TABELAS, None)
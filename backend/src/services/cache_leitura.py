@@ -0,0 +1,222 @@
+from datetime import datetime
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+
+
+class CacheLeitura:
+    """Cache read-through com validade (TTL), invalidação por grupo e contadores.
+
+    As entradas ficam em memória, limitadas a um número máximo. Com um
+    diretório configurado, elas também são gravadas em disco (em JSON), de
+    modo que processos diferentes (workers do gunicorn) compartilhem os
+    valores calculados e as invalidações: cada grupo tem um arquivo GERACAO
+    com um identificador trocado a cada invalidação, lido a cada consulta.
+
+    Configurações lidas de app.config, com o prefixo informado na criação:
+    - <PREFIXO>_TTL: validade das entradas em segundos; 0 desativa o cache.
+    - <PREFIXO>_MAX_ENTRADAS: número máximo de entradas em memória e, por
+      grupo, em disco (os arquivos vencidos são removidos primeiro).
+    - <PREFIXO>_DIR: diretório compartilhado entre processos (opcional).
+    """
+
+    def __init__(self, prefixo, ttl_padrao, max_entradas_padrao=256, app=None):
+        self.prefixo = prefixo
+        self.ttl_padrao = ttl_padrao
+        self.max_entradas_padrao = max_entradas_padrao
+        self.ttl = 0
+        self.max_entradas = 0
+        self.diretorio = None
+        self._entradas = {}
+        self._geracoes = {}
+        self._contadores = {}
+        self._trava = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configura a validade, o tamanho e o diretório compartilhado do cache."""
+        self.ttl = float(app.config.get(f"{self.prefixo}_TTL", self.ttl_padrao))
+        self.max_entradas = int(app.config.get(f"{self.prefixo}_MAX_ENTRADAS", self.max_entradas_padrao))
+        self.diretorio = app.config.get(f"{self.prefixo}_DIR") or None
+        if self.diretorio:
+            os.makedirs(self.diretorio, exist_ok=True)
+        with self._trava:
+            self._entradas.clear()
+            self._contadores.clear()
+        app.extensions[self.prefixo.lower()] = self
+
+    def _contar(self, grupo, evento):
+        contadores = self._contadores.setdefault(
+            grupo, {"acertos": 0, "acertos_disco": 0, "faltas": 0, "invalidacoes": 0}
+        )
+        contadores[evento] += 1
+
+    # Geração de cada grupo: muda a cada invalidação, tornando obsoletas as entradas anteriores.
+
+    def _arquivo_geracao(self, grupo):
+        return os.path.join(self.diretorio, grupo, "GERACAO")
+
+    def _geracao(self, grupo):
+        if not self.diretorio:
+            return self._geracoes.get(grupo, "")
+        try:
+            with open(self._arquivo_geracao(grupo), encoding="utf-8") as arquivo:
+                return arquivo.read()
+        except FileNotFoundError:
+            return ""
+
+    @staticmethod
+    def _gravar_atomico(caminho, conteudo):
+        """Grava o arquivo por meio de um temporário renomeado, sem leituras parciais."""
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "w", encoding="utf-8") as arquivo:
+                arquivo.write(conteudo)
+            os.replace(temporario, caminho)
+        except OSError:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    def _caminho_disco(self, grupo, geracao, chave):
+        resumo = hashlib.sha256(json.dumps(chave, default=str).encode("utf-8")).hexdigest()
+        return os.path.join(self.diretorio, grupo, geracao or "inicial", f"{resumo}.json")
+
+    def _ler_disco(self, grupo, geracao, chave, agora):
+        try:
+            with open(self._caminho_disco(grupo, geracao, chave), encoding="utf-8") as arquivo:
+                entrada = json.load(arquivo)
+        except (FileNotFoundError, ValueError):
+            return None
+        if entrada["expira"] <= agora:
+            self._remover_arquivo(self._caminho_disco(grupo, geracao, chave))
+            return None
+        return entrada
+
+    @staticmethod
+    def _remover_arquivo(caminho):
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass  # Já removido por outro processo.
+
+    def _gravar_disco(self, grupo, geracao, chave, expira, valor, agora):
+        caminho = self._caminho_disco(grupo, geracao, chave)
+        try:
+            self._gravar_atomico(caminho, json.dumps({"expira": expira, "valor": valor}, ensure_ascii=False))
+            # A data de modificação guarda a validade, usada na limpeza do diretório.
+            os.utime(caminho, (expira, expira))
+            self._limitar_disco(caminho, agora)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Erro ao gravar o cache {self.prefixo} em disco: {str(e)}")
+
+    def _limitar_disco(self, gravado, agora):
+        """Acima de max_entradas arquivos na pasta do arquivo gravado, remove os
+        vencidos e, se preciso, os que vencem primeiro (nunca o recém-gravado)."""
+        pasta = os.path.dirname(gravado)
+        nomes = [nome for nome in os.listdir(pasta) if nome.endswith(".json")]
+        if len(nomes) <= self.max_entradas:
+            return
+        arquivos = []
+        for nome in nomes:
+            caminho = os.path.join(pasta, nome)
+            if caminho == gravado:
+                continue
+            try:
+                arquivos.append((os.stat(caminho).st_mtime, caminho))
+            except FileNotFoundError:
+                continue
+        arquivos.sort()
+        excedentes = len(arquivos) + 1 - self.max_entradas
+        for posicao, (expira, caminho) in enumerate(arquivos):
+            if posicao >= excedentes and expira > agora:
+                break
+            self._remover_arquivo(caminho)
+
+    def obter_ou_calcular(self, chave, calcular, grupo="geral", agora=None):
+        """Retorna o valor guardado para a chave ou o calcula e guarda.
+
+        Com o diretório compartilhado configurado, o valor deve ser
+        serializável em JSON.
+        """
+        if self.ttl <= 0:
+            return calcular()
+        agora = agora if agora is not None else datetime.utcnow().timestamp()
+        geracao = self._geracao(grupo)
+        with self._trava:
+            entrada = self._entradas.get((grupo, chave))
+            if entrada and entrada[0] > agora and entrada[1] == geracao:
+                self._contar(grupo, "acertos")
+                return entrada[2]
+
+        if self.diretorio:
+            entrada = self._ler_disco(grupo, geracao, chave, agora)
+            if entrada is not None:
+                self._guardar(grupo, chave, entrada["expira"], geracao, entrada["valor"], agora)
+                with self._trava:
+                    self._contar(grupo, "acertos_disco")
+                return entrada["valor"]
+
+        valor = calcular()
+        expira = agora + self.ttl
+        self._guardar(grupo, chave, expira, geracao, valor, agora)
+        if self.diretorio:
+            self._gravar_disco(grupo, geracao, chave, expira, valor, agora)
+        with self._trava:
+            self._contar(grupo, "faltas")
+        return valor
+
+    def _guardar(self, grupo, chave, expira, geracao, valor, agora):
+        with self._trava:
+            if len(self._entradas) >= self.max_entradas:
+                # Descarta as entradas vencidas e, se ainda faltar espaço, as mais antigas.
+                self._entradas = {c: e for c, e in self._entradas.items() if e[0] > agora}
+                while self._entradas and len(self._entradas) >= self.max_entradas:
+                    self._entradas.pop(next(iter(self._entradas)))
+            self._entradas[(grupo, chave)] = (expira, geracao, valor)
+
+    def invalidar(self, *grupos):
+        """Descarta as entradas dos grupos informados (todos, se nenhum for informado),
+        inclusive nos demais processos que usam o mesmo diretório."""
+        with self._trava:
+            if not grupos:
+                grupos = {grupo for grupo, _ in self._entradas} | set(self._contadores) | set(self._geracoes)
+                if self.diretorio:
+                    grupos |= {nome for nome in os.listdir(self.diretorio) if os.path.isdir(os.path.join(self.diretorio, nome))}
+                grupos = tuple(grupos)
+            self._entradas = {c: e for c, e in self._entradas.items() if c[0] not in grupos}
+            for grupo in grupos:
+                self._geracoes[grupo] = uuid.uuid4().hex
+                self._contar(grupo, "invalidacoes")
+        if self.diretorio:
+            for grupo in grupos:
+                try:
+                    self._gravar_atomico(self._arquivo_geracao(grupo), self._geracoes[grupo])
+                    # Remove as gerações anteriores, que não serão mais lidas.
+                    for nome in os.listdir(os.path.join(self.diretorio, grupo)):
+                        caminho = os.path.join(self.diretorio, grupo, nome)
+                        if nome != self._geracoes[grupo] and os.path.isdir(caminho):
+                            shutil.rmtree(caminho, ignore_errors=True)
+                except OSError as e:
+                    print(f"Erro ao invalidar o cache {self.prefixo} em disco: {str(e)}")
+
+    def limpar(self):
+        """Remove todas as entradas guardadas."""
+        self.invalidar()
+
+    def estatisticas(self):
+        """Retorna os contadores de acertos, faltas e invalidações de cada grupo."""
+        with self._trava:
+            return {
+                "habilitado": self.ttl > 0,
+                "ttl": self.ttl,
+                "compartilhado": self.diretorio is not None,
+                "entradas": len(self._entradas),
+                "grupos": {grupo: dict(contadores) for grupo, contadores in self._contadores.items()},
+            }
@@ -0,0 +1,243 @@
+import json
+from itertools import islice
+
+from src.extensions import db
+from src.models.prestacao_contas import Servidor, Cargo, Presidente
+from src.services import alteracoes
+from src.services.vinculo_cargos import ids_cargos_por_nome, vincular_servidores
+
+# Quantidade de registros gravados em cada transação.
+TAMANHO_LOTE = 1000
+
+# Tipos de conteúdo aceitos como NDJSON (um objeto JSON por linha).
+TIPOS_NDJSON = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+class ErroValidacao(ValueError):
+    """Erro de validação de um registro individual da carga."""
+
+
+def ler_ndjson(fluxo, pular_ate=0):
+    """Lê um fluxo NDJSON linha a linha, gerando (número da linha, registro ou exceção).
+
+    Linhas com número até `pular_ate` são descartadas sem serem decodificadas.
+    """
+    for numero, linha in enumerate(fluxo, start=1):
+        if numero <= pular_ate:
+            continue
+        if isinstance(linha, bytes):
+            linha = linha.decode("utf-8")
+        linha = linha.strip()
+        if not linha:
+            continue
+        try:
+            yield numero, json.loads(linha)
+        except ValueError as e:
+            yield numero, ErroValidacao(f"JSON inválido: {e}")
+
+
+def ler_registros(requisicao):
+    """Gera (linha, registro) a partir do corpo da requisição: array JSON ou NDJSON em streaming."""
+    if requisicao.mimetype in TIPOS_NDJSON:
+        return ler_ndjson(requisicao.stream)
+    dados = requisicao.get_json(silent=True)
+    if not isinstance(dados, list):
+        raise ErroValidacao("O corpo deve ser um array JSON ou um fluxo NDJSON")
+    return enumerate(dados, start=1)
+
+
+def validar_texto(registro, campo, obrigatorio, tamanho):
+    """Valida um campo de texto não vazio com tamanho máximo; retorna None se ausente."""
+    valor = registro.get(campo)
+    if valor is None:
+        if obrigatorio:
+            raise ErroValidacao(f"{campo} é obrigatório")
+        return None
+    if not isinstance(valor, str) or not valor.strip():
+        raise ErroValidacao(f"{campo} deve ser um texto não vazio")
+    if len(valor) > tamanho:
+        raise ErroValidacao(f"{campo} deve ter no máximo {tamanho} caracteres")
+    return valor
+
+
+def validar_numero(registro, campo, obrigatorio):
+    """Valida um campo numérico e o converte para float; retorna None se ausente."""
+    valor = registro.get(campo)
+    if valor is None:
+        if obrigatorio:
+            raise ErroValidacao(f"{campo} é obrigatório")
+        return None
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        raise ErroValidacao(f"{campo} deve ser numérico")
+    return float(valor)
+
+
+def _sem_nulos(mapeamento):
+    return {campo: valor for campo, valor in mapeamento.items() if valor is not None}
+
+
+def _validar_servidor(registro, novo):
+    return _sem_nulos({
+        "nome": validar_texto(registro, "nome", novo, 200),
+        "cargo": validar_texto(registro, "cargo", novo, 100),
+    })
+
+
+def _validar_presidente(registro, novo):
+    return _sem_nulos({"nome": validar_texto(registro, "nome", novo, 200)})
+
+
+def _validar_cargo(registro, novo):
+    return _sem_nulos({
+        "nome_cargo": validar_texto(registro, "nome_cargo", True, 100),
+        "valor_diaria_dentro_estado": validar_numero(registro, "valor_diaria_dentro_estado", novo),
+        "valor_diaria_fora_estado": validar_numero(registro, "valor_diaria_fora_estado", novo),
+    })
+
+
+def _chave_registro(registro, chave_natural):
+    """Retorna a chave natural ou o "id" do registro, validando o tipo antes de usá-la em buscas."""
+    if chave_natural:
+        chave = registro.get(chave_natural)
+        if chave is not None and not isinstance(chave, str):
+            raise ErroValidacao(f"{chave_natural} deve ser um texto não vazio")
+        return chave
+    chave = registro.get("id")
+    if chave is not None and (isinstance(chave, bool) or not isinstance(chave, int)):
+        raise ErroValidacao("id deve ser um número inteiro")
+    return chave
+
+
+def _carregar(modelo, registros, validar, chave_natural=None, tamanho_lote=TAMANHO_LOTE):
+    """Insere ou atualiza registros em transações de até `tamanho_lote` linhas.
+
+    Com `chave_natural`, registros cuja chave já existe são atualizados; sem
+    ela, registros com "id" atualizam o registro correspondente e os demais
+    são inseridos. Retorna o resumo com o resultado de cada linha.
+    """
+    resumo = {"total": 0, "criados": 0, "atualizados": 0, "erros": 0, "resultados": []}
+    registros = iter(registros)
+
+    while True:
+        bloco = list(islice(registros, tamanho_lote))
+        if not bloco:
+            break
+        resumo["total"] += len(bloco)
+        resultados = {}
+        validos = []
+        for linha, registro in bloco:
+            if isinstance(registro, Exception):
+                resultados[linha] = {"linha": linha, "status": "erro", "erro": str(registro)}
+            elif not isinstance(registro, dict):
+                resultados[linha] = {"linha": linha, "status": "erro", "erro": "Registro deve ser um objeto JSON"}
+            else:
+                try:
+                    validos.append((linha, registro, _chave_registro(registro, chave_natural)))
+                except ErroValidacao as e:
+                    resultados[linha] = {"linha": linha, "status": "erro", "erro": str(e)}
+
+        # Identifica os registros já existentes pela chave natural ou pelo ID.
+        if chave_natural:
+            coluna = getattr(modelo, chave_natural)
+            chaves = {chave for _, _, chave in validos if chave is not None}
+            existentes = dict(db.session.query(coluna, modelo.id).filter(coluna.in_(chaves))) if chaves else {}
+        else:
+            ids = {chave for _, _, chave in validos if chave is not None}
+            existentes = {i: i for (i,) in db.session.query(modelo.id).filter(modelo.id.in_(ids))} if ids else {}
+
+        inserir = {}
+        atualizar = {}
+        for linha, registro, chave in validos:
+            try:
+                if not chave_natural and chave is not None and chave not in existentes:
+                    raise ErroValidacao(f"{modelo.__name__} com id {chave} não encontrado")
+                if chave in existentes:
+                    mapeamento = validar(registro, novo=False)
+                    if mapeamento:
+                        mapeamento["id"] = existentes[chave]
+                        atualizar.setdefault(chave, {}).update(mapeamento)
+                    resultados[linha] = {"linha": linha, "status": "atualizado", "id": existentes[chave]}
+                elif chave is not None and chave in inserir:
+                    # Chave repetida no mesmo bloco: a última ocorrência prevalece.
+                    inserir[chave][1].update(validar(registro, novo=False))
+                    resultados[linha] = {"linha": linha, "status": "atualizado", "mapeamento": inserir[chave][1]}
+                else:
+                    mapeamento = validar(registro, novo=True)
+                    inserir[chave if chave is not None else ("linha", linha)] = (linha, mapeamento)
+                    resultados[linha] = {"linha": linha, "status": "criado", "mapeamento": mapeamento}
+            except ErroValidacao as e:
+                resultados[linha] = {"linha": linha, "status": "erro", "erro": str(e)}
+
+        try:
+            _preparar_mapeamentos(modelo, [mapeamento for _, mapeamento in inserir.values()] + list(atualizar.values()))
+            if inserir:
+                db.session.bulk_insert_mappings(
+                    modelo, [mapeamento for _, mapeamento in inserir.values()], return_defaults=True
+                )
+                _marcar_inseridos(modelo, [mapeamento for _, mapeamento in inserir.values()])
+            if atualizar:
+                db.session.bulk_update_mappings(modelo, list(atualizar.values()))
+                _marcar_atualizados(modelo, list(atualizar.values()))
+            if inserir or atualizar:
+                alteracoes.marcar_alteracoes(db.session, tabelas=[modelo.__tablename__])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for linha, _, _ in validos:
+                if resultados[linha]["status"] != "erro":
+                    resultados[linha] = {"linha": linha, "status": "erro", "erro": f"Falha ao gravar o bloco: {e}"}
+
+        for linha in sorted(resultados):
+            resultado = resultados[linha]
+            mapeamento = resultado.pop("mapeamento", None)
+            if mapeamento is not None:
+                resultado["id"] = mapeamento.get("id")
+            resumo[{"criado": "criados", "atualizado": "atualizados", "erro": "erros"}[resultado["status"]]] += 1
+            resumo["resultados"].append(resultado)
+
+    return resumo
+
+
+def _preparar_mapeamentos(modelo, mapeamentos):
+    """Completa o cargo_id dos servidores a partir do nome do cargo (a carga em lote não passa pelo flush)."""
+    if modelo is not Servidor:
+        return
+    ids = ids_cargos_por_nome(db.session.connection(), {m["cargo"] for m in mapeamentos if "cargo" in m})
+    for mapeamento in mapeamentos:
+        if "cargo" in mapeamento:
+            mapeamento["cargo_id"] = ids.get(mapeamento["cargo"])
+
+
+def _marcar_inseridos(modelo, mapeamentos):
+    """Associa os cargos inseridos em lote aos servidores que já usavam o nome e marca suas prestações."""
+    if modelo is not Cargo:
+        return
+    nomes = {m["nome_cargo"] for m in mapeamentos}
+    vincular_servidores(db.session.connection(), nomes)
+    alteracoes.marcar_alteracoes(db.session, nomes_cargos=nomes)
+
+
+def _marcar_atualizados(modelo, mapeamentos):
+    """Informa as prestações afetadas por atualizações em lote (que não passam pelo flush)."""
+    ids = [m["id"] for m in mapeamentos]
+    if modelo is Servidor:
+        alteracoes.marcar_alteracoes(db.session, servidor_ids=ids)
+    elif modelo is Presidente:
+        alteracoes.marcar_alteracoes(db.session, presidente_ids=ids)
+    elif modelo is Cargo:
+        alteracoes.marcar_alteracoes(db.session, cargo_ids=ids)
+
+
+def carregar_servidores(registros, tamanho_lote=TAMANHO_LOTE):
+    """Insere servidores ou atualiza os que informarem um id existente."""
+    return _carregar(Servidor, registros, _validar_servidor, tamanho_lote=tamanho_lote)
+
+
+def carregar_presidentes(registros, tamanho_lote=TAMANHO_LOTE):
+    """Insere presidentes ou atualiza os que informarem um id existente."""
+    return _carregar(Presidente, registros, _validar_presidente, tamanho_lote=tamanho_lote)
+
+
+def carregar_cargos(registros, tamanho_lote=TAMANHO_LOTE):
+    """Insere cargos ou atualiza os existentes com o mesmo nome_cargo (upsert)."""
+    return _carregar(Cargo, registros, _validar_cargo, chave_natural="nome_cargo", tamanho_lote=tamanho_lote)
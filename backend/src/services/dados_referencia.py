@@ -0,0 +1,46 @@
+"""Cadastros de referência (cargos e presidentes) servidos a partir do cache.
+
+Esses cadastros mudam poucas vezes por ano e são lidos a cada carregamento
+das telas. As listas completas ficam em cache_referencia, com a versão dos
+dados (versoes_dados) na chave, de modo que uma alteração feita por qualquer
+processo é vista pelos demais; as rotas de escrita também invalidam o cache
+do próprio processo após o commit. Configuração: REFERENCIA_CACHE_TTL,
+REFERENCIA_CACHE_MAX_ENTRADAS e REFERENCIA_CACHE_DIR (ver CacheLeitura).
+"""
+from src.models.prestacao_contas import Cargo, Presidente
+from src.services.cache_leitura import CacheLeitura
+from src.services.versoes import versao_atual
+
+# Grupos de invalidação do cache de referência.
+GRUPO_CARGOS = "cargos"
+GRUPO_PRESIDENTES = "presidentes"
+
+cache_referencia = CacheLeitura("REFERENCIA_CACHE", ttl_padrao=300)
+
+
+def listar_cargos():
+    """Retorna todos os cargos serializados, em ordem de ID."""
+    return cache_referencia.obter_ou_calcular(
+        ("todos", versao_atual(Cargo.__tablename__)),
+        lambda: [cargo.to_dict() for cargo in Cargo.query.order_by(Cargo.id)],
+        grupo=GRUPO_CARGOS
+    )
+
+
+def listar_presidentes():
+    """Retorna todos os presidentes serializados, em ordem de ID."""
+    return cache_referencia.obter_ou_calcular(
+        ("todos", versao_atual(Presidente.__tablename__)),
+        lambda: [presidente.to_dict() for presidente in Presidente.query.order_by(Presidente.id)],
+        grupo=GRUPO_PRESIDENTES
+    )
+
+
+def invalidar_cargos():
+    """Descarta os cargos em cache (chamar após o commit de qualquer alteração)."""
+    cache_referencia.invalidar(GRUPO_CARGOS)
+
+
+def invalidar_presidentes():
+    """Descarta os presidentes em cache (chamar após o commit de qualquer alteração)."""
+    cache_referencia.invalidar(GRUPO_PRESIDENTES)
@@ -0,0 +1,395 @@
+"""Geração determinística de dados sintéticos para testes de carga e benchmarks.
+
+A mesma semente, as mesmas quantidades e as mesmas distribuições geram sempre
+os mesmos registros. As linhas são produzidas e gravadas em blocos de
+prestações (com os filhos de cada bloco), de modo que a memória usada não
+depende do volume gerado. Os IDs são atribuídos aqui, a partir do maior ID
+existente, e a gravação não passa pelo ORM: no SQLite, cada bloco de cada
+tabela é um único executemany direto no driver (com synchronous=OFF durante a
+carga, quando ela confirma os próprios blocos); nos demais bancos, um insert em lote do SQLAlchemy Core. Os totais
+materializados não são atualizados e devem ser reconstruídos depois
+(reconstruir_totais); as versões dos dados (ETags) são incrementadas ao final.
+"""
+from bisect import bisect_right
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from math import exp
+import random
+
+from sqlalchemy import func, select
+
+from src.models.prestacao_contas import (
+    Servidor, Cargo, Presidente, PrestacaoContas,
+    Adiantamento, DespesaDiaria, DocumentoComprovacao, DespesaPassagem
+)
+from src.services.versoes import CHAVE_PRESTACOES, incrementar_versoes
+
+# Cargos criados (se ainda não existirem): nome, diária dentro e fora do estado.
+CARGOS_SINTETICOS = (
+    ("Vereador", 450.0, 700.0),
+    ("Assessor Parlamentar", 250.0, 400.0),
+    ("Assessor Jurídico", 300.0, 480.0),
+    ("Chefe de Gabinete", 320.0, 520.0),
+    ("Contador", 280.0, 450.0),
+    ("Motorista", 150.0, 260.0),
+    ("Técnico Legislativo", 200.0, 340.0),
+    ("Diretor Administrativo", 350.0, 560.0),
+)
+
+# Quantidade padrão de presidentes criados quando a tabela está vazia.
+QUANTIDADE_PRESIDENTES = 6
+
+NOMES = (
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela", "João",
+    "Karina", "Lucas", "Mariana", "Nicolas", "Olívia", "Pedro", "Rafaela", "Sérgio", "Tatiane", "Vinícius",
+)
+SOBRENOMES = (
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+)
+TIPOS_DOCUMENTO = ("nota_fiscal", "nota_hotel", "recibo", "cupom_fiscal")
+
+# Período das datas de criação (fixo, para que os dados não dependam do dia da geração).
+DATA_INICIAL = datetime(2020, 1, 1)
+DIAS_PERIODO = 5 * 365
+
+# Dias antes da criação em que a viagem pode ter ocorrido, e dias cobertos pelos documentos.
+DIAS_ANTES_VIAGEM = 30
+DIAS_DOCUMENTOS = 5
+
+# Datas do período em texto, no formato gravado pelo SQLAlchemy e aceito pelos
+# demais bancos (o índice 0 é DIAS_ANTES_VIAGEM dias antes de DATA_INICIAL).
+DATAS = tuple(
+    (DATA_INICIAL + timedelta(days=dia - DIAS_ANTES_VIAGEM)).strftime("%Y-%m-%d")
+    for dia in range(DIAS_ANTES_VIAGEM + DIAS_PERIODO + DIAS_DOCUMENTOS)
+)
+
+# Prestações (com seus filhos) ou servidores gravados por vez.
+TAMANHO_BLOCO = 5000
+
+# Colunas gravadas em cada tabela, na ordem das tuplas geradas.
+COLUNAS = {
+    Servidor: ("id", "nome", "cargo", "cargo_id"),
+    PrestacaoContas: ("id", "servidor_id", "presidente_id", "data_criacao"),
+    Adiantamento: ("id", "prestacao_id", "tipo", "numero_adiantamento", "numero_empenho", "valor", "data_adiantamento"),
+    DespesaDiaria: ("id", "prestacao_id", "diarias_dentro_estado", "refeicoes_dentro_estado",
+                    "diarias_fora_estado", "refeicoes_fora_estado"),
+    DocumentoComprovacao: ("id", "prestacao_id", "tipo_documento", "descricao", "data_documento", "valor"),
+    DespesaPassagem: ("id", "prestacao_id", "bpe", "valor", "tipo_viagem"),
+}
+
+
+@dataclass(frozen=True)
+class Distribuicoes:
+    """Distribuições dos registros filhos de cada prestação.
+
+    As probabilidades valem por prestação. As quantidades de documentos e de
+    viagens seguem distribuições de Poisson com a média informada, limitadas
+    ao máximo. Só há viagens (e passagens) nas prestações com adiantamento de
+    passagem; cada viagem tem entre passagens_minimo e passagens_maximo
+    trechos, a primeira metade de ida e o restante de volta.
+    """
+
+    adiantamento_diaria: float = 0.9
+    adiantamento_passagem: float = 0.6
+    despesa_diaria: float = 0.85
+    documentos_media: float = 2.5
+    documentos_maximo: int = 20
+    viagens_media: float = 1.2
+    viagens_maximo: int = 6
+    passagens_minimo: int = 2
+    passagens_maximo: int = 2
+
+    def __post_init__(self):
+        for campo in ("adiantamento_diaria", "adiantamento_passagem", "despesa_diaria"):
+            if not 0 <= getattr(self, campo) <= 1:
+                raise ValueError(f"{campo} deve ser uma probabilidade entre 0 e 1")
+        for campo in ("documentos_media", "documentos_maximo", "viagens_media", "viagens_maximo"):
+            if getattr(self, campo) < 0:
+                raise ValueError(f"{campo} não pode ser negativo")
+        if not 1 <= self.passagens_minimo <= self.passagens_maximo:
+            raise ValueError("As passagens por viagem devem respeitar 1 <= mínimo <= máximo")
+
+
+@dataclass
+class ContagemGerada:
+    """Quantidade de registros gerados em cada tabela."""
+
+    cargos: int = 0
+    presidentes: int = 0
+    servidores: int = 0
+    prestacoes: int = 0
+    adiantamentos: int = 0
+    despesas_diarias: int = 0
+    documentos: int = 0
+    passagens: int = 0
+
+    @property
+    def total(self):
+        return sum(getattr(self, campo.name) for campo in fields(self))
+
+    def como_dict(self):
+        return {campo.name: getattr(self, campo.name) for campo in fields(self)}
+
+    def tabelas(self):
+        """Retorna os nomes das tabelas em que algum registro foi gerado."""
+        modelos = {
+            "cargos": Cargo, "presidentes": Presidente, "servidores": Servidor, "prestacoes": PrestacaoContas,
+            "adiantamentos": Adiantamento, "despesas_diarias": DespesaDiaria,
+            "documentos": DocumentoComprovacao, "passagens": DespesaPassagem,
+        }
+        return [modelos[campo].__tablename__ for campo, quantidade in self.como_dict().items() if quantidade]
+
+
+def _tabela_poisson(media, maximo):
+    """Probabilidades acumuladas de Poisson de 0 a maximo - 1, para sorteio com bisect_right.
+
+    O sorteio resulta em maximo quando cai na probabilidade restante.
+    """
+    acumuladas, termo, soma = [], exp(-media), 0.0
+    for k in range(maximo):
+        soma += termo
+        acumuladas.append(soma)
+        termo *= media / (k + 1)
+    return acumuladas
+
+
+def _proximo_id(conexao, modelo):
+    return (conexao.execute(select(func.max(modelo.id))).scalar() or 0) + 1
+
+
+def _inserir(conexao, modelo, linhas):
+    """Grava as linhas (tuplas na ordem de COLUNAS) com um único executemany."""
+    colunas = COLUNAS[modelo]
+    if conexao.dialect.name == "sqlite":
+        conexao.exec_driver_sql(
+            f"INSERT INTO {modelo.__tablename__} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})",
+            linhas
+        )
+    else:
+        conexao.execute(modelo.__table__.insert(), [dict(zip(colunas, linha)) for linha in linhas])
+
+
+@contextmanager
+def _pragmas_carga(conexao, ativar):
+    """No SQLite, desativa a sincronização com o disco e aumenta o cache durante a carga.
+
+    O SQLite não aceita alterar synchronous dentro de uma transação; por isso
+    os PRAGMAs só são alterados quando a carga confirma os próprios blocos
+    (ativar), e um erro desfaz o bloco pendente antes de restaurá-los.
+    """
+    if not ativar or conexao.dialect.name != "sqlite":
+        yield
+        return
+    synchronous = conexao.exec_driver_sql("PRAGMA synchronous").scalar()
+    cache_size = conexao.exec_driver_sql("PRAGMA cache_size").scalar()
+    conexao.exec_driver_sql("PRAGMA synchronous = OFF")
+    conexao.exec_driver_sql("PRAGMA cache_size = -131072")
+    try:
+        yield
+    except BaseException:
+        conexao.rollback()
+        raise
+    finally:
+        conexao.exec_driver_sql(f"PRAGMA synchronous = {int(synchronous)}")
+        conexao.exec_driver_sql(f"PRAGMA cache_size = {int(cache_size)}")
+
+
+def _gerar_cargos(conexao, contagem):
+    """Cria os cargos sintéticos que faltarem e retorna [(id, nome)]."""
+    existentes = dict(conexao.execute(select(Cargo.nome_cargo, Cargo.id)).all())
+    novos = [
+        {"nome_cargo": nome, "valor_diaria_dentro_estado": dentro, "valor_diaria_fora_estado": fora}
+        for nome, dentro, fora in CARGOS_SINTETICOS if nome not in existentes
+    ]
+    if novos:
+        conexao.execute(Cargo.__table__.insert(), novos)
+        contagem.cargos += len(novos)
+        existentes = dict(conexao.execute(select(Cargo.nome_cargo, Cargo.id)).all())
+    return [(existentes[nome], nome) for nome, _, _ in CARGOS_SINTETICOS]
+
+
+def _gerar_presidentes(conexao, rng, quantidade, contagem):
+    """Cria os presidentes, se não houver nenhum, e retorna seus IDs."""
+    ids = list(conexao.execute(select(Presidente.id).order_by(Presidente.id)).scalars())
+    if ids or not quantidade:
+        return ids
+    linhas = [{"nome": f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}"} for _ in range(quantidade)]
+    conexao.execute(Presidente.__table__.insert(), linhas)
+    contagem.presidentes += len(linhas)
+    return list(conexao.execute(select(Presidente.id).order_by(Presidente.id)).scalars())
+
+
+def _gerar_servidores(rng, ids_servidores, cargos):
+    """Gera as linhas (tuplas) de um bloco de servidores."""
+    aleatorio = rng.random
+    linhas = []
+    for servidor_id in ids_servidores:
+        cargo_id, nome_cargo = cargos[int(aleatorio() * len(cargos))]
+        nome = (
+            f"{NOMES[int(aleatorio() * len(NOMES))]} {SOBRENOMES[int(aleatorio() * len(SOBRENOMES))]} "
+            f"{SOBRENOMES[int(aleatorio() * len(SOBRENOMES))]} {servidor_id:07d}"
+        )
+        linhas.append((servidor_id, nome, nome_cargo, cargo_id))
+    return linhas
+
+
+def _gerar_bloco_prestacoes(rng, ids_prestacoes, servidores, presidentes, distribuicoes, proximos_ids):
+    """Gera as linhas (tuplas) de um bloco de prestações e de todos os seus filhos.
+
+    As datas e os valores são sorteados com rng.random() e montados como texto
+    e centavos inteiros, bem mais rápido que randrange e datetime por registro.
+    """
+    aleatorio = rng.random
+    datas = DATAS
+    tabela_documentos = _tabela_poisson(distribuicoes.documentos_media, distribuicoes.documentos_maximo)
+    tabela_viagens = _tabela_poisson(distribuicoes.viagens_media, distribuicoes.viagens_maximo)
+    minimo_trechos = distribuicoes.passagens_minimo
+    faixa_trechos = distribuicoes.passagens_maximo - minimo_trechos + 1
+    id_adiantamento = proximos_ids["adiantamentos"]
+    id_despesa = proximos_ids["despesas_diarias"]
+    id_documento = proximos_ids["documentos"]
+    id_passagem = proximos_ids["passagens"]
+
+    prestacoes, adiantamentos, despesas, documentos, passagens = [], [], [], [], []
+    for prestacao_id in ids_prestacoes:
+        dia = DIAS_ANTES_VIAGEM + int(aleatorio() * DIAS_PERIODO)
+        segundo = int(aleatorio() * 86400)
+        prestacoes.append((
+            prestacao_id,
+            servidores[int(aleatorio() * len(servidores))],
+            presidentes[int(aleatorio() * len(presidentes))],
+            f"{datas[dia]} {segundo // 3600:02d}:{segundo // 60 % 60:02d}:{segundo % 60:02d}.000000",
+        ))
+        dia_viagem = dia - 1 - int(aleatorio() * (DIAS_ANTES_VIAGEM - 1))
+        data_viagem = datas[dia_viagem]
+        ano = data_viagem[:4]
+
+        if aleatorio() < distribuicoes.adiantamento_diaria:
+            adiantamentos.append((
+                id_adiantamento, prestacao_id, "diaria",
+                f"{1 + int(aleatorio() * 9998)}/{ano}", f"{1 + int(aleatorio() * 99998)}/{ano}",
+                (15000 + int(aleatorio() * 285000)) / 100, data_viagem,
+            ))
+            id_adiantamento += 1
+        viagens = 0
+        if aleatorio() < distribuicoes.adiantamento_passagem:
+            adiantamentos.append((
+                id_adiantamento, prestacao_id, "passagem",
+                f"{1 + int(aleatorio() * 9998)}/{ano}", f"{1 + int(aleatorio() * 99998)}/{ano}",
+                (15000 + int(aleatorio() * 285000)) / 100, data_viagem,
+            ))
+            id_adiantamento += 1
+            viagens = bisect_right(tabela_viagens, aleatorio())
+
+        if aleatorio() < distribuicoes.despesa_diaria:
+            despesas.append((
+                id_despesa, prestacao_id,
+                int(aleatorio() * 6), int(aleatorio() * 4), int(aleatorio() * 4), int(aleatorio() * 3),
+            ))
+            id_despesa += 1
+
+        for _ in range(bisect_right(tabela_documentos, aleatorio())):
+            documentos.append((
+                id_documento, prestacao_id, TIPOS_DOCUMENTO[int(aleatorio() * len(TIPOS_DOCUMENTO))],
+                f"Despesa de viagem {1 + int(aleatorio() * 999)}",
+                datas[dia_viagem + int(aleatorio() * DIAS_DOCUMENTOS)],
+                (1000 + int(aleatorio() * 79000)) / 100,
+            ))
+            id_documento += 1
+
+        for _ in range(viagens):
+            trechos = minimo_trechos + int(aleatorio() * faixa_trechos)
+            for trecho in range(trechos):
+                passagens.append((
+                    id_passagem, prestacao_id, str(1000000000 + int(aleatorio() * 9000000000)),
+                    (4000 + int(aleatorio() * 56000)) / 100,
+                    "ida" if trecho < (trechos + 1) // 2 else "volta",
+                ))
+                id_passagem += 1
+
+    proximos_ids.update(
+        adiantamentos=id_adiantamento, despesas_diarias=id_despesa, documentos=id_documento, passagens=id_passagem
+    )
+    return prestacoes, adiantamentos, despesas, documentos, passagens
+
+
+def gerar_dados(conexao, servidores, prestacoes, semente=1, distribuicoes=None,
+                presidentes=QUANTIDADE_PRESIDENTES, tamanho_bloco=TAMANHO_BLOCO,
+                confirmar_blocos=False, ao_progredir=None):
+    """Gera servidores e prestações com todos os registros filhos.
+
+    Os cargos sintéticos são criados se ainda não existirem, e os presidentes
+    se a tabela estiver vazia; sem servidores novos, as prestações usam os já
+    cadastrados. As versões das tabelas alteradas e de "prestacoes" são
+    incrementadas ao final. Com confirmar_blocos, cada bloco gravado é confirmado
+    (conexao.commit()); sem, a transação fica a cargo de quem chama.
+    ao_progredir, se informado, é chamado com a ContagemGerada após cada
+    bloco. Retorna a ContagemGerada final.
+    """
+    distribuicoes = distribuicoes or Distribuicoes()
+    # Uma sequência por tipo de registro: os servidores e as prestações gerados
+    # não dependem de os cargos e presidentes já existirem no banco.
+    rng_presidentes = random.Random(f"{semente}:presidentes")
+    rng_servidores = random.Random(f"{semente}:servidores")
+    rng_prestacoes = random.Random(f"{semente}:prestacoes")
+    contagem = ContagemGerada()
+
+    with _pragmas_carga(conexao, confirmar_blocos):
+        cargos = _gerar_cargos(conexao, contagem)
+        ids_presidentes = _gerar_presidentes(conexao, rng_presidentes, presidentes, contagem)
+        if prestacoes and not ids_presidentes:
+            raise ValueError("Não há presidentes para associar às prestações")
+
+        primeiro_servidor = _proximo_id(conexao, Servidor)
+        for inicio in range(0, servidores, tamanho_bloco):
+            ids_bloco = range(primeiro_servidor + inicio, primeiro_servidor + min(inicio + tamanho_bloco, servidores))
+            _inserir(conexao, Servidor, _gerar_servidores(rng_servidores, ids_bloco, cargos))
+            contagem.servidores += len(ids_bloco)
+            if confirmar_blocos:
+                conexao.commit()
+            if ao_progredir:
+                ao_progredir(contagem)
+
+        ids_servidores = range(primeiro_servidor, primeiro_servidor + servidores)
+        if not servidores:
+            ids_servidores = list(conexao.execute(select(Servidor.id)).scalars())
+        if prestacoes and not ids_servidores:
+            raise ValueError("Não há servidores para associar às prestações")
+
+        primeira_prestacao = _proximo_id(conexao, PrestacaoContas)
+        proximos_ids = {
+            "adiantamentos": _proximo_id(conexao, Adiantamento),
+            "despesas_diarias": _proximo_id(conexao, DespesaDiaria),
+            "documentos": _proximo_id(conexao, DocumentoComprovacao),
+            "passagens": _proximo_id(conexao, DespesaPassagem),
+        }
+        tabelas = (
+            (PrestacaoContas, "prestacoes"), (Adiantamento, "adiantamentos"), (DespesaDiaria, "despesas_diarias"),
+            (DocumentoComprovacao, "documentos"), (DespesaPassagem, "passagens"),
+        )
+        for inicio in range(0, prestacoes, tamanho_bloco):
+            ids_bloco = range(
+                primeira_prestacao + inicio, primeira_prestacao + min(inicio + tamanho_bloco, prestacoes)
+            )
+            linhas_bloco = _gerar_bloco_prestacoes(
+                rng_prestacoes, ids_bloco, ids_servidores, ids_presidentes, distribuicoes, proximos_ids
+            )
+            for (modelo, campo), linhas in zip(tabelas, linhas_bloco):
+                if linhas:
+                    _inserir(conexao, modelo, linhas)
+                    setattr(contagem, campo, getattr(contagem, campo) + len(linhas))
+            if confirmar_blocos:
+                conexao.commit()
+            if ao_progredir:
+                ao_progredir(contagem)
+
+        # A gravação não passa pela sessão do ORM (src/services/alteracoes.py):
+        # as versões usadas nos ETags das rotas GET são incrementadas aqui.
+        chaves = contagem.tabelas() + ([CHAVE_PRESTACOES] if contagem.prestacoes else [])
+        if chaves:
+            incrementar_versoes(conexao, chaves)
+            if confirmar_blocos:
+                conexao.commit()
+    return contagem
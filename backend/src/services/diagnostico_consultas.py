@@ -0,0 +1,156 @@
+"""Registro de consultas lentas e detecção de consultas repetidas (N+1) por requisição.
+
+Os eventos do Engine medem cada consulta. Com a requisição em andamento, as
+consultas são contadas por texto SQL (os parâmetros variam, o texto não); ao
+final, o texto executado mais vezes que o limite é registrado como provável
+N+1, por exemplo um carregamento preguiçoso de servidor dentro de um laço de
+to_dict(). As mensagens vão para app.logger com o método e a rota de origem.
+
+Configurações lidas de app.config:
+- CONSULTAS_LENTAS_MS: registra consultas com duração a partir deste valor,
+  em milissegundos; 0 desativa.
+- CONSULTAS_REPETIDAS_LIMITE: registra o texto SQL executado mais vezes que
+  este número em uma mesma requisição; 0 desativa.
+
+O plugin src/pytest_consultas.py usa observar() para limitar a quantidade de
+consultas por requisição nos testes.
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+import logging
+from time import perf_counter
+
+from flask import g, has_request_context, request, request_finished, request_started
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Tamanho máximo do texto SQL incluído nas mensagens.
+TAMANHO_MAXIMO_SQL = 500
+
+
+@dataclass
+class ResumoRequisicao:
+    """Consultas executadas durante uma requisição."""
+
+    metodo: str
+    rota: str
+    status: int
+    total: int
+    repeticoes: Counter = field(default_factory=Counter)
+
+    @property
+    def endpoint(self):
+        return f"{self.metodo} {self.rota}"
+
+
+def _origem():
+    """Descreve a requisição em andamento (método e rota), se houver."""
+    if not has_request_context():
+        return "fora de requisição"
+    return f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+
+
+def _resumir_sql(sql):
+    sql = " ".join(sql.split())
+    return sql if len(sql) <= TAMANHO_MAXIMO_SQL else sql[:TAMANHO_MAXIMO_SQL] + "..."
+
+
+class DiagnosticoConsultas:
+    """Consultas lentas e repetidas, registradas no log da aplicação.
+
+    Os eventos são registrados uma única vez e ficam inativos (apenas uma
+    verificação por consulta) quando os dois limites são 0 e não há
+    observadores.
+    """
+
+    def __init__(self, app=None):
+        self.limite_lenta = 0.0
+        self.limite_repeticoes = 0
+        self.logger = logging.getLogger(__name__)
+        self._observadores = []
+        self._instalado = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Lê os limites da configuração e registra os eventos."""
+        self.limite_lenta = float(app.config.get("CONSULTAS_LENTAS_MS", 0)) / 1000
+        self.limite_repeticoes = int(app.config.get("CONSULTAS_REPETIDAS_LIMITE", 0))
+        self.logger = app.logger
+        app.extensions["diagnostico_consultas"] = self
+        self._instalar()
+
+    @property
+    def ativo(self):
+        return bool(self.limite_lenta or self.limite_repeticoes or self._observadores)
+
+    def observar(self, funcao):
+        """Registra uma função chamada com o ResumoRequisicao ao final de cada requisição."""
+        self._instalar()
+        if funcao not in self._observadores:
+            self._observadores.append(funcao)
+        return funcao
+
+    def deixar_de_observar(self, funcao):
+        """Remove uma função registrada com observar()."""
+        if funcao in self._observadores:
+            self._observadores.remove(funcao)
+
+    def _instalar(self):
+        if self._instalado:
+            return
+        event.listen(Engine, "before_cursor_execute", self._inicio_consulta)
+        event.listen(Engine, "after_cursor_execute", self._fim_consulta)
+        # Sinais do Flask valem para qualquer aplicação, inclusive as criadas nos testes.
+        request_started.connect(self._iniciar_requisicao, weak=False)
+        request_finished.connect(self._finalizar_requisicao, weak=False)
+        self._instalado = True
+
+    def _iniciar_requisicao(self, sender, **extra):
+        if self.ativo:
+            g.diagnostico_consultas = {"total": 0, "repeticoes": Counter()}
+
+    def _inicio_consulta(self, conn, cursor, statement, parameters, context, executemany):
+        if self.ativo:
+            context._diagnostico_inicio = perf_counter()
+
+    def _fim_consulta(self, conn, cursor, statement, parameters, context, executemany):
+        inicio = getattr(context, "_diagnostico_inicio", None)
+        if inicio is None:
+            return
+        duracao = perf_counter() - inicio
+        if self.limite_lenta and duracao >= self.limite_lenta:
+            self.logger.warning(
+                "Consulta lenta (%.1f ms) em %s: %s", duracao * 1000, _origem(), _resumir_sql(statement)
+            )
+        if has_request_context():
+            estado = g.get("diagnostico_consultas")
+            if estado is not None:
+                estado["total"] += 1
+                estado["repeticoes"][statement] += 1
+
+    def _finalizar_requisicao(self, sender, response, **extra):
+        estado = g.pop("diagnostico_consultas", None)
+        if estado is None:
+            return
+        if self.limite_repeticoes:
+            for sql, vezes in estado["repeticoes"].items():
+                if vezes > self.limite_repeticoes:
+                    self.logger.warning(
+                        "Possível N+1 em %s: a mesma consulta foi executada %d vezes: %s",
+                        _origem(), vezes, _resumir_sql(sql)
+                    )
+        if self._observadores:
+            resumo = ResumoRequisicao(
+                metodo=request.method,
+                rota=request.url_rule.rule if request.url_rule else request.path,
+                status=response.status_code,
+                total=estado["total"],
+                repeticoes=estado["repeticoes"],
+            )
+            for funcao in list(self._observadores):
+                funcao(resumo)
+
+
+# Instância compartilhada, inicializada em src/main.py.
+diagnostico_consultas = DiagnosticoConsultas()
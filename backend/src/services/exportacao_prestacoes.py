@@ -0,0 +1,118 @@
+import csv
+import io
+import json
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import func
+
+from src.extensions import db
+from src.models.prestacao_contas import Servidor, Presidente, PrestacaoContas, Adiantamento
+from src.services.totais import calcular, consulta_entradas, entrada_de_linha, primeiro_registro
+
+# Quantidade de prestações lidas por consulta durante a exportação.
+TAMANHO_PAGINA_EXPORTACAO = 1000
+
+# Formatos de saída suportados.
+FORMATOS_EXPORTACAO = ("csv", "ndjson")
+
+# Colunas exportadas, na ordem do CSV.
+COLUNAS_EXPORTACAO = (
+    "id", "data_criacao", "servidor_id", "servidor", "cargo", "presidente",
+    "diarias_dentro_estado", "refeicoes_dentro_estado", "diarias_fora_estado", "refeicoes_fora_estado",
+    "total_diarias", "total_refeicoes", "total_geral", "valor_adiantamento_diaria", "diferenca",
+    "total_passagens", "valor_adiantamento_passagem",
+)
+
+
+def _consulta_exportacao():
+    """Monta a consulta que retorna cada prestação com as entradas do cálculo de totais."""
+    # Primeiro adiantamento de passagem, como nos PDFs.
+    adiantamento_passagem = db.aliased(Adiantamento)
+
+    return (
+        consulta_entradas()
+        .add_columns(
+            PrestacaoContas.data_criacao,
+            PrestacaoContas.servidor_id,
+            Servidor.nome.label("servidor"),
+            Servidor.cargo.label("cargo"),
+            Presidente.nome.label("presidente"),
+            func.coalesce(adiantamento_passagem.valor, 0.0).label("valor_adiantamento_passagem"),
+        )
+        .outerjoin(Presidente, Presidente.id == PrestacaoContas.presidente_id)
+        .outerjoin(adiantamento_passagem, adiantamento_passagem.id == primeiro_registro(
+            Adiantamento, Adiantamento.tipo == "passagem"
+        ))
+    )
+
+
+def _formatar_linha(linha):
+    entrada = entrada_de_linha(linha)
+    totais = calcular(entrada)
+    return {
+        "id": linha.prestacao_id,
+        "data_criacao": linha.data_criacao.isoformat() if linha.data_criacao else None,
+        "servidor_id": linha.servidor_id,
+        "servidor": linha.servidor,
+        "cargo": linha.cargo,
+        "presidente": linha.presidente,
+        "diarias_dentro_estado": entrada.diarias_dentro_estado,
+        "refeicoes_dentro_estado": entrada.refeicoes_dentro_estado,
+        "diarias_fora_estado": entrada.diarias_fora_estado,
+        "refeicoes_fora_estado": entrada.refeicoes_fora_estado,
+        "total_diarias": float(totais.total_diarias),
+        "total_refeicoes": float(totais.total_refeicoes),
+        "total_geral": float(totais.total_geral),
+        "valor_adiantamento_diaria": float(totais.valor_adiantamento_diaria),
+        "diferenca": float(totais.diferenca),
+        "total_passagens": round(float(entrada.total_passagens), 2),
+        "valor_adiantamento_passagem": round(float(linha.valor_adiantamento_passagem), 2),
+    }
+
+
+def iterar_prestacoes(data_inicio=None, data_fim=None, servidor_id=None,
+                      tamanho_pagina=TAMANHO_PAGINA_EXPORTACAO):
+    """Gera as prestações com seus totais, em ordem de criação, com memória constante.
+
+    As prestações são lidas em páginas por cursor (data_criacao, id), de modo
+    que apenas uma página fica em memória por vez. As datas são inclusivas.
+    """
+    consulta = _consulta_exportacao()
+    if servidor_id is not None:
+        consulta = consulta.where(PrestacaoContas.servidor_id == servidor_id)
+    if data_inicio:
+        consulta = consulta.where(PrestacaoContas.data_criacao >= datetime.combine(data_inicio, time.min))
+    if data_fim:
+        consulta = consulta.where(PrestacaoContas.data_criacao < datetime.combine(data_fim + timedelta(days=1), time.min))
+    consulta = consulta.order_by(PrestacaoContas.data_criacao, PrestacaoContas.id).limit(tamanho_pagina)
+
+    cursor = None
+    while True:
+        pagina = consulta
+        if cursor:
+            pagina = pagina.where(db.tuple_(PrestacaoContas.data_criacao, PrestacaoContas.id) > cursor)
+        linhas = db.session.execute(pagina).all()
+        for linha in linhas:
+            yield _formatar_linha(linha)
+        if len(linhas) < tamanho_pagina:
+            break
+        cursor = (linhas[-1].data_criacao, linhas[-1].prestacao_id)
+
+
+def serializar(registros, formato):
+    """Converte os registros exportados em blocos de texto CSV ou NDJSON."""
+    if formato == "ndjson":
+        for registro in registros:
+            yield json.dumps(registro, ensure_ascii=False) + "\n"
+        return
+
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, fieldnames=COLUNAS_EXPORTACAO)
+    escritor.writeheader()
+    for numero, registro in enumerate(registros, start=1):
+        escritor.writerow(registro)
+        if numero % TAMANHO_PAGINA_EXPORTACAO == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -0,0 +1,295 @@
+"""Importação em streaming de prestações de contas históricas com todos os registros filhos.
+
+Formatos aceitos (um registro por prestação):
+
+- NDJSON: um objeto por linha, por exemplo
+  {"servidor": "Nome", "presidente": "Nome", "data_criacao": "2021-03-04",
+   "adiantamentos": [{"tipo": "diaria", "numero_adiantamento": "1", "numero_empenho": "2",
+                      "valor": 500.0, "data_adiantamento": "2021-03-01"}],
+   "despesa_diaria": {"diarias_dentro_estado": 2, "refeicoes_dentro_estado": 1,
+                      "diarias_fora_estado": 0, "refeicoes_fora_estado": 0},
+   "documentos": [{"tipo_documento": "nota_fiscal", "descricao": "...",
+                   "data_documento": "2021-03-02", "valor": 120.0}],
+   "passagens": [{"bpe": "123", "valor": 150.0, "tipo_viagem": "ida"}]}
+
+- CSV com cabeçalho: servidor, presidente, data_criacao, diarias_dentro_estado,
+  refeicoes_dentro_estado, diarias_fora_estado, refeicoes_fora_estado e as colunas
+  adiantamentos, documentos e passagens contendo listas JSON como acima.
+
+Servidores e presidentes são resolvidos pelo nome exato com um índice em memória.
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from itertools import islice
+
+from src.extensions import db
+from src.models.prestacao_contas import (
+    Servidor, Presidente, PrestacaoContas,
+    Adiantamento, DespesaDiaria, DocumentoComprovacao, DespesaPassagem
+)
+from src.services import alteracoes
+from src.services.carga_lote import ErroValidacao, ler_ndjson, validar_texto, validar_numero
+
+# Quantidade de prestações gravadas em cada transação.
+TAMANHO_LOTE_IMPORTACAO = 500
+
+# Formatos de arquivo suportados.
+FORMATOS_IMPORTACAO = ("ndjson", "csv")
+
+# Colunas de quantidades de diárias e refeições.
+CAMPOS_DESPESA_DIARIA = (
+    "diarias_dentro_estado", "refeicoes_dentro_estado",
+    "diarias_fora_estado", "refeicoes_fora_estado"
+)
+
+# Colunas do CSV que contêm listas JSON.
+COLUNAS_JSON_CSV = ("adiantamentos", "documentos", "passagens")
+
+
+def ler_csv(fluxo_texto, pular_ate=0):
+    """Lê um CSV com cabeçalho, gerando (número da linha, registro ou exceção)."""
+    leitor = csv.DictReader(fluxo_texto)
+    for linha in leitor:
+        numero = leitor.line_num
+        if numero <= pular_ate:
+            continue
+        try:
+            registro = {
+                "servidor": linha.get("servidor"),
+                "presidente": linha.get("presidente"),
+                "data_criacao": linha.get("data_criacao") or None,
+                "despesa_diaria": {
+                    campo: int(linha[campo]) for campo in CAMPOS_DESPESA_DIARIA if linha.get(campo)
+                },
+            }
+            for coluna in COLUNAS_JSON_CSV:
+                registro[coluna] = json.loads(linha[coluna]) if linha.get(coluna) else []
+            yield numero, registro
+        except ValueError as e:
+            yield numero, ErroValidacao(f"Linha CSV inválida: {e}")
+
+
+def ler_fluxo(fluxo_binario, formato, pular_ate=0):
+    """Gera (linha, registro) a partir de um fluxo binário no formato informado."""
+    if formato == "ndjson":
+        return ler_ndjson(fluxo_binario, pular_ate)
+    if formato == "csv":
+        return ler_csv(io.TextIOWrapper(fluxo_binario, encoding="utf-8-sig", newline=""), pular_ate)
+    raise ErroValidacao(f"Formato inválido: {formato}")
+
+
+def _data(valor, campo, obrigatorio=False, com_hora=False):
+    if not valor:
+        if obrigatorio:
+            raise ErroValidacao(f"{campo} é obrigatório")
+        return None
+    try:
+        data = datetime.fromisoformat(valor) if isinstance(valor, str) else None
+    except ValueError:
+        data = None
+    if data is None:
+        raise ErroValidacao(f"{campo} deve estar no formato AAAA-MM-DD")
+    return data if com_hora else data.date()
+
+
+def _lista(registro, campo):
+    valor = registro.get(campo) or []
+    if not isinstance(valor, list) or not all(isinstance(item, dict) for item in valor):
+        raise ErroValidacao(f"{campo} deve ser uma lista de objetos")
+    return valor
+
+
+def _opcao(registro, campo, opcoes, obrigatorio=True):
+    valor = registro.get(campo)
+    if valor is None and not obrigatorio:
+        return None
+    if valor not in opcoes:
+        raise ErroValidacao(f"{campo} deve ser um de: {', '.join(opcoes)}")
+    return valor
+
+
+def _mapeamento(campos, novo):
+    """Na criação, mantém todos os campos; na alteração, apenas os informados."""
+    return campos if novo else {campo: valor for campo, valor in campos.items() if valor is not None}
+
+
+def validar_adiantamento(item, novo=True):
+    """Valida um adiantamento; com novo=False, os campos ausentes são omitidos."""
+    return _mapeamento({
+        "tipo": _opcao(item, "tipo", ("diaria", "passagem"), novo),
+        "numero_adiantamento": validar_texto(item, "numero_adiantamento", novo, 50),
+        "numero_empenho": validar_texto(item, "numero_empenho", novo, 50),
+        "valor": validar_numero(item, "valor", novo),
+        "data_adiantamento": _data(item.get("data_adiantamento"), "data_adiantamento", obrigatorio=novo),
+    }, novo)
+
+
+def validar_despesa_diaria(despesa, novo=True):
+    """Valida as quantidades de diárias e refeições (ausentes valem 0 na criação)."""
+    if not isinstance(despesa, dict):
+        raise ErroValidacao("despesa_diaria deve ser um objeto")
+    mapeamento = {}
+    for campo in CAMPOS_DESPESA_DIARIA:
+        if campo not in despesa and not novo:
+            continue
+        valor = despesa.get(campo, 0)
+        if isinstance(valor, bool) or not isinstance(valor, int) or valor < 0:
+            raise ErroValidacao(f"{campo} deve ser um inteiro não negativo")
+        mapeamento[campo] = valor
+    return mapeamento
+
+
+def validar_documento(item, novo=True):
+    """Valida um documento de comprovação; com novo=False, os campos ausentes são omitidos."""
+    return _mapeamento({
+        "tipo_documento": validar_texto(item, "tipo_documento", novo, 50),
+        "descricao": validar_texto(item, "descricao", novo, 10000),
+        "data_documento": _data(item.get("data_documento"), "data_documento"),
+        "valor": validar_numero(item, "valor", False),
+    }, novo)
+
+
+def validar_passagem(item, novo=True):
+    """Valida uma despesa de passagem; com novo=False, os campos ausentes são omitidos."""
+    return _mapeamento({
+        "bpe": validar_texto(item, "bpe", novo, 50),
+        "valor": validar_numero(item, "valor", novo),
+        "tipo_viagem": _opcao(item, "tipo_viagem", ("ida", "volta"), novo),
+    }, novo)
+
+
+class IndiceNomes:
+    """Índice em memória de nome para ID de um modelo (servidores ou presidentes)."""
+
+    def __init__(self, modelo):
+        self.modelo = modelo
+        self.ids = {}
+        self.ambiguos = set()
+        for id_, nome in db.session.query(modelo.id, modelo.nome):
+            if nome in self.ids:
+                self.ambiguos.add(nome)
+            self.ids[nome] = id_
+
+    def resolver(self, nome, campo):
+        if not isinstance(nome, str) or not nome.strip():
+            raise ErroValidacao(f"{campo} é obrigatório")
+        if nome in self.ambiguos:
+            raise ErroValidacao(f"{campo} '{nome}' corresponde a mais de um cadastro")
+        if nome not in self.ids:
+            raise ErroValidacao(f"{campo} '{nome}' não encontrado")
+        return self.ids[nome]
+
+
+def validar_prestacao(registro, servidores, presidentes):
+    """Valida um registro e o converte nos mapeamentos de cada tabela."""
+    if not isinstance(registro, dict):
+        raise ErroValidacao("Registro deve ser um objeto JSON")
+
+    prestacao = {
+        "servidor_id": servidores.resolver(registro.get("servidor"), "servidor"),
+        "presidente_id": presidentes.resolver(registro.get("presidente"), "presidente"),
+    }
+    data_criacao = _data(registro.get("data_criacao"), "data_criacao", com_hora=True)
+    if data_criacao:
+        prestacao["data_criacao"] = data_criacao
+
+    adiantamentos = [validar_adiantamento(item) for item in _lista(registro, "adiantamentos")]
+    despesa = registro.get("despesa_diaria")
+    despesas = [validar_despesa_diaria(despesa)] if despesa else []
+    documentos = [validar_documento(item) for item in _lista(registro, "documentos")]
+    passagens = [validar_passagem(item) for item in _lista(registro, "passagens")]
+
+    return {
+        PrestacaoContas: prestacao,
+        Adiantamento: adiantamentos,
+        DespesaDiaria: despesas,
+        DocumentoComprovacao: documentos,
+        DespesaPassagem: passagens,
+    }
+
+
+def _gravar_bloco(validos):
+    """Grava um bloco de prestações validadas e seus filhos em uma única transação."""
+    prestacoes = [mapeamentos[PrestacaoContas] for mapeamentos in validos]
+    db.session.bulk_insert_mappings(PrestacaoContas, prestacoes, return_defaults=True)
+
+    for modelo in (Adiantamento, DespesaDiaria, DocumentoComprovacao, DespesaPassagem):
+        filhos = []
+        for mapeamentos in validos:
+            prestacao_id = mapeamentos[PrestacaoContas]["id"]
+            for filho in mapeamentos[modelo]:
+                filho["prestacao_id"] = prestacao_id
+                filhos.append(filho)
+        if filhos:
+            db.session.bulk_insert_mappings(modelo, filhos)
+
+    alteracoes.marcar_alteracoes(db.session, prestacao_ids=[p["id"] for p in prestacoes])
+    db.session.commit()
+
+
+def importar_prestacoes(registros, tamanho_lote=TAMANHO_LOTE_IMPORTACAO):
+    """Importa (linha, registro) em transações de até `tamanho_lote` prestações.
+
+    Após gravar cada bloco, gera um dicionário de progresso com a última linha
+    confirmada ("linha"), os totais acumulados e os erros de validação do bloco.
+    Registros inválidos são ignorados; falhas de gravação interrompem a
+    importação com a transação do bloco desfeita, de modo que ela pode ser
+    retomada a partir da última linha confirmada.
+    """
+    servidores = IndiceNomes(Servidor)
+    presidentes = IndiceNomes(Presidente)
+    progresso = {"linha": 0, "importadas": 0, "erros": 0}
+    registros = iter(registros)
+
+    while True:
+        bloco = list(islice(registros, tamanho_lote))
+        if not bloco:
+            break
+        validos = []
+        erros = []
+        for linha, registro in bloco:
+            try:
+                if isinstance(registro, Exception):
+                    raise registro
+                validos.append(validar_prestacao(registro, servidores, presidentes))
+            except ErroValidacao as e:
+                erros.append({"linha": linha, "erro": str(e)})
+
+        if validos:
+            try:
+                _gravar_bloco(validos)
+            except Exception:
+                db.session.rollback()
+                raise
+
+        progresso["linha"] = bloco[-1][0]
+        progresso["importadas"] += len(validos)
+        progresso["erros"] += len(erros)
+        yield dict(progresso, erros_bloco=erros)
+
+
+def ler_checkpoint(caminho, arquivo):
+    """Retorna a última linha confirmada registrada no checkpoint para o arquivo, ou 0."""
+    if not caminho or not os.path.exists(caminho):
+        return 0
+    with open(caminho, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("arquivo") != os.path.abspath(arquivo):
+        raise ErroValidacao("O checkpoint informado pertence a outro arquivo")
+    return int(checkpoint.get("linha", 0))
+
+
+def gravar_checkpoint(caminho, arquivo, progresso):
+    """Grava o progresso da importação de forma atômica."""
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump({
+            "arquivo": os.path.abspath(arquivo),
+            "linha": progresso["linha"],
+            "importadas": progresso["importadas"],
+            "erros": progresso["erros"],
+        }, f)
+    os.replace(temporario, caminho)
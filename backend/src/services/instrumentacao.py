@@ -0,0 +1,254 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+import threading
+from time import perf_counter
+
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Limites (em segundos) dos buckets do histograma de duração das requisições.
+BUCKETS_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Fases medidas em cada requisição, na ordem do cabeçalho Server-Timing.
+FASES = ("jwt", "sql", "serializacao", "pdf")
+
+# Prefixo dos nomes das métricas expostas no formato do Prometheus.
+PREFIXO_METRICAS = "prestcont"
+
+
+class Instrumentacao:
+    """Medição opcional do tempo gasto em cada fase das requisições.
+
+    Habilitada, registra por requisição o tempo de verificação do JWT, a
+    quantidade e o tempo das consultas SQL (eventos do Engine), o tempo de
+    serialização (to_dict dos modelos e geração do JSON) e o de geração de
+    PDFs. Os tempos vão no cabeçalho Server-Timing da resposta e são somados
+    nas métricas de medidas_prometheus() (GET /api/metrics). As fases podem se
+    sobrepor: uma consulta feita dentro de to_dict conta em sql e em
+    serializacao. Desabilitada, nenhum evento ou hook é registrado e medir()
+    apenas confere um atributo.
+
+    Configurações lidas de app.config:
+    - INSTRUMENTACAO: habilita a medição (padrão: desabilitada).
+    - INSTRUMENTACAO_METRICAS_TOKEN: se definido, GET /api/metrics exige o
+      cabeçalho "Authorization: Bearer <token>".
+    """
+
+    def __init__(self, app=None):
+        self.habilitada = False
+        self.token_metricas = None
+        self._trava = threading.Lock()
+        self._zerar()
+        if app is not None:
+            self.init_app(app)
+
+    def _zerar(self):
+        self._requisicoes = defaultdict(int)
+        self._histogramas = defaultdict(lambda: [0] * (len(BUCKETS_DURACAO) + 1))
+        self._duracoes = defaultdict(float)
+        self._fases = defaultdict(float)
+        self._consultas = defaultdict(int)
+
+    def init_app(self, app):
+        """Registra os hooks de medição se a instrumentação estiver habilitada."""
+        self.habilitada = bool(app.config.get("INSTRUMENTACAO", False))
+        self.token_metricas = app.config.get("INSTRUMENTACAO_METRICAS_TOKEN") or None
+        with self._trava:
+            self._zerar()
+        app.extensions["instrumentacao"] = self
+        if not self.habilitada:
+            return
+
+        app.before_request(self._iniciar_requisicao)
+        app.after_request(self._finalizar_requisicao)
+        if not event.contains(Engine, "before_cursor_execute", _inicio_consulta):
+            event.listen(Engine, "before_cursor_execute", _inicio_consulta)
+            event.listen(Engine, "after_cursor_execute", _fim_consulta)
+        _medir_verificacao_jwt()
+        _medir_modelos()
+        app.json = ProvedorJSONMedido(app)
+
+    def _iniciar_requisicao(self):
+        g.instrumentacao = {"inicio": perf_counter(), "consultas": 0, "fases": dict.fromkeys(FASES, 0.0)}
+
+    def _finalizar_requisicao(self, resposta):
+        medidas = g.pop("instrumentacao", None)
+        if medidas is None:
+            return resposta
+        duracao = perf_counter() - medidas["inicio"]
+        fases = medidas["fases"]
+
+        valores = []
+        for fase in FASES:
+            if fase == "sql" and medidas["consultas"]:
+                valores.append(f'sql;dur={fases[fase] * 1000:.2f};desc="{medidas["consultas"]} consultas"')
+            elif fases[fase]:
+                valores.append(f"{fase};dur={fases[fase] * 1000:.2f}")
+        valores.append(f"total;dur={duracao * 1000:.2f}")
+        resposta.headers["Server-Timing"] = ", ".join(valores)
+
+        rota = request.url_rule.rule if request.url_rule else "desconhecida"
+        self.registrar(request.method, rota, resposta.status_code, duracao, fases, medidas["consultas"])
+        return resposta
+
+    def registrar(self, metodo, rota, status, duracao, fases, consultas):
+        """Soma as medidas de uma requisição às métricas acumuladas do processo."""
+        with self._trava:
+            self._requisicoes[(metodo, rota, str(status))] += 1
+            histograma = self._histogramas[rota]
+            histograma[next((i for i, limite in enumerate(BUCKETS_DURACAO) if duracao <= limite),
+                            len(BUCKETS_DURACAO))] += 1
+            self._duracoes[rota] += duracao
+            for fase, segundos in fases.items():
+                if segundos:
+                    self._fases[(rota, fase)] += segundos
+            self._consultas[rota] += consultas
+
+    def medidas_prometheus(self):
+        """Retorna as métricas acumuladas no formato de texto do Prometheus."""
+        with self._trava:
+            requisicoes = dict(self._requisicoes)
+            histogramas = {rota: list(contagens) for rota, contagens in self._histogramas.items()}
+            duracoes = dict(self._duracoes)
+            fases = dict(self._fases)
+            consultas = dict(self._consultas)
+
+        linhas = [
+            f"# HELP {PREFIXO_METRICAS}_requisicoes_total Requisições atendidas.",
+            f"# TYPE {PREFIXO_METRICAS}_requisicoes_total counter",
+        ]
+        for (metodo, rota, status), total in sorted(requisicoes.items()):
+            linhas.append(
+                f"{PREFIXO_METRICAS}_requisicoes_total{_rotulos(metodo=metodo, rota=rota, status=status)} {total}"
+            )
+
+        linhas += [
+            f"# HELP {PREFIXO_METRICAS}_requisicao_duracao_segundos Duração das requisições.",
+            f"# TYPE {PREFIXO_METRICAS}_requisicao_duracao_segundos histogram",
+        ]
+        for rota, contagens in sorted(histogramas.items()):
+            acumulado = 0
+            for limite, contagem in zip(BUCKETS_DURACAO + ("+Inf",), contagens):
+                acumulado += contagem
+                linhas.append(
+                    f"{PREFIXO_METRICAS}_requisicao_duracao_segundos_bucket{_rotulos(rota=rota, le=str(limite))} {acumulado}"
+                )
+            linhas.append(f"{PREFIXO_METRICAS}_requisicao_duracao_segundos_sum{_rotulos(rota=rota)} {duracoes[rota]:.6f}")
+            linhas.append(f"{PREFIXO_METRICAS}_requisicao_duracao_segundos_count{_rotulos(rota=rota)} {acumulado}")
+
+        linhas += [
+            f"# HELP {PREFIXO_METRICAS}_fase_segundos_total Tempo gasto em cada fase das requisições.",
+            f"# TYPE {PREFIXO_METRICAS}_fase_segundos_total counter",
+        ]
+        for (rota, fase), segundos in sorted(fases.items()):
+            linhas.append(f"{PREFIXO_METRICAS}_fase_segundos_total{_rotulos(rota=rota, fase=fase)} {segundos:.6f}")
+
+        linhas += [
+            f"# HELP {PREFIXO_METRICAS}_sql_consultas_total Consultas SQL executadas pelas requisições.",
+            f"# TYPE {PREFIXO_METRICAS}_sql_consultas_total counter",
+        ]
+        for rota, total in sorted(consultas.items()):
+            linhas.append(f"{PREFIXO_METRICAS}_sql_consultas_total{_rotulos(rota=rota)} {total}")
+        return "\n".join(linhas) + "\n"
+
+
+def _escapar(valor):
+    """Escapa um valor de rótulo conforme o formato de texto do Prometheus."""
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _rotulos(**rotulos):
+    """Formata os rótulos de uma métrica."""
+    return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in rotulos.items()) + "}"
+
+
+def _medidas_requisicao():
+    """Retorna as medidas da requisição atual, ou None se não houver medição em curso."""
+    if not instrumentacao.habilitada or not has_request_context():
+        return None
+    return g.get("instrumentacao")
+
+
+@contextmanager
+def medir(fase):
+    """Soma à fase informada o tempo do bloco, se houver medição em curso.
+
+    Blocos aninhados da mesma fase contam apenas uma vez.
+    """
+    medidas = _medidas_requisicao()
+    if medidas is None or medidas.get(("em", fase)):
+        yield
+        return
+    medidas[("em", fase)] = True
+    inicio = perf_counter()
+    try:
+        yield
+    finally:
+        medidas["fases"][fase] += perf_counter() - inicio
+        medidas[("em", fase)] = False
+
+
+def medido(fase):
+    """Decorador equivalente a medir(fase) para funções."""
+    def decorador(funcao):
+        @wraps(funcao)
+        def funcao_medida(*args, **kwargs):
+            with medir(fase):
+                return funcao(*args, **kwargs)
+        funcao_medida.medida = True
+        return funcao_medida
+    return decorador
+
+
+def _inicio_consulta(conn, cursor, statement, parameters, context, executemany):
+    medidas = _medidas_requisicao()
+    if medidas is not None:
+        context._instrumentacao_inicio = perf_counter()
+
+
+def _fim_consulta(conn, cursor, statement, parameters, context, executemany):
+    medidas = _medidas_requisicao()
+    inicio = getattr(context, "_instrumentacao_inicio", None)
+    if medidas is not None and inicio is not None:
+        medidas["consultas"] += 1
+        medidas["fases"]["sql"] += perf_counter() - inicio
+
+
+def _medir_verificacao_jwt():
+    """Mede a verificação do token feita por @jwt_required().
+
+    O decorador chama verify_jwt_in_request pelo nome do seu módulo, que é
+    substituído aqui por uma versão medida (apenas com a instrumentação habilitada).
+    """
+    from flask_jwt_extended import view_decorators
+    if not getattr(view_decorators.verify_jwt_in_request, "medida", False):
+        view_decorators.verify_jwt_in_request = medido("jwt")(view_decorators.verify_jwt_in_request)
+
+
+def _medir_modelos():
+    """Mede o to_dict de todos os modelos registrados no SQLAlchemy."""
+    from src.extensions import db
+    for mapeador in db.Model.registry.mappers:
+        modelo = mapeador.class_
+        to_dict = modelo.__dict__.get("to_dict")
+        if to_dict is not None and not getattr(to_dict, "medida", False):
+            modelo.to_dict = medido("serializacao")(to_dict)
+
+
+class ProvedorJSONMedido(DefaultJSONProvider):
+    """Provedor JSON do Flask que mede a geração do JSON como serialização."""
+
+    def dumps(self, obj, **kwargs):
+        with medir("serializacao"):
+            return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        with medir("serializacao"):
+            return super().response(*args, **kwargs)
+
+
+# Instância compartilhada, inicializada em src/main.py.
+instrumentacao = Instrumentacao()
@@ -0,0 +1,146 @@
+"""Gravação em uma única transação de várias alterações nos registros de uma prestação.
+
+Cada operação é um objeto {"acao", "recurso", "id", "dados"}:
+
+- acao: "criar", "atualizar" ou "remover";
+- recurso: "adiantamentos", "despesas_diarias", "documentos" ou "despesas_passagens";
+- id: registro alterado ou removido (dispensado em despesas_diarias, que tem
+  um registro por prestação: "atualizar" sem id altera ou cria esse registro,
+  como o PUT de /despesas-diarias);
+- dados: campos do registro, validados como na importação; em "atualizar",
+  apenas os campos informados são alterados.
+
+As operações são aplicadas em ordem e confirmadas em um único commit; um erro
+em qualquer uma delas desfaz todas.
+"""
+from src.extensions import db
+from src.models.prestacao_contas import (
+    Adiantamento, DespesaDiaria, DocumentoComprovacao, DespesaPassagem
+)
+from src.services.carga_lote import ErroValidacao
+from src.services.importacao_prestacoes import (
+    validar_adiantamento, validar_despesa_diaria, validar_documento, validar_passagem
+)
+
+# Ações aceitas em cada operação.
+ACOES = ("criar", "atualizar", "remover")
+
+# Modelo e validador de cada recurso.
+RECURSOS = {
+    "adiantamentos": (Adiantamento, validar_adiantamento),
+    "despesas_diarias": (DespesaDiaria, validar_despesa_diaria),
+    "documentos": (DocumentoComprovacao, validar_documento),
+    "despesas_passagens": (DespesaPassagem, validar_passagem),
+}
+
+# Número máximo de operações por requisição.
+LIMITE_OPERACOES = 500
+
+
+class ErroOperacao(ValueError):
+    """Erro em uma operação do lote, com o índice da operação (a partir de 0)."""
+
+    def __init__(self, indice, mensagem, nao_encontrado=False):
+        super().__init__(mensagem)
+        self.indice = indice
+        self.nao_encontrado = nao_encontrado
+
+
+def validar_operacoes(operacoes):
+    """Valida a estrutura e os dados das operações; retorna (acao, recurso, id, mapeamento)."""
+    if not isinstance(operacoes, list) or not operacoes:
+        raise ErroValidacao("operacoes deve ser uma lista não vazia")
+    if len(operacoes) > LIMITE_OPERACOES:
+        raise ErroValidacao(f"Máximo de {LIMITE_OPERACOES} operações por requisição")
+
+    validas = []
+    for indice, operacao in enumerate(operacoes):
+        try:
+            if not isinstance(operacao, dict):
+                raise ErroValidacao("Operação deve ser um objeto")
+            acao = operacao.get("acao")
+            if acao not in ACOES:
+                raise ErroValidacao(f"acao deve ser um de: {', '.join(ACOES)}")
+            recurso = operacao.get("recurso")
+            if recurso not in RECURSOS:
+                raise ErroValidacao(f"recurso deve ser um de: {', '.join(RECURSOS)}")
+            registro_id = operacao.get("id")
+            if registro_id is not None and (isinstance(registro_id, bool) or not isinstance(registro_id, int)):
+                raise ErroValidacao("id deve ser um inteiro")
+            if acao == "criar" and registro_id is not None:
+                raise ErroValidacao("id não deve ser informado ao criar")
+            if acao != "criar" and registro_id is None and recurso != "despesas_diarias":
+                raise ErroValidacao("id é obrigatório para atualizar ou remover")
+
+            mapeamento = None
+            if acao != "remover":
+                dados = operacao.get("dados")
+                if not isinstance(dados, dict):
+                    raise ErroValidacao("dados deve ser um objeto")
+                _, validar = RECURSOS[recurso]
+                mapeamento = validar(dados, novo=acao == "criar")
+            validas.append((acao, recurso, registro_id, mapeamento))
+        except ErroValidacao as e:
+            raise ErroOperacao(indice, str(e))
+    return validas
+
+
+def _carregar_existentes(prestacao_id, validas):
+    """Busca, com uma consulta por recurso, os registros da prestação que serão alterados."""
+    existentes = {}
+    for recurso, (modelo, _) in RECURSOS.items():
+        ids = {registro_id for _, r, registro_id, _ in validas if r == recurso and registro_id is not None}
+        if recurso == "despesas_diarias" and any(r == recurso for _, r, _, _ in validas):
+            # A despesa de diária da prestação é a de menor ID, como em GET /despesas-diarias.
+            consulta = modelo.query.filter(modelo.prestacao_id == prestacao_id).order_by(modelo.id)
+        elif ids:
+            consulta = modelo.query.filter(modelo.prestacao_id == prestacao_id, modelo.id.in_(ids))
+        else:
+            continue
+        existentes[recurso] = {registro.id: registro for registro in consulta}
+    return existentes
+
+
+def aplicar_operacoes(prestacao_id, operacoes):
+    """Valida e aplica as operações na prestação em uma única transação.
+
+    Levanta ErroValidacao (estrutura da lista) ou ErroOperacao (operação
+    inválida ou registro inexistente); nesses casos nada é gravado.
+    """
+    validas = validar_operacoes(operacoes)
+    existentes = _carregar_existentes(prestacao_id, validas)
+    removidos = set()
+    try:
+        for indice, (acao, recurso, registro_id, mapeamento) in enumerate(validas):
+            modelo, _ = RECURSOS[recurso]
+            registros = existentes.setdefault(recurso, {})
+
+            if recurso == "despesas_diarias" and registro_id is None:
+                registro = next((r for r in registros.values() if r not in removidos), None)
+                if acao == "criar" and registro is not None:
+                    raise ErroOperacao(indice, "A prestação já possui despesa de diária; use atualizar")
+                if acao == "remover" and registro is None:
+                    raise ErroOperacao(indice, "Despesa de diária não encontrada", nao_encontrado=True)
+            elif registro_id is not None:
+                registro = registros.get(registro_id)
+                if registro is None or registro in removidos:
+                    raise ErroOperacao(indice, f"Registro {registro_id} de {recurso} não encontrado nesta prestação",
+                                       nao_encontrado=True)
+            else:
+                registro = None
+
+            if acao == "remover":
+                db.session.delete(registro)
+                removidos.add(registro)
+                continue
+            if registro is None:
+                registro = modelo(prestacao_id=prestacao_id)
+                db.session.add(registro)
+                # O ID só existe após o flush; a chave provisória mantém a ordem de criação.
+                registros[("novo", indice)] = registro
+            for campo, valor in mapeamento.items():
+                setattr(registro, campo, valor)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
@@ -0,0 +1,306 @@
+"""Migrações versionadas do esquema do banco de dados.
+
+Cada migração é um módulo em src/migrations chamado vNNNN_descricao.py, com:
+
+- VERSAO: número inteiro igual ao NNNN do nome do arquivo;
+- DESCRICAO: texto curto registrado na tabela schema_versao;
+- aplicar(conexao): função que recebe uma Connection do SQLAlchemy;
+- TRANSACIONAL (opcional, padrão True): com False, a migração roda em modo
+  autocommit, necessário para CREATE INDEX CONCURRENTLY no PostgreSQL.
+
+As versões aplicadas ficam na tabela schema_versao. Na inicialização, a
+aplicação apenas compara a maior versão registrada com a última migração
+conhecida, sem inspecionar as demais tabelas.
+"""
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+import importlib
+import os
+import pkgutil
+import re
+import unicodedata
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import sqlalchemy as sa
+from flask import jsonify
+
+# Tabela com as versões de esquema já aplicadas.
+TABELA_VERSAO = "schema_versao"
+
+tabela_versao = sa.Table(
+    TABELA_VERSAO, sa.MetaData(),
+    sa.Column("versao", sa.Integer, primary_key=True, autoincrement=False),
+    sa.Column("descricao", sa.String(200), nullable=False),
+    sa.Column("aplicada_em", sa.DateTime, nullable=False),
+)
+
+# Pacote e padrão de nome dos módulos de migração.
+PACOTE_MIGRACOES = "src.migrations"
+PADRAO_MODULO = re.compile(r"^v(\d{4})_[a-z0-9_]+$")
+
+# Chave do advisory lock do PostgreSQL que serializa execuções simultâneas.
+CHAVE_BLOQUEIO_PG = 7_415_003
+
+# Sufixo do arquivo de bloqueio criado ao lado do banco SQLite.
+SUFIXO_BLOQUEIO_SQLITE = ".migracao.lock"
+
+
+class ErroMigracao(RuntimeError):
+    """Erro na definição ou na aplicação das migrações."""
+
+
+@dataclass(frozen=True)
+class Migracao:
+    versao: int
+    descricao: str
+    nome: str
+    transacional: bool
+    aplicar: object
+
+
+_migracoes = None
+
+
+def carregar_migracoes():
+    """Importa e valida os módulos de migração, em ordem de versão."""
+    global _migracoes
+    if _migracoes is not None:
+        return _migracoes
+
+    pacote = importlib.import_module(PACOTE_MIGRACOES)
+    migracoes = []
+    for modulo_info in pkgutil.iter_modules(pacote.__path__):
+        encontrado = PADRAO_MODULO.match(modulo_info.name)
+        if not encontrado:
+            continue
+        modulo = importlib.import_module(f"{PACOTE_MIGRACOES}.{modulo_info.name}")
+        versao = int(encontrado.group(1))
+        if getattr(modulo, "VERSAO", None) != versao:
+            raise ErroMigracao(f"{modulo_info.name}: VERSAO deve ser {versao}")
+        migracoes.append(Migracao(
+            versao=versao,
+            descricao=modulo.DESCRICAO,
+            nome=modulo_info.name,
+            transacional=getattr(modulo, "TRANSACIONAL", True),
+            aplicar=modulo.aplicar,
+        ))
+
+    migracoes.sort(key=lambda migracao: migracao.versao)
+    versoes = [migracao.versao for migracao in migracoes]
+    if versoes != list(range(1, len(versoes) + 1)):
+        raise ErroMigracao(f"As versões das migrações devem ser sequenciais a partir de 1: {versoes}")
+    _migracoes = migracoes
+    return migracoes
+
+
+def versao_mais_recente():
+    """Retorna a versão da última migração conhecida pelo código."""
+    migracoes = carregar_migracoes()
+    return migracoes[-1].versao if migracoes else 0
+
+
+def versao_atual(conexao):
+    """Retorna a maior versão aplicada ao banco (0 se nenhuma)."""
+    if not sa.inspect(conexao).has_table(TABELA_VERSAO):
+        return 0
+    return conexao.execute(sa.select(sa.func.max(tabela_versao.c.versao))).scalar() or 0
+
+
+def versoes_aplicadas(conexao):
+    """Retorna as linhas de schema_versao em ordem de versão."""
+    if not sa.inspect(conexao).has_table(TABELA_VERSAO):
+        return []
+    return conexao.execute(sa.select(tabela_versao).order_by(tabela_versao.c.versao)).all()
+
+
+@contextmanager
+def _bloqueio_arquivo(caminho):
+    """Bloqueio exclusivo de um arquivo, liberado ao sair do bloco (fcntl ou msvcrt)."""
+    with open(caminho, "a+b") as arquivo:
+        if fcntl is not None:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+        else:
+            arquivo.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK desiste após 10 tentativas; continua aguardando o outro processo.
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+            else:
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def _bloqueio(engine):
+    """Impede que dois processos apliquem migrações ao mesmo tempo.
+
+    No PostgreSQL usa um advisory lock; no SQLite, um arquivo de bloqueio ao
+    lado do banco (bancos em memória não são compartilhados e dispensam o bloqueio).
+    """
+    if engine.dialect.name == "sqlite":
+        banco = engine.url.database
+        if not banco or banco == ":memory:" or banco.startswith("file:"):
+            yield
+            return
+        with _bloqueio_arquivo(os.path.abspath(banco) + SUFIXO_BLOQUEIO_SQLITE):
+            yield
+        return
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as conexao:
+        conexao.execute(sa.text("SELECT pg_advisory_lock(:chave)"), {"chave": CHAVE_BLOQUEIO_PG})
+        conexao.commit()
+        try:
+            yield
+        finally:
+            conexao.execute(sa.text("SELECT pg_advisory_unlock(:chave)"), {"chave": CHAVE_BLOQUEIO_PG})
+            conexao.commit()
+
+
+def _registrar(conexao, migracao):
+    conexao.execute(tabela_versao.insert().values(
+        versao=migracao.versao, descricao=migracao.descricao, aplicada_em=datetime.utcnow()
+    ))
+
+
+def migrar(engine, ate=None, ao_aplicar=None):
+    """Aplica, em ordem, as migrações pendentes até a versão informada (padrão: todas).
+
+    Cada migração transacional é aplicada e registrada na mesma transação.
+    ao_aplicar, se informado, é chamado com cada Migracao antes de aplicá-la.
+    Retorna a lista de migrações aplicadas.
+    """
+    migracoes = carregar_migracoes()
+    ate = versao_mais_recente() if ate is None else ate
+
+    aplicadas = []
+    with _bloqueio(engine):
+        with engine.begin() as conexao:
+            tabela_versao.create(conexao, checkfirst=True)
+        with engine.connect() as conexao:
+            atual = versao_atual(conexao)
+        for migracao in migracoes:
+            if migracao.versao <= atual or migracao.versao > ate:
+                continue
+            if ao_aplicar:
+                ao_aplicar(migracao)
+            try:
+                if migracao.transacional:
+                    with engine.begin() as conexao:
+                        migracao.aplicar(conexao)
+                        _registrar(conexao, migracao)
+                else:
+                    with engine.connect() as conexao:
+                        conexao = conexao.execution_options(isolation_level="AUTOCOMMIT")
+                        migracao.aplicar(conexao)
+                        _registrar(conexao, migracao)
+            except Exception as e:
+                raise ErroMigracao(f"Falha ao aplicar {migracao.nome}: {str(e)}") from e
+            aplicadas.append(migracao)
+    return aplicadas
+
+
+def verificar_esquema(app, db):
+    """Confere, na inicialização, se o banco está na versão de esquema esperada.
+
+    Com MIGRACOES_AUTOMATICAS habilitado, aplica as migrações pendentes (com
+    bloqueio, pois cada worker executa esta verificação). Caso contrário,
+    apenas avisa e as requisições recebem 503 até que
+    "flask --app src.main migrar" seja executado (os comandos de linha de
+    comando continuam disponíveis).
+    """
+    with app.app_context():
+        engine = db.engine
+        with engine.connect() as conexao:
+            atual = versao_atual(conexao)
+    esperada = versao_mais_recente()
+    if atual == esperada:
+        return
+    if atual > esperada:
+        print(f"Aviso: o banco está na versão de esquema {atual}, mais nova que a do código ({esperada}).")
+        return
+    if app.config.get("MIGRACOES_AUTOMATICAS", False):
+        migrar(engine, ao_aplicar=lambda migracao: print(f"Aplicando migração {migracao.nome}..."))
+        return
+
+    print(f"Aviso: o banco está na versão de esquema {atual} e o código espera a {esperada}. "
+          "Execute 'flask --app src.main migrar'.")
+    estado = {"atualizado": False}
+
+    @app.before_request
+    def _exigir_esquema_atualizado():
+        if estado["atualizado"]:
+            return None
+        with engine.connect() as conexao:
+            estado["atualizado"] = versao_atual(conexao) >= esperada
+        if not estado["atualizado"]:
+            return jsonify({"error": "Banco de dados com esquema desatualizado"}), 503
+        return None
+
+
+def _autocommit(conexao):
+    """Indica se a conexão roda fora de transação (migração com TRANSACIONAL = False)."""
+    return conexao.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+
+
+def criar_indice(conexao, nome, tabela, colunas, unico=False):
+    """Cria um índice, se ainda não existir, sem bloquear escritas quando possível.
+
+    No PostgreSQL usa CREATE INDEX CONCURRENTLY, que exige uma migração com
+    TRANSACIONAL = False. Nos demais bancos o índice é criado normalmente.
+    """
+    preparador = conexao.dialect.identifier_preparer
+    colunas_sql = ", ".join(preparador.quote(coluna) for coluna in colunas)
+    unico_sql = "UNIQUE " if unico else ""
+    nome_sql = preparador.quote(nome)
+    tabela_sql = preparador.quote(tabela)
+
+    if conexao.dialect.name == "postgresql":
+        concorrente = "CONCURRENTLY " if _autocommit(conexao) else ""
+        conexao.execute(sa.text(
+            f"CREATE {unico_sql}INDEX {concorrente}IF NOT EXISTS {nome_sql} ON {tabela_sql} ({colunas_sql})"
+        ))
+    elif conexao.dialect.name == "sqlite":
+        conexao.execute(sa.text(f"CREATE {unico_sql}INDEX IF NOT EXISTS {nome_sql} ON {tabela_sql} ({colunas_sql})"))
+    elif nome not in {indice["name"] for indice in sa.inspect(conexao).get_indexes(tabela)}:
+        conexao.execute(sa.text(f"CREATE {unico_sql}INDEX {nome_sql} ON {tabela_sql} ({colunas_sql})"))
+
+
+def remover_indice(conexao, nome, tabela):
+    """Remove um índice, se existir (DROP INDEX CONCURRENTLY no PostgreSQL fora de transação)."""
+    preparador = conexao.dialect.identifier_preparer
+    nome_sql = preparador.quote(nome)
+    if conexao.dialect.name == "postgresql":
+        concorrente = "CONCURRENTLY " if _autocommit(conexao) else ""
+        conexao.execute(sa.text(f"DROP INDEX {concorrente}IF EXISTS {nome_sql}"))
+    elif conexao.dialect.name == "sqlite":
+        conexao.execute(sa.text(f"DROP INDEX IF EXISTS {nome_sql}"))
+    elif nome in {indice["name"] for indice in sa.inspect(conexao).get_indexes(tabela)}:
+        conexao.execute(sa.text(f"DROP INDEX {nome_sql} ON {preparador.quote(tabela)}"))
+
+
+def nome_arquivo_migracao(descricao):
+    """Monta o nome do arquivo da próxima migração a partir da descrição."""
+    sem_acentos = unicodedata.normalize("NFKD", descricao).encode("ascii", "ignore").decode("ascii")
+    slug = re.sub(r"[^a-z0-9]+", "_", sem_acentos.lower()).strip("_") or "migracao"
+    return f"v{versao_mais_recente() + 1:04d}_{slug}.py"
+
+
+def diretorio_migracoes():
+    """Retorna o diretório dos módulos de migração."""
+    return list(importlib.import_module(PACOTE_MIGRACOES).__path__)[0]
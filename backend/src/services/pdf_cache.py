@@ -0,0 +1,144 @@
+from datetime import date
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from src.services import alteracoes
+from src.services.pdf_generator import VERSAO_GERADOR
+
+
+class CachePDF:
+    """Cache em disco dos PDFs gerados, endereçado pelo conteúdo dos dados.
+
+    A chave é o hash SHA-256 do dicionário prestacao_data, do tipo do
+    documento, da versão do gerador e da data atual (os PDFs exibem a data
+    de emissão). Os arquivos ficam em <diretorio>/<prestacao_id>/<tipo>-<chave>.pdf,
+    o que permite invalidar todas as entradas de uma prestação removendo seu
+    diretório. O espaço total é limitado com remoção dos arquivos menos usados
+    recentemente (LRU pela data de modificação, atualizada a cada acerto).
+
+    Configurações lidas de app.config:
+    - PDF_CACHE_DIR: diretório do cache; vazio desativa o cache.
+    - PDF_CACHE_MAX_BYTES: tamanho máximo ocupado pelos arquivos.
+    """
+
+    def __init__(self, app=None):
+        self.diretorio = None
+        self.max_bytes = 0
+        self._tamanho_estimado = 0
+        self._trava = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configura o diretório e o limite de tamanho do cache."""
+        self.diretorio = app.config.get("PDF_CACHE_DIR") or None
+        self.max_bytes = int(app.config.get("PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+        if self.diretorio:
+            os.makedirs(self.diretorio, exist_ok=True)
+            self._tamanho_estimado = sum(tamanho for _, tamanho, _ in self._arquivos())
+            # Remove as entradas das prestações cujos dados forem alterados.
+            alteracoes.ao_confirmar(self.invalidar_prestacoes)
+        app.extensions["cache_pdf"] = self
+
+    @property
+    def habilitado(self):
+        """Indica se o cache está configurado."""
+        return self.diretorio is not None
+
+    @staticmethod
+    def chave(prestacao_data, tipo):
+        """Calcula a chave (e ETag) de um PDF a partir dos dados que o originam."""
+        conteudo = json.dumps({
+            "dados": prestacao_data,
+            "tipo": tipo,
+            "versao": VERSAO_GERADOR,
+            "data_emissao": date.today().isoformat()
+        }, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    def _caminho(self, prestacao_id, tipo, chave):
+        return os.path.join(self.diretorio, str(prestacao_id), f"{tipo}-{chave}.pdf")
+
+    def obter(self, prestacao_id, tipo, chave):
+        """Retorna os bytes do PDF em cache ou None se não houver entrada."""
+        if not self.habilitado:
+            return None
+        caminho = self._caminho(prestacao_id, tipo, chave)
+        try:
+            with open(caminho, "rb") as arquivo:
+                conteudo = arquivo.read()
+            # Marca a entrada como usada recentemente para a política LRU.
+            os.utime(caminho)
+            return conteudo
+        except FileNotFoundError:
+            return None
+
+    def armazenar(self, prestacao_id, tipo, chave, conteudo):
+        """Grava um PDF no cache de forma atômica e aplica o limite de tamanho."""
+        if not self.habilitado:
+            return
+        caminho = self._caminho(prestacao_id, tipo, chave)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix=".tmp")
+        with os.fdopen(descritor, "wb") as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, caminho)
+
+        with self._trava:
+            self._tamanho_estimado += len(conteudo)
+            if self._tamanho_estimado > self.max_bytes:
+                self._remover_menos_usados()
+
+    def invalidar_prestacoes(self, prestacao_ids):
+        """Remove todas as entradas em cache das prestações informadas."""
+        if not self.habilitado:
+            return
+        for prestacao_id in prestacao_ids:
+            shutil.rmtree(os.path.join(self.diretorio, str(prestacao_id)), ignore_errors=True)
+
+    def limpar(self):
+        """Remove todas as entradas do cache."""
+        if not self.habilitado:
+            return
+        for nome in os.listdir(self.diretorio):
+            shutil.rmtree(os.path.join(self.diretorio, nome), ignore_errors=True)
+        with self._trava:
+            self._tamanho_estimado = 0
+
+    def _arquivos(self):
+        """Lista (caminho, tamanho, última utilização) de todos os PDFs em cache."""
+        arquivos = []
+        for raiz, _, nomes in os.walk(self.diretorio):
+            for nome in nomes:
+                if not nome.endswith(".pdf"):
+                    continue
+                caminho = os.path.join(raiz, nome)
+                try:
+                    info = os.stat(caminho)
+                except FileNotFoundError:
+                    continue
+                arquivos.append((caminho, info.st_size, info.st_mtime))
+        return arquivos
+
+    def _remover_menos_usados(self):
+        """Remove os PDFs menos usados até ocupar no máximo 90% do limite."""
+        arquivos = sorted(self._arquivos(), key=lambda item: item[2])
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        alvo = self.max_bytes * 0.9
+        for caminho, tamanho, _ in arquivos:
+            if total <= alvo:
+                break
+            try:
+                os.remove(caminho)
+                total -= tamanho
+            except FileNotFoundError:
+                pass
+        self._tamanho_estimado = total
+
+
+# Instância compartilhada, inicializada em src/main.py.
+cache_pdf = CachePDF()
@@ -5,76 +5,157 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
 from datetime import datetime
+from types import MappingProxyType
 import io
 
+# Tipos de documento suportados pelo gerador.
+TIPOS_PDF = ("diaria", "passagem", "parecer")
+
+# Versão do layout dos documentos; incrementar ao alterar o conteúdo gerado
+# para invalidar os PDFs já armazenados em cache.
+VERSAO_GERADOR = "1"
+
+# Cores utilizadas nos documentos.
+COR_TITULO = colors.HexColor('#1a1a1a')
+COR_TEXTO = colors.HexColor('#2c3e50')
+COR_FUNDO_LINHA = colors.HexColor('#ecf0f1')
+COR_FUNDO_TOTAL = colors.HexColor('#bdc3c7')
+
+def _criar_estilos():
+    """Cria o registro de estilos de parágrafo, incluindo os estilos personalizados."""
+    estilos = getSampleStyleSheet()
+
+    # Estilo para título principal
+    estilos.add(ParagraphStyle(
+        name='TituloPrincipal',
+        parent=estilos['Title'],
+        fontSize=16,
+        spaceAfter=20,
+        spaceBefore=10,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold',
+        textColor=COR_TITULO
+    ))
+    
+    # Estilo para subtítulos
+    estilos.add(ParagraphStyle(
+        name='Subtitulo',
+        parent=estilos['Heading2'],
+        fontSize=12,
+        spaceAfter=12,
+        spaceBefore=12,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold',
+        textColor=COR_TEXTO
+    ))
+    
+    # Estilo para texto normal
+    estilos.add(ParagraphStyle(
+        name='TextoNormal',
+        parent=estilos['Normal'],
+        fontSize=10,
+        spaceAfter=8,
+        spaceBefore=4,
+        alignment=TA_JUSTIFY,
+        fontName='Helvetica',
+        leading=14,
+        textColor=COR_TEXTO
+    ))
+    
+    # Estilo para assinatura
+    estilos.add(ParagraphStyle(
+        name='Assinatura',
+        parent=estilos['Normal'],
+        fontSize=10,
+        spaceAfter=4,
+        alignment=TA_CENTER,
+        fontName='Helvetica',
+        textColor=COR_TEXTO
+    ))
+    
+    # Estilo para informações em negrito
+    estilos.add(ParagraphStyle(
+        name='TextoDestaque',
+        parent=estilos['Normal'],
+        fontSize=10,
+        spaceAfter=6,
+        alignment=TA_LEFT,
+        fontName='Helvetica-Bold',
+        textColor=COR_TEXTO
+    ))
+
+    return MappingProxyType(dict(estilos.byName))
+
+# Registro de estilos somente leitura, criado uma única vez por processo e
+# compartilhado por todas as instâncias de PDFGenerator.
+ESTILOS = _criar_estilos()
+
+# Estilo da tabela de discriminação das despesas de diária.
+ESTILO_TABELA_DIARIA = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), COR_TEXTO),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('TOPPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -2), COR_FUNDO_LINHA),
+    ('BACKGROUND', (0, -1), (-1, -1), COR_FUNDO_TOTAL),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey)
+])
+
+# Estilo da tabela de resumo financeiro da diária.
+ESTILO_TABELA_RESUMO = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), COR_TEXTO),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BACKGROUND', (0, 1), (-1, -1), COR_FUNDO_LINHA),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+])
+
+# Estilo da tabela de documentos comprobatórios.
+ESTILO_TABELA_DOCUMENTOS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), COR_TEXTO),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BACKGROUND', (0, 1), (-1, -1), COR_FUNDO_LINHA),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
+# Estilo da tabela de demonstrativo financeiro da passagem.
+ESTILO_TABELA_PASSAGEM = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), COR_TEXTO),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BACKGROUND', (0, 1), (-1, -3), COR_FUNDO_LINHA),
+    ('BACKGROUND', (0, -2), (-1, -1), COR_FUNDO_TOTAL),
+    ('FONTNAME', (0, -2), (-1, -1), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+])
+
 class PDFGenerator:
     """Classe responsável por gerar documentos PDF para prestação de contas."""
     
     def __init__(self):
-        """Inicializa o gerador de PDF e configura os estilos personalizados."""
-        self.styles = getSampleStyleSheet()
-        self.setup_custom_styles()
-    
-    def setup_custom_styles(self):
-        """Configura estilos de parágrafo personalizados para o documento PDF."""
-        # Estilo para título principal
-        self.styles.add(ParagraphStyle(
-            name='TituloPrincipal',
-            parent=self.styles['Title'],
-            fontSize=16,
-            spaceAfter=20,
-            spaceBefore=10,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold',
-            textColor=colors.HexColor('#1a1a1a')
-        ))
-        
-        # Estilo para subtítulos
-        self.styles.add(ParagraphStyle(
-            name='Subtitulo',
-            parent=self.styles['Heading2'],
-            fontSize=12,
-            spaceAfter=12,
-            spaceBefore=12,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold',
-            textColor=colors.HexColor('#2c3e50')
-        ))
-        
-        # Estilo para texto normal
-        self.styles.add(ParagraphStyle(
-            name='TextoNormal',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=8,
-            spaceBefore=4,
-            alignment=TA_JUSTIFY,
-            fontName='Helvetica',
-            leading=14,
-            textColor=colors.HexColor('#2c3e50')
-        ))
-        
-        # Estilo para assinatura
-        self.styles.add(ParagraphStyle(
-            name='Assinatura',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=4,
-            alignment=TA_CENTER,
-            fontName='Helvetica',
-            textColor=colors.HexColor('#2c3e50')
-        ))
-        
-        # Estilo para informações em negrito
-        self.styles.add(ParagraphStyle(
-            name='TextoDestaque',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=6,
-            alignment=TA_LEFT,
-            fontName='Helvetica-Bold',
-            textColor=colors.HexColor('#2c3e50')
-        ))
+        """Inicializa o gerador de PDF com o registro de estilos compartilhado."""
+        self.styles = ESTILOS
 
     def formatar_valor(self, valor):
         """Formata valor numérico para padrão brasileiro (R$ X.XXX,XX)."""
@@ -105,6 +186,16 @@ class PDFGenerator:
             return default
         return data_dict.get(key, default)
 
+    def gerar_pdf(self, tipo, prestacao_data):
+        """Gera o PDF do tipo informado ('diaria', 'passagem' ou 'parecer')."""
+        if tipo == "diaria":
+            return self.gerar_pdf_diaria(prestacao_data)
+        if tipo == "passagem":
+            return self.gerar_pdf_passagem(prestacao_data)
+        if tipo == "parecer":
+            return self.gerar_pdf_parecer(prestacao_data)
+        raise ValueError(f"Tipo de PDF inválido: {tipo}")
+
     def gerar_pdf_diaria(self, prestacao_data):
         """Gera um PDF de prestação de contas de diária com tratamento de erros melhorado."""
         buffer = io.BytesIO()
@@ -215,21 +306,7 @@ class PDFGenerator:
             ])
             
             tabela = Table(tabela_data, colWidths=[1.5*cm, 5*cm, 3.5*cm, 2.5*cm, 2.5*cm])
-            tabela.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('TOPPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -2), colors.HexColor('#ecf0f1')),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#bdc3c7')),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.grey)
-            ]))
+            tabela.setStyle(ESTILO_TABELA_DIARIA)
             
             story.append(tabela)
             story.append(Spacer(1, 0.5*cm))
@@ -250,17 +327,7 @@ class PDFGenerator:
                 ]
                 
                 resumo_table = Table(resumo_data, colWidths=[10*cm, 5*cm])
-                resumo_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#ecf0f1')),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-                    ('TOPPADDING', (0, 0), (-1, -1), 8),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ]))
+                resumo_table.setStyle(ESTILO_TABELA_RESUMO)
                 
                 story.append(resumo_table)
                 story.append(Spacer(1, 0.3*cm))
@@ -281,11 +348,11 @@ class PDFGenerator:
             
             documentos = prestacao_data.get('documentos', [])
             if documentos:
-                for doc in documentos:
+                for documento in documentos:
                     doc_data.append([
-                        self.formatar_data(self.safe_get(doc, 'data_documento')),
-                        self.safe_get(doc, 'descricao', 'Sem descrição')[:50],
-                        self.formatar_valor(self.safe_get(doc, 'valor')),
+                        self.formatar_data(self.safe_get(documento, 'data_documento')),
+                        self.safe_get(documento, 'descricao', 'Sem descrição')[:50],
+                        self.formatar_valor(self.safe_get(documento, 'valor')),
                         'Anexo'
                     ])
             else:
@@ -296,18 +363,7 @@ class PDFGenerator:
                 doc_data.append(['', '', '', ''])
             
             tabela_docs = Table(doc_data, colWidths=[2*cm, 7*cm, 2.5*cm, 3.5*cm])
-            tabela_docs.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#ecf0f1')),
-                ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ]))
+            tabela_docs.setStyle(ESTILO_TABELA_DOCUMENTOS)
             
             story.append(tabela_docs)
             story.append(Spacer(1, 1*cm))
@@ -480,20 +536,7 @@ class PDFGenerator:
                     ])
                 
                 tabela = Table(tabela_data, colWidths=[2.5*cm, 7*cm, 3*cm, 3*cm])
-                tabela.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 9),
-                    ('BACKGROUND', (0, 1), (-1, -3), colors.HexColor('#ecf0f1')),
-                    ('BACKGROUND', (0, -2), (-1, -1), colors.HexColor('#bdc3c7')),
-                    ('FONTNAME', (0, -2), (-1, -1), 'Helvetica-Bold'),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-                    ('TOPPADDING', (0, 0), (-1, -1), 8),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ]))
+                tabela.setStyle(ESTILO_TABELA_PASSAGEM)
                 
                 story.append(tabela)
             
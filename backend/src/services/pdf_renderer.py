@@ -0,0 +1,132 @@
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+import atexit
+import io
+import multiprocessing
+import threading
+
+from src.services.instrumentacao import medido
+from src.services.pdf_generator import PDFGenerator
+
+# Gerador reutilizado por todas as tarefas executadas em um mesmo processo.
+_gerador_processo = None
+
+
+class FilaRenderizacaoCheia(Exception):
+    """Indica que o limite de PDFs pendentes foi atingido."""
+
+
+class TempoRenderizacaoEsgotado(Exception):
+    """Indica que a geração de um PDF excedeu o tempo limite."""
+
+
+def _inicializar_processo():
+    """Cria o gerador de PDF uma única vez em cada processo do pool."""
+    global _gerador_processo
+    _gerador_processo = PDFGenerator()
+
+
+def _renderizar(tipo, prestacao_data):
+    """Gera o PDF e retorna seus bytes (executado no processo do pool ou localmente)."""
+    global _gerador_processo
+    if _gerador_processo is None:
+        _gerador_processo = PDFGenerator()
+    return _gerador_processo.gerar_pdf(tipo, prestacao_data).getvalue()
+
+
+class RenderizadorPDF:
+    """Executa a geração de PDFs (ReportLab) em um pool de processos.
+
+    O ReportLab consome CPU e mantém o GIL durante doc.build(); executá-lo na
+    thread da requisição bloqueia as demais chamadas do mesmo worker. Apenas o
+    dicionário prestacao_data atravessa a fronteira entre processos.
+
+    Configurações lidas de app.config:
+    - PDF_RENDER_WORKERS: número de processos; 0 gera os PDFs de forma
+      síncrona na própria requisição (usado também quando app.testing).
+    - PDF_RENDER_MAX_PENDENTES: máximo de PDFs na fila ou em execução.
+    - PDF_RENDER_TIMEOUT: tempo máximo, em segundos, de espera por um PDF.
+    - PDF_RENDER_CONTEXTO: método de início dos processos ('fork', 'spawn'
+      ou 'forkserver'); por padrão, o da plataforma.
+    """
+
+    def __init__(self, app=None):
+        self.executor = None
+        self.workers = 0
+        self.timeout = None
+        self._vagas = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configura o pool de processos a partir das configurações da aplicação."""
+        self.encerrar()
+        workers = int(app.config.get("PDF_RENDER_WORKERS", 0))
+        max_pendentes = int(app.config.get("PDF_RENDER_MAX_PENDENTES", 16))
+        self.timeout = app.config.get("PDF_RENDER_TIMEOUT", 60)
+
+        if workers > 0 and not app.testing:
+            contexto = app.config.get("PDF_RENDER_CONTEXTO")
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(contexto) if contexto else None,
+                initializer=_inicializar_processo
+            )
+            self.workers = workers
+            self._vagas = threading.BoundedSemaphore(max(max_pendentes, workers))
+            atexit.register(self.encerrar)
+
+        app.extensions["renderizador_pdf"] = self
+
+    @property
+    def sincrono(self):
+        """Indica se os PDFs são gerados na própria thread da requisição."""
+        return self.executor is None
+
+    def submeter(self, tipo, prestacao_data, bloquear=False):
+        """Agenda a geração de um PDF e retorna um Future com os bytes gerados.
+
+        Com bloquear=False, lança FilaRenderizacaoCheia se não houver vaga na
+        fila; com bloquear=True, aguarda até que uma vaga seja liberada.
+        """
+        if self.sincrono:
+            futuro = Future()
+            try:
+                futuro.set_result(_renderizar(tipo, prestacao_data))
+            except Exception as e:
+                futuro.set_exception(e)
+            return futuro
+
+        if not self._vagas.acquire(blocking=bloquear):
+            raise FilaRenderizacaoCheia("Limite de PDFs pendentes atingido")
+        try:
+            futuro = self.executor.submit(_renderizar, tipo, prestacao_data)
+        except Exception:
+            self._vagas.release()
+            raise
+        # A vaga só é liberada quando o processo termina, mesmo após um timeout.
+        futuro.add_done_callback(lambda _: self._vagas.release())
+        return futuro
+
+    def aguardar(self, futuro, timeout=None):
+        """Aguarda o resultado de um Future e retorna um buffer com o PDF."""
+        try:
+            return io.BytesIO(futuro.result(timeout=timeout if timeout is not None else self.timeout))
+        except FuturesTimeoutError:
+            futuro.cancel()
+            raise TempoRenderizacaoEsgotado("Tempo limite excedido na geração do PDF")
+
+    @medido("pdf")
+    def renderizar(self, tipo, prestacao_data, timeout=None):
+        """Gera um PDF e retorna um buffer pronto para envio."""
+        return self.aguardar(self.submeter(tipo, prestacao_data), timeout)
+
+    def encerrar(self):
+        """Finaliza o pool de processos, se existir."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            self.workers = 0
+
+
+# Instância compartilhada, inicializada em src/main.py.
+renderizador_pdf = RenderizadorPDF()
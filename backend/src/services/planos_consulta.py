@@ -0,0 +1,182 @@
+"""Verificação dos planos de execução das consultas das rotas.
+
+Cada cenário é uma requisição à API feita pelo cliente de testes do Flask. As
+consultas SQL executadas durante a requisição são capturadas e analisadas com
+EXPLAIN QUERY PLAN (SQLite) ou EXPLAIN com enable_seqscan desligado
+(PostgreSQL). Uma leitura completa de uma das tabelas de TABELAS_VOLUMOSAS,
+sem uso de índice, é registrada como regressão, assim como uma ordenação
+completa em memória (USE TEMP B-TREE FOR ORDER BY, no SQLite).
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+import re
+from urllib.parse import quote
+
+from flask import current_app
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, select
+
+from src.extensions import db
+from src.models.prestacao_contas import (
+    Servidor, Cargo, Presidente, PrestacaoContas, Adiantamento,
+    DespesaDiaria, DocumentoComprovacao, DespesaPassagem
+)
+
+# Tabelas que crescem com o número de prestações e não podem ser lidas por inteiro.
+# Os cadastros (servidores, cargos, presidentes, user) são listados completos por design.
+TABELAS_VOLUMOSAS = (
+    "prestacoes_contas", "adiantamentos", "despesas_diarias",
+    "documentos_comprovacao", "despesas_passagens", "prestacao_totais", "versoes_dados",
+)
+
+# Comandos SQL cujos planos são analisados.
+PADRAO_CONSULTA = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE)\b", re.IGNORECASE)
+PADRAO_SCAN_SQLITE = re.compile(r"^SCAN (\w+)")
+ORDENACAO_SEM_INDICE_SQLITE = "USE TEMP B-TREE FOR ORDER BY"
+PADRAO_SEQ_SCAN_PG = re.compile(r"Seq Scan on (\w+)")
+
+
+@dataclass
+class ResultadoCenario:
+    nome: str
+    status: int
+    consultas: int = 0
+    varreduras: list = field(default_factory=list)
+
+
+def _tabela_volumosa(nome):
+    """Reconhece a tabela também pelos apelidos gerados pelo SQLAlchemy (tabela_1)."""
+    return any(nome == tabela or re.fullmatch(rf"{tabela}_\d+", nome) for tabela in TABELAS_VOLUMOSAS)
+
+
+def varreduras_completas(conexao, sql, parametros):
+    """Retorna as linhas do plano que leem por inteiro (ou ordenam em memória) uma tabela volumosa."""
+    if conexao.dialect.name == "sqlite":
+        plano = [linha[-1] for linha in conexao.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parametros)]
+        tabelas = {encontrado.group(1) for detalhe in plano if (encontrado := re.match(r"^(?:SCAN|SEARCH) (\w+)", detalhe))}
+        return [
+            detalhe for detalhe in plano
+            if (encontrado := PADRAO_SCAN_SQLITE.match(detalhe))
+            and _tabela_volumosa(encontrado.group(1)) and " USING " not in detalhe
+            or detalhe == ORDENACAO_SEM_INDICE_SQLITE and any(map(_tabela_volumosa, tabelas))
+        ]
+    if conexao.dialect.name == "postgresql":
+        # Com seq scan desligado o planejador só o usa quando não há índice aplicável.
+        with conexao.begin():
+            conexao.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            plano = [linha[0] for linha in conexao.exec_driver_sql(f"EXPLAIN {sql}", parametros)]
+        return [
+            detalhe.strip() for detalhe in plano
+            if (encontrado := PADRAO_SEQ_SCAN_PG.search(detalhe)) and _tabela_volumosa(encontrado.group(1))
+        ]
+    raise ValueError(f"Banco não suportado na verificação de planos: {conexao.dialect.name}")
+
+
+def criar_dados_exemplo():
+    """Grava um conjunto mínimo de registros para que todas as rotas executem suas consultas."""
+    cargo = Cargo(nome_cargo="Analista (exemplo)", valor_diaria_dentro_estado=200.0, valor_diaria_fora_estado=350.0)
+    presidente = Presidente(nome="Presidente (exemplo)")
+    db.session.add_all([cargo, presidente])
+    inicio = datetime(2025, 1, 10, 9, 0)
+    for numero in range(3):
+        servidor = Servidor(nome=f"Servidor {numero} (exemplo)", cargo=cargo.nome_cargo)
+        prestacao = PrestacaoContas(servidor=servidor, presidente=presidente, data_criacao=inicio + timedelta(days=numero))
+        db.session.add_all([
+            servidor, prestacao,
+            Adiantamento(prestacao=prestacao, tipo="diaria", numero_adiantamento="1", numero_empenho="1",
+                         valor=500.0, data_adiantamento=date(2025, 1, 5)),
+            Adiantamento(prestacao=prestacao, tipo="passagem", numero_adiantamento="2", numero_empenho="2",
+                         valor=300.0, data_adiantamento=date(2025, 1, 5)),
+            DespesaDiaria(prestacao=prestacao, diarias_dentro_estado=2, refeicoes_dentro_estado=1,
+                          diarias_fora_estado=1, refeicoes_fora_estado=0),
+            DocumentoComprovacao(prestacao=prestacao, tipo_documento="nota_fiscal", descricao="Hospedagem",
+                                 data_documento=date(2025, 1, 6), valor=120.0),
+            DespesaPassagem(prestacao=prestacao, bpe="123", valor=150.0, tipo_viagem="ida"),
+        ])
+    db.session.commit()
+
+
+def cenarios(incluir_escritas=False):
+    """Monta as requisições verificadas a partir de registros existentes no banco.
+
+    Com incluir_escritas, acrescenta requisições que gravam no banco (edição de
+    despesa, de cargo e inclusão de adiantamento); use apenas em bancos de teste.
+    """
+    prestacao = db.session.execute(
+        select(PrestacaoContas.id, PrestacaoContas.servidor_id, PrestacaoContas.data_criacao)
+        .order_by(PrestacaoContas.id.desc()).limit(1)
+    ).first()
+    if prestacao is None:
+        raise ValueError("Nenhuma prestação de contas cadastrada; use dados de exemplo.")
+    cargo = db.session.execute(select(Cargo.id, Cargo.nome_cargo).order_by(Cargo.id).limit(1)).first()
+    dia = prestacao.data_criacao.date().isoformat()
+    base = f"/api/prestacoes/{prestacao.id}"
+
+    lista = [
+        ("listar prestações", "GET", "/api/prestacoes?incluir_totais=1", None),
+        ("listar prestações por servidor", "GET", f"/api/prestacoes?servidor_id={prestacao.servidor_id}", None),
+        ("listar prestações por período", "GET", f"/api/prestacoes?data_inicio={dia}&data_fim={dia}", None),
+        ("listar prestações (página seguinte)", "GET",
+         f"/api/prestacoes?limite=1&cursor={{proximo_cursor}}", None),
+        ("exportar prestações por servidor", "GET",
+         f"/api/prestacoes/exportar?formato=ndjson&servidor_id={prestacao.servidor_id}", None),
+        ("exportar prestações por período", "GET",
+         f"/api/prestacoes/exportar?formato=ndjson&data_inicio={dia}&data_fim={dia}", None),
+        ("obter prestação", "GET", base, None),
+        ("adiantamentos da prestação", "GET", f"{base}/adiantamentos", None),
+        ("despesa de diárias da prestação", "GET", f"{base}/despesas-diarias", None),
+        ("documentos da prestação", "GET", f"{base}/documentos", None),
+        ("passagens da prestação", "GET", f"{base}/despesas-passagens", None),
+        ("totais da prestação", "GET", f"{base}/calcular-totais", None),
+        ("totais em lote", "POST", "/api/prestacoes/totais", {"prestacao_ids": [prestacao.id]}),
+        ("relatório por período", "GET", f"/api/relatorios/gastos?data_inicio={dia}&data_fim={dia}", None),
+        ("relatório por servidor", "GET",
+         f"/api/relatorios/gastos?agrupar_por=servidor&servidor_id={prestacao.servidor_id}", None),
+    ]
+    if cargo is not None:
+        lista.append(("relatório por cargo", "GET", f"/api/relatorios/gastos?agrupar_por=cargo&cargo={quote(cargo.nome_cargo)}", None))
+    if incluir_escritas:
+        lista += [
+            ("editar despesa de diárias", "PUT", f"{base}/despesas-diarias",
+             {"diarias_dentro_estado": 3, "refeicoes_dentro_estado": 1, "diarias_fora_estado": 0, "refeicoes_fora_estado": 0}),
+            ("incluir adiantamento", "POST", f"{base}/adiantamentos",
+             {"tipo": "diaria", "numero_adiantamento": "9", "numero_empenho": "9", "valor": 10.0,
+              "data_adiantamento": dia}),
+        ]
+        if cargo is not None:
+            lista.append(("editar cargo", "PUT", f"/api/cargos/{cargo.id}",
+                          {"valor_diaria_dentro_estado": 210.0, "valor_diaria_fora_estado": 360.0}))
+    return lista
+
+
+def verificar_planos(incluir_escritas=False):
+    """Executa os cenários e gera um ResultadoCenario para cada requisição."""
+    engine = db.engine
+    cabecalhos = {"Authorization": f"Bearer {create_access_token(identity='verificar-planos')}"}
+    cliente = current_app.test_client()
+
+    capturadas = []
+
+    def _capturar(conexao, cursor, sql, parametros, contexto, executemany):
+        if not executemany and PADRAO_CONSULTA.match(sql):
+            capturadas.append((sql, parametros))
+
+    proximo_cursor = cliente.get("/api/prestacoes?limite=1", headers=cabecalhos).get_json().get("proximo_cursor") or ""
+    event.listen(engine, "before_cursor_execute", _capturar)
+    try:
+        for nome, metodo, url, corpo in cenarios(incluir_escritas):
+            capturadas.clear()
+            resposta = cliente.open(url.replace("{proximo_cursor}", proximo_cursor), method=metodo,
+                                    json=corpo, headers=cabecalhos)
+            resposta.get_data()
+            resultado = ResultadoCenario(nome, resposta.status_code)
+            # Consultas repetidas com os mesmos parâmetros são analisadas uma vez.
+            consultas = list({(sql, repr(parametros)): (sql, parametros) for sql, parametros in capturadas}.values())
+            resultado.consultas = len(consultas)
+            with engine.connect() as conexao:
+                for sql, parametros in consultas:
+                    for detalhe in varreduras_completas(conexao, sql, parametros):
+                        resultado.varreduras.append((detalhe, " ".join(sql.split())))
+            yield resultado
+    finally:
+        event.remove(engine, "before_cursor_execute", _capturar)
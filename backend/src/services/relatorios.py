@@ -0,0 +1,162 @@
+from datetime import datetime, time, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from src.extensions import db
+from src.models.prestacao_contas import Servidor, Cargo, PrestacaoContas, PrestacaoTotais
+from src.services.cache_leitura import CacheLeitura
+from src.services.totais import calcular_totais_lote
+from src.services.versoes import CHAVE_PRESTACOES, versao_atual
+
+# Dimensões aceitas para agrupar os gastos; "mes" inclui o ano.
+AGRUPAMENTOS = ("ano", "mes", "cargo", "servidor")
+
+# Agrupamento usado quando nenhum é informado.
+AGRUPAMENTO_PADRAO = ("mes", "cargo")
+
+
+# Cache dos relatórios já calculados (RELATORIOS_CACHE_TTL, RELATORIOS_CACHE_MAX_ENTRADAS
+# e, para compartilhar entre processos, RELATORIOS_CACHE_DIR; ver CacheLeitura).
+cache_relatorios = CacheLeitura("RELATORIOS_CACHE", ttl_padrao=60)
+
+
+def _colunas_agrupamento(agrupar_por):
+    """Retorna as colunas (rotuladas) que formam a chave de cada agrupamento."""
+    ano = func.extract("year", PrestacaoContas.data_criacao)
+    mes = func.extract("month", PrestacaoContas.data_criacao)
+    colunas = []
+    if "ano" in agrupar_por or "mes" in agrupar_por:
+        colunas.append(ano.label("ano"))
+    if "mes" in agrupar_por:
+        colunas.append(mes.label("mes"))
+    if "cargo" in agrupar_por:
+        colunas += [Servidor.cargo.label("cargo"), Cargo.id.label("cargo_id")]
+    if "servidor" in agrupar_por:
+        colunas += [Servidor.id.label("servidor_id"), Servidor.nome.label("servidor")]
+    return colunas
+
+
+def _restringir(consulta, agrupar_por, data_inicio, data_fim, cargo, servidor_id):
+    """Aplica à consulta do relatório as junções necessárias e os filtros informados."""
+    if "cargo" in agrupar_por or "servidor" in agrupar_por or cargo is not None:
+        consulta = consulta.join(Servidor, Servidor.id == PrestacaoContas.servidor_id)
+    if "cargo" in agrupar_por:
+        consulta = consulta.outerjoin(Cargo, Cargo.id == Servidor.cargo_id)
+    if data_inicio:
+        consulta = consulta.where(PrestacaoContas.data_criacao >= datetime.combine(data_inicio, time.min))
+    if data_fim:
+        consulta = consulta.where(PrestacaoContas.data_criacao < datetime.combine(data_fim + timedelta(days=1), time.min))
+    if cargo is not None:
+        consulta = consulta.where(Servidor.cargo == cargo)
+    if servidor_id is not None:
+        consulta = consulta.where(PrestacaoContas.servidor_id == servidor_id)
+    return consulta
+
+
+def _valor(soma):
+    """Converte uma soma do banco (Decimal ou None) em float com duas casas."""
+    return round(float(soma or 0), 2)
+
+
+def gastos_agrupados(agrupar_por=AGRUPAMENTO_PADRAO, data_inicio=None, data_fim=None,
+                     cargo=None, servidor_id=None):
+    """Soma os gastos com diárias, refeições e passagens por período, cargo e/ou servidor.
+
+    A agregação é feita no banco, em uma única consulta, sobre a tabela
+    prestacao_totais (mantida a cada commit a partir de DespesaDiaria, Cargo,
+    Adiantamento e DespesaPassagem; ver reconstruir-totais). Prestações ainda
+    não materializadas (banco anterior à tabela, antes da reconstrução) são
+    calculadas diretamente e somadas aos grupos. O período é o de criação da
+    prestação e as datas são inclusivas.
+    """
+    colunas = _colunas_agrupamento(agrupar_por)
+    nomes = [coluna.name for coluna in colunas]
+
+    consulta = _restringir(
+        select(
+            *colunas,
+            func.count(PrestacaoContas.id).label("quantidade_prestacoes"),
+            func.count(PrestacaoTotais.prestacao_id).label("materializadas"),
+            func.sum(PrestacaoTotais.total_diarias).label("total_diarias"),
+            func.sum(PrestacaoTotais.total_refeicoes).label("total_refeicoes"),
+            func.sum(PrestacaoTotais.total_passagens).label("total_passagens"),
+            func.sum(PrestacaoTotais.valor_adiantamento_diaria).label("valor_adiantamento_diaria"),
+        )
+        .select_from(PrestacaoContas)
+        .outerjoin(PrestacaoTotais, PrestacaoTotais.prestacao_id == PrestacaoContas.id),
+        agrupar_por, data_inicio, data_fim, cargo, servidor_id
+    ).group_by(*colunas)
+
+    somas = {}
+    incompletos = False
+    for linha in db.session.execute(consulta):
+        somas[tuple(linha[:len(nomes)])] = {
+            "quantidade_prestacoes": linha.quantidade_prestacoes,
+            "total_diarias": linha.total_diarias or 0,
+            "total_refeicoes": linha.total_refeicoes or 0,
+            "total_passagens": linha.total_passagens or 0,
+            "valor_adiantamento_diaria": linha.valor_adiantamento_diaria or 0,
+        }
+        incompletos = incompletos or linha.materializadas < linha.quantidade_prestacoes
+    if incompletos:
+        _somar_nao_materializadas(somas, colunas, agrupar_por, data_inicio, data_fim, cargo, servidor_id)
+
+    grupos = []
+    for chave, soma in somas.items():
+        grupo = dict(zip(nomes, chave))
+        total_diarias = _valor(soma["total_diarias"])
+        total_refeicoes = _valor(soma["total_refeicoes"])
+        total_passagens = _valor(soma["total_passagens"])
+        grupo.update({
+            "quantidade_prestacoes": soma["quantidade_prestacoes"],
+            "total_diarias": total_diarias,
+            "total_refeicoes": total_refeicoes,
+            "total_passagens": total_passagens,
+            # total_geral, nos totais da prestação, soma só diárias e refeições.
+            "total_com_passagens": round(total_diarias + total_refeicoes + total_passagens, 2),
+            "valor_adiantamento_diaria": _valor(soma["valor_adiantamento_diaria"]),
+        })
+        grupos.append(grupo)
+
+    grupos.sort(key=lambda grupo: tuple((grupo[nome] is None, grupo[nome]) for nome in nomes))
+    return grupos
+
+
+def _somar_nao_materializadas(somas, colunas, agrupar_por, data_inicio, data_fim, cargo, servidor_id):
+    """Acrescenta às somas dos grupos os totais, calculados diretamente, das prestações sem linha em prestacao_totais."""
+    consulta = _restringir(
+        select(*colunas, PrestacaoContas.id.label("prestacao_id"))
+        .select_from(PrestacaoContas)
+        .outerjoin(PrestacaoTotais, PrestacaoTotais.prestacao_id == PrestacaoContas.id)
+        .where(PrestacaoTotais.prestacao_id.is_(None)),
+        agrupar_por, data_inicio, data_fim, cargo, servidor_id
+    )
+    linhas = db.session.execute(consulta).all()
+    current_app.logger.warning(
+        "Relatório de gastos com %d prestações sem totais materializados; execute 'flask --app src.main reconstruir-totais'.",
+        len(linhas)
+    )
+    resultados = calcular_totais_lote([linha.prestacao_id for linha in linhas])
+    for linha in linhas:
+        resultado = resultados.get(linha.prestacao_id)
+        if resultado is None:
+            continue
+        soma = somas[tuple(linha[:len(colunas)])]
+        soma["total_diarias"] += resultado.total_diarias
+        soma["total_refeicoes"] += resultado.total_refeicoes
+        soma["total_passagens"] += resultado.entrada.total_passagens
+        soma["valor_adiantamento_diaria"] += resultado.valor_adiantamento_diaria
+
+
+def relatorio_gastos(agrupar_por=AGRUPAMENTO_PADRAO, data_inicio=None, data_fim=None,
+                     cargo=None, servidor_id=None):
+    """Retorna gastos_agrupados usando o cache de relatórios.
+
+    A versão das prestações faz parte da chave: após qualquer alteração o
+    relatório é recalculado, em todos os processos, sem esperar a validade.
+    """
+    chave = (versao_atual(CHAVE_PRESTACOES), tuple(agrupar_por), data_inicio, data_fim, cargo, servidor_id)
+    return cache_relatorios.obter_ou_calcular(
+        chave, lambda: gastos_agrupados(agrupar_por, data_inicio, data_fim, cargo, servidor_id), grupo="gastos"
+    )
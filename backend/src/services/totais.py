@@ -0,0 +1,275 @@
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional
+
+from sqlalchemy import func, select
+
+from src.extensions import db
+from src.models.prestacao_contas import Servidor, Cargo, PrestacaoContas, Adiantamento, DespesaDiaria, DespesaPassagem
+
+# Percentual da diária pago por refeição.
+PERCENTUAL_REFEICAO = Decimal("0.15")
+
+# Precisão dos valores monetários (centavos).
+CENTAVOS = Decimal("0.01")
+
+# Quantidade de IDs por cláusula IN, respeitando o limite de parâmetros do SQLite.
+TAMANHO_BLOCO_IN = 500
+
+ZERO = Decimal("0")
+
+
+def _decimal(valor):
+    """Converte um valor do banco (float) para Decimal sem herdar o erro binário."""
+    if valor is None:
+        return ZERO
+    return valor if isinstance(valor, Decimal) else Decimal(str(valor))
+
+
+def moeda(valor):
+    """Arredonda um valor para centavos (meio para cima)."""
+    return valor.quantize(CENTAVOS, rounding=ROUND_HALF_UP)
+
+
+@dataclass(frozen=True)
+class EntradaTotais:
+    """Dados de uma prestação necessários ao cálculo dos totais."""
+
+    prestacao_id: int
+    cargo_encontrado: bool
+    possui_despesa: bool
+    valor_diaria_dentro_estado: Decimal = ZERO
+    valor_diaria_fora_estado: Decimal = ZERO
+    diarias_dentro_estado: int = 0
+    refeicoes_dentro_estado: int = 0
+    diarias_fora_estado: int = 0
+    refeicoes_fora_estado: int = 0
+    valor_adiantamento_diaria: Decimal = ZERO
+    total_passagens: Decimal = ZERO
+
+
+@dataclass(frozen=True)
+class ResultadoTotais:
+    """Totais de diárias e refeições de uma prestação, em valores exatos (Decimal)."""
+
+    entrada: EntradaTotais
+    valor_diaria_dentro_estado: Decimal
+    valor_diaria_fora_estado: Decimal
+    valor_refeicao_dentro_estado: Decimal
+    valor_refeicao_fora_estado: Decimal
+    total_diarias_dentro: Decimal
+    total_diarias_fora: Decimal
+    total_refeicoes_dentro: Decimal
+    total_refeicoes_fora: Decimal
+    total_diarias: Decimal
+    total_refeicoes: Decimal
+    total_geral: Decimal
+    valor_adiantamento_diaria: Decimal
+    diferenca: Decimal
+
+    @property
+    def calculavel(self):
+        """Indica se há cargo e despesa de diária para calcular os totais."""
+        return self.entrada.cargo_encontrado and self.entrada.possui_despesa
+
+    def como_dict(self):
+        """Converte o resultado no formato JSON usado pelas rotas e pelos PDFs.
+
+        Sem cargo ou sem despesa de diária, os totais são zero e não há detalhes.
+        """
+        if not self.calculavel:
+            return {
+                "total_diarias": 0,
+                "total_refeicoes": 0,
+                "total_geral": 0,
+                "valor_adiantamento_diaria": 0,
+                "diferenca": 0,
+                "detalhes": {}
+            }
+
+        entrada = self.entrada
+        return {
+            "total_diarias": float(self.total_diarias),
+            "total_refeicoes": float(self.total_refeicoes),
+            "total_geral": float(self.total_geral),
+            "valor_adiantamento_diaria": float(self.valor_adiantamento_diaria),
+            "diferenca": float(self.diferenca),
+            "detalhes": {
+                "diarias_dentro_estado": {
+                    "quantidade": entrada.diarias_dentro_estado,
+                    "valor_unitario": float(self.valor_diaria_dentro_estado),
+                    "total": float(self.total_diarias_dentro)
+                },
+                "diarias_fora_estado": {
+                    "quantidade": entrada.diarias_fora_estado,
+                    "valor_unitario": float(self.valor_diaria_fora_estado),
+                    "total": float(self.total_diarias_fora)
+                },
+                "refeicoes_dentro_estado": {
+                    "quantidade": entrada.refeicoes_dentro_estado,
+                    "valor_unitario": float(self.valor_refeicao_dentro_estado),
+                    "total": float(self.total_refeicoes_dentro)
+                },
+                "refeicoes_fora_estado": {
+                    "quantidade": entrada.refeicoes_fora_estado,
+                    "valor_unitario": float(self.valor_refeicao_fora_estado),
+                    "total": float(self.total_refeicoes_fora)
+                }
+            }
+        }
+
+
+def calcular(entrada):
+    """Calcula os totais de uma prestação a partir de suas entradas.
+
+    O valor unitário da refeição (15% da diária) é arredondado para centavos
+    antes de ser multiplicado pela quantidade, de modo que quantidade × valor
+    unitário exibidos sempre conferem com o total.
+    """
+    if not (entrada.cargo_encontrado and entrada.possui_despesa):
+        return ResultadoTotais(entrada, *([ZERO] * 13))
+
+    diaria_dentro = moeda(entrada.valor_diaria_dentro_estado)
+    diaria_fora = moeda(entrada.valor_diaria_fora_estado)
+    refeicao_dentro = moeda(diaria_dentro * PERCENTUAL_REFEICAO)
+    refeicao_fora = moeda(diaria_fora * PERCENTUAL_REFEICAO)
+
+    total_diarias_dentro = entrada.diarias_dentro_estado * diaria_dentro
+    total_diarias_fora = entrada.diarias_fora_estado * diaria_fora
+    total_refeicoes_dentro = entrada.refeicoes_dentro_estado * refeicao_dentro
+    total_refeicoes_fora = entrada.refeicoes_fora_estado * refeicao_fora
+
+    total_diarias = total_diarias_dentro + total_diarias_fora
+    total_refeicoes = total_refeicoes_dentro + total_refeicoes_fora
+    total_geral = total_diarias + total_refeicoes
+    valor_adiantamento = moeda(entrada.valor_adiantamento_diaria)
+
+    return ResultadoTotais(
+        entrada=entrada,
+        valor_diaria_dentro_estado=diaria_dentro,
+        valor_diaria_fora_estado=diaria_fora,
+        valor_refeicao_dentro_estado=refeicao_dentro,
+        valor_refeicao_fora_estado=refeicao_fora,
+        total_diarias_dentro=total_diarias_dentro,
+        total_diarias_fora=total_diarias_fora,
+        total_refeicoes_dentro=total_refeicoes_dentro,
+        total_refeicoes_fora=total_refeicoes_fora,
+        total_diarias=total_diarias,
+        total_refeicoes=total_refeicoes,
+        total_geral=total_geral,
+        valor_adiantamento_diaria=valor_adiantamento,
+        diferenca=total_geral - valor_adiantamento,
+    )
+
+
+def entrada_de_registros(prestacao_id, cargo, despesa_diaria, adiantamento_diaria, passagens=()):
+    """Monta a entrada do cálculo a partir de objetos já carregados (ORM)."""
+    return EntradaTotais(
+        prestacao_id=prestacao_id,
+        cargo_encontrado=cargo is not None,
+        possui_despesa=despesa_diaria is not None,
+        valor_diaria_dentro_estado=_decimal(cargo.valor_diaria_dentro_estado) if cargo else ZERO,
+        valor_diaria_fora_estado=_decimal(cargo.valor_diaria_fora_estado) if cargo else ZERO,
+        diarias_dentro_estado=(despesa_diaria.diarias_dentro_estado or 0) if despesa_diaria else 0,
+        refeicoes_dentro_estado=(despesa_diaria.refeicoes_dentro_estado or 0) if despesa_diaria else 0,
+        diarias_fora_estado=(despesa_diaria.diarias_fora_estado or 0) if despesa_diaria else 0,
+        refeicoes_fora_estado=(despesa_diaria.refeicoes_fora_estado or 0) if despesa_diaria else 0,
+        valor_adiantamento_diaria=_decimal(adiantamento_diaria.valor) if adiantamento_diaria else ZERO,
+        total_passagens=sum((_decimal(passagem.valor) for passagem in passagens), ZERO),
+    )
+
+
+def totais_de_agregado(agregado):
+    """Calcula os totais de um AgregadoPrestacao já carregado, sem novas consultas."""
+    return calcular(entrada_de_registros(
+        agregado.id, agregado.cargo, agregado.despesa_diaria, agregado.adiantamento_diaria, agregado.passagens
+    ))
+
+
+def primeiro_registro(modelo, *condicoes):
+    """Subconsulta correlacionada com o menor ID de modelo para cada prestação.
+
+    Usa o índice de prestacao_id, de modo que o custo é proporcional às
+    prestações consultadas e não ao tamanho da tabela filha.
+    """
+    return (
+        select(func.min(modelo.id))
+        .where(modelo.prestacao_id == PrestacaoContas.id, *condicoes)
+        .correlate(PrestacaoContas)
+        .scalar_subquery()
+    )
+
+
+def consulta_entradas():
+    """Consulta que retorna, em uma linha por prestação, todas as entradas do cálculo.
+
+    A despesa de diária e o adiantamento de diária considerados são os de menor
+    ID, como nas consultas individuais com first(). Outras colunas e junções
+    podem ser acrescentadas pelo chamador.
+    """
+    despesa = db.aliased(DespesaDiaria)
+    adiantamento = db.aliased(Adiantamento)
+    total_passagens = (
+        select(func.sum(DespesaPassagem.valor))
+        .where(DespesaPassagem.prestacao_id == PrestacaoContas.id)
+        .correlate(PrestacaoContas)
+        .scalar_subquery()
+    )
+
+    return (
+        select(
+            PrestacaoContas.id.label("prestacao_id"),
+            Cargo.id.label("cargo_id"),
+            Cargo.valor_diaria_dentro_estado,
+            Cargo.valor_diaria_fora_estado,
+            despesa.id.label("despesa_id"),
+            despesa.diarias_dentro_estado,
+            despesa.refeicoes_dentro_estado,
+            despesa.diarias_fora_estado,
+            despesa.refeicoes_fora_estado,
+            adiantamento.valor.label("valor_adiantamento_diaria"),
+            total_passagens.label("total_passagens"),
+        )
+        .select_from(PrestacaoContas)
+        .outerjoin(Servidor, Servidor.id == PrestacaoContas.servidor_id)
+        .outerjoin(Cargo, Cargo.id == Servidor.cargo_id)
+        .outerjoin(despesa, despesa.id == primeiro_registro(DespesaDiaria))
+        .outerjoin(adiantamento, adiantamento.id == primeiro_registro(Adiantamento, Adiantamento.tipo == "diaria"))
+    )
+
+
+def entrada_de_linha(linha):
+    """Converte uma linha de consulta_entradas() na entrada do cálculo."""
+    return EntradaTotais(
+        prestacao_id=linha.prestacao_id,
+        cargo_encontrado=linha.cargo_id is not None,
+        possui_despesa=linha.despesa_id is not None,
+        valor_diaria_dentro_estado=_decimal(linha.valor_diaria_dentro_estado),
+        valor_diaria_fora_estado=_decimal(linha.valor_diaria_fora_estado),
+        diarias_dentro_estado=linha.diarias_dentro_estado or 0,
+        refeicoes_dentro_estado=linha.refeicoes_dentro_estado or 0,
+        diarias_fora_estado=linha.diarias_fora_estado or 0,
+        refeicoes_fora_estado=linha.refeicoes_fora_estado or 0,
+        valor_adiantamento_diaria=_decimal(linha.valor_adiantamento_diaria),
+        total_passagens=_decimal(linha.total_passagens),
+    )
+
+
+def calcular_totais_lote(prestacao_ids, session=None):
+    """Calcula os totais de várias prestações com uma consulta por bloco de IDs.
+
+    Retorna {id: ResultadoTotais} apenas para as prestações existentes.
+    """
+    session = session or db.session
+    prestacao_ids = list(prestacao_ids)
+    resultados = {}
+    for inicio in range(0, len(prestacao_ids), TAMANHO_BLOCO_IN):
+        bloco = prestacao_ids[inicio:inicio + TAMANHO_BLOCO_IN]
+        for linha in session.execute(consulta_entradas().where(PrestacaoContas.id.in_(bloco))):
+            resultados[linha.prestacao_id] = calcular(entrada_de_linha(linha))
+    return resultados
+
+
+def calcular_totais_prestacao(prestacao_id) -> Optional[ResultadoTotais]:
+    """Calcula os totais de uma prestação; retorna None se ela não existir."""
+    return calcular_totais_lote([prestacao_id]).get(prestacao_id)
@@ -0,0 +1,189 @@
+"""Manutenção da tabela prestacao_totais.
+
+Os totais de cada prestação são recalculados, dentro da mesma transação, para
+toda prestação afetada por um commit: edição de despesa de diária, inclusão ou
+remoção de adiantamento, troca de cargo do servidor ou alteração dos valores
+do cargo (update_cargo). As leituras passam a ser uma consulta pela chave
+primária, com cálculo direto apenas para prestações ainda não materializadas.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import delete, select
+
+from src.extensions import db
+from src.models.prestacao_contas import PrestacaoContas, PrestacaoTotais
+from src.services.alteracoes import antes_de_confirmar
+from src.services.totais import (
+    TAMANHO_BLOCO_IN, EntradaTotais, moeda, calcular, calcular_totais_lote
+)
+from src.services.versoes import CHAVE_PRESTACOES, chave_prestacao, incrementar_versoes
+
+# Quantidade de prestações recalculadas por transação na reconstrução.
+TAMANHO_BLOCO_RECONSTRUCAO = 2000
+
+# Colunas de valores comparadas pelo verificador de consistência.
+COLUNAS_VERIFICADAS = (
+    "cargo_encontrado", "possui_despesa",
+    "diarias_dentro_estado", "refeicoes_dentro_estado", "diarias_fora_estado", "refeicoes_fora_estado",
+    "valor_diaria_dentro_estado", "valor_diaria_fora_estado",
+    "total_diarias", "total_refeicoes", "total_geral", "valor_adiantamento_diaria", "diferenca",
+    "total_passagens",
+)
+
+
+def _linha(resultado, agora):
+    """Converte um ResultadoTotais nos valores de uma linha de prestacao_totais."""
+    entrada = resultado.entrada
+    return {
+        "prestacao_id": entrada.prestacao_id,
+        "cargo_encontrado": entrada.cargo_encontrado,
+        "possui_despesa": entrada.possui_despesa,
+        "diarias_dentro_estado": entrada.diarias_dentro_estado,
+        "refeicoes_dentro_estado": entrada.refeicoes_dentro_estado,
+        "diarias_fora_estado": entrada.diarias_fora_estado,
+        "refeicoes_fora_estado": entrada.refeicoes_fora_estado,
+        "valor_diaria_dentro_estado": resultado.valor_diaria_dentro_estado,
+        "valor_diaria_fora_estado": resultado.valor_diaria_fora_estado,
+        "total_diarias": resultado.total_diarias,
+        "total_refeicoes": resultado.total_refeicoes,
+        "total_geral": resultado.total_geral,
+        "valor_adiantamento_diaria": resultado.valor_adiantamento_diaria,
+        "diferenca": resultado.diferenca,
+        "total_passagens": moeda(entrada.total_passagens),
+        "atualizado_em": agora,
+    }
+
+
+def resultado_materializado(registro):
+    """Reconstrói o ResultadoTotais a partir de uma linha de prestacao_totais."""
+    return calcular(EntradaTotais(
+        prestacao_id=registro.prestacao_id,
+        cargo_encontrado=registro.cargo_encontrado,
+        possui_despesa=registro.possui_despesa,
+        valor_diaria_dentro_estado=Decimal(registro.valor_diaria_dentro_estado),
+        valor_diaria_fora_estado=Decimal(registro.valor_diaria_fora_estado),
+        diarias_dentro_estado=registro.diarias_dentro_estado,
+        refeicoes_dentro_estado=registro.refeicoes_dentro_estado,
+        diarias_fora_estado=registro.diarias_fora_estado,
+        refeicoes_fora_estado=registro.refeicoes_fora_estado,
+        valor_adiantamento_diaria=Decimal(registro.valor_adiantamento_diaria),
+        total_passagens=Decimal(registro.total_passagens),
+    ))
+
+
+def atualizar_totais(session, prestacao_ids):
+    """Recalcula e grava os totais das prestações informadas na transação da sessão.
+
+    Prestações que não existem mais têm a linha removida.
+    """
+    tabela = PrestacaoTotais.__table__
+    conexao = session.connection()
+    prestacao_ids = sorted(prestacao_ids)
+    agora = datetime.utcnow()
+    for inicio in range(0, len(prestacao_ids), TAMANHO_BLOCO_IN):
+        bloco = prestacao_ids[inicio:inicio + TAMANHO_BLOCO_IN]
+        resultados = calcular_totais_lote(bloco, session=session)
+        conexao.execute(delete(tabela).where(tabela.c.prestacao_id.in_(bloco)))
+        if resultados:
+            conexao.execute(tabela.insert(), [_linha(resultado, agora) for resultado in resultados.values()])
+
+
+@antes_de_confirmar
+def _materializar_totais(session, prestacao_ids):
+    """Mantém prestacao_totais em dia com as prestações alteradas na transação."""
+    atualizar_totais(session, prestacao_ids)
+
+
+def obter_totais_lote(prestacao_ids):
+    """Retorna {id: ResultadoTotais} lendo a tabela materializada.
+
+    Prestações existentes que ainda não foram materializadas (por exemplo, antes
+    da primeira reconstrução) são calculadas diretamente, sem gravação.
+    """
+    prestacao_ids = list(prestacao_ids)
+    resultados = {}
+    for inicio in range(0, len(prestacao_ids), TAMANHO_BLOCO_IN):
+        bloco = prestacao_ids[inicio:inicio + TAMANHO_BLOCO_IN]
+        for registro in PrestacaoTotais.query.filter(PrestacaoTotais.prestacao_id.in_(bloco)):
+            resultados[registro.prestacao_id] = resultado_materializado(registro)
+    faltantes = [prestacao_id for prestacao_id in prestacao_ids if prestacao_id not in resultados]
+    if faltantes:
+        resultados.update(calcular_totais_lote(faltantes))
+    return resultados
+
+
+def obter_totais_prestacao(prestacao_id):
+    """Retorna o ResultadoTotais de uma prestação, ou None se ela não existir."""
+    return obter_totais_lote([prestacao_id]).get(prestacao_id)
+
+
+def _blocos_prestacoes(tamanho_bloco):
+    """Gera os IDs de todas as prestações em blocos, por cursor de ID."""
+    ultimo_id = 0
+    while True:
+        bloco = db.session.execute(
+            select(PrestacaoContas.id).where(PrestacaoContas.id > ultimo_id)
+            .order_by(PrestacaoContas.id).limit(tamanho_bloco)
+        ).scalars().all()
+        if not bloco:
+            return
+        yield bloco
+        ultimo_id = bloco[-1]
+
+
+def reconstruir_totais(tamanho_bloco=TAMANHO_BLOCO_RECONSTRUCAO):
+    """Recalcula prestacao_totais inteira, um bloco por transação.
+
+    Remove antes as linhas de prestações inexistentes. Gera o total de
+    prestações processadas após cada bloco.
+    """
+    tabela = PrestacaoTotais.__table__
+    db.session.execute(delete(tabela).where(
+        tabela.c.prestacao_id.notin_(select(PrestacaoContas.id))
+    ))
+    db.session.commit()
+
+    processadas = 0
+    for bloco in _blocos_prestacoes(tamanho_bloco):
+        atualizar_totais(db.session, bloco)
+        # Totais corrigidos mudam as respostas dessas prestações (ETags).
+        incrementar_versoes(
+            db.session.connection(), [CHAVE_PRESTACOES] + [chave_prestacao(prestacao_id) for prestacao_id in bloco]
+        )
+        db.session.commit()
+        processadas += len(bloco)
+        yield processadas
+
+
+def verificar_totais(tamanho_bloco=TAMANHO_BLOCO_RECONSTRUCAO):
+    """Compara prestacao_totais com o cálculo direto e gera as divergências.
+
+    Cada divergência é {"prestacao_id", "problema", "campos"}, com problema
+    "ausente" (sem linha), "divergente" (valores diferentes, listados em
+    campos) ou "orfa" (linha de prestação inexistente).
+    """
+    tabela = PrestacaoTotais.__table__
+    for prestacao_id in db.session.execute(
+        select(tabela.c.prestacao_id).where(tabela.c.prestacao_id.notin_(select(PrestacaoContas.id)))
+    ).scalars():
+        yield {"prestacao_id": prestacao_id, "problema": "orfa", "campos": []}
+
+    for bloco in _blocos_prestacoes(tamanho_bloco):
+        esperados = calcular_totais_lote(bloco)
+        gravados = {}
+        for inicio in range(0, len(bloco), TAMANHO_BLOCO_IN):
+            gravados.update(
+                (linha.prestacao_id, linha) for linha in db.session.execute(
+                    select(tabela).where(tabela.c.prestacao_id.in_(bloco[inicio:inicio + TAMANHO_BLOCO_IN]))
+                )
+            )
+        for prestacao_id in bloco:
+            gravado = gravados.get(prestacao_id)
+            if gravado is None:
+                yield {"prestacao_id": prestacao_id, "problema": "ausente", "campos": []}
+                continue
+            esperado = _linha(esperados[prestacao_id], None)
+            campos = [coluna for coluna in COLUNAS_VERIFICADAS if getattr(gravado, coluna) != esperado[coluna]]
+            if campos:
+                yield {"prestacao_id": prestacao_id, "problema": "divergente", "campos": campos}
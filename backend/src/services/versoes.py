@@ -0,0 +1,105 @@
+"""Contadores de versão dos dados servidos pelas rotas GET (tabela versoes_dados).
+
+A cada commit, na mesma transação, são incrementadas as versões:
+- de cada tabela com registros incluídos, alterados ou removidos (chave = nome
+  da tabela, por exemplo "servidores" ou "cargos");
+- de cada prestação afetada ("prestacao:<id>"), conforme prestacoes_afetadas,
+  o que inclui as alterações de servidor, presidente e cargo que mudam os
+  dados ou os totais da prestação;
+- de "prestacoes", se alguma prestação foi afetada (listagens e relatórios).
+
+As rotas comparam essas versões com o ETag enviado pelo cliente (ver
+src/routes/condicional.py) sem ler as linhas. Gravações feitas fora da sessão
+do ORM e sem marcar_alteracoes não incrementam as versões.
+"""
+from datetime import datetime
+
+from flask import g, has_request_context
+from sqlalchemy import select, update
+
+from src.extensions import db
+from src.models.prestacao_contas import VersaoDados
+from src.services.alteracoes import antes_de_confirmar, tabelas_alteradas
+from src.services.totais import TAMANHO_BLOCO_IN
+
+# Versão de todas as prestações (listagem, relatórios).
+CHAVE_PRESTACOES = "prestacoes"
+
+
+def chave_prestacao(prestacao_id):
+    """Retorna a chave da versão de uma prestação."""
+    return f"prestacao:{prestacao_id}"
+
+
+def _insert_com_conflito(conexao):
+    """Retorna o insert com ON CONFLICT do dialeto, ou None se não houver."""
+    if conexao.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif conexao.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+
+def incrementar_versoes(conexao, chaves, agora=None):
+    """Incrementa (criando com 1, se preciso) as versões das chaves informadas."""
+    tabela = VersaoDados.__table__
+    # Ordem fixa das chaves: transações concorrentes bloqueiam as linhas na mesma ordem.
+    chaves = sorted(set(chaves))
+    agora = agora or datetime.utcnow()
+    insert = _insert_com_conflito(conexao)
+    for inicio in range(0, len(chaves), TAMANHO_BLOCO_IN):
+        bloco = chaves[inicio:inicio + TAMANHO_BLOCO_IN]
+        if insert is not None:
+            comando = insert(tabela)
+            conexao.execute(
+                comando.on_conflict_do_update(
+                    index_elements=[tabela.c.chave],
+                    set_={"versao": tabela.c.versao + 1, "alterado_em": comando.excluded.alterado_em}
+                ),
+                [{"chave": chave, "versao": 1, "alterado_em": agora} for chave in bloco]
+            )
+            continue
+        conexao.execute(
+            update(tabela).where(tabela.c.chave.in_(bloco)).values(versao=tabela.c.versao + 1, alterado_em=agora)
+        )
+        existentes = set(conexao.execute(select(tabela.c.chave).where(tabela.c.chave.in_(bloco))).scalars())
+        novas = [chave for chave in bloco if chave not in existentes]
+        if novas:
+            conexao.execute(tabela.insert(), [{"chave": chave, "versao": 1, "alterado_em": agora} for chave in novas])
+
+
+def obter_versoes(chaves):
+    """Retorna {chave: (versao, alterado_em)}; chaves sem linha ficam com (0, None)."""
+    tabela = VersaoDados.__table__
+    versoes = {chave: (0, None) for chave in chaves}
+    for chave, versao, alterado_em in db.session.execute(
+        select(tabela.c.chave, tabela.c.versao, tabela.c.alterado_em).where(tabela.c.chave.in_(list(versoes)))
+    ):
+        versoes[chave] = (versao, alterado_em)
+    return versoes
+
+
+def versao_atual(chave):
+    """Retorna a versão da chave, reaproveitando a lida por @condicional na mesma requisição.
+
+    Usada na chave dos caches com validade (relatórios, cadastros de
+    referência): uma alteração gravada por qualquer processo muda a chave, e o
+    corpo guardado corresponde sempre à versão usada no ETag.
+    """
+    versoes = g.get("versoes_dados") if has_request_context() else None
+    if versoes is None or chave not in versoes:
+        versoes = obter_versoes([chave])
+    return versoes[chave][0]
+
+
+@antes_de_confirmar
+def _registrar_versoes(session, prestacao_ids):
+    """Incrementa as versões das tabelas e prestações alteradas na transação."""
+    chaves = tabelas_alteradas(session)
+    if prestacao_ids:
+        chaves.add(CHAVE_PRESTACOES)
+        chaves.update(chave_prestacao(prestacao_id) for prestacao_id in prestacao_ids)
+    if chaves:
+        incrementar_versoes(session.connection(), chaves)
@@ -0,0 +1,90 @@
+"""Sincronização entre Servidor.cargo (nome) e Servidor.cargo_id.
+
+O cargo_id é a referência usada nos cálculos; o nome continua sendo aceito
+na criação de servidores e exibido na API. Os eventos da sessão abaixo
+mantêm os dois em acordo quando os objetos passam pelo ORM:
+
+- servidor novo ou com o nome do cargo alterado recebe o cargo_id do cargo
+  com esse nome (ou nulo, se não houver);
+- servidor com cargo_id (ou cargo_associado) alterado recebe o nome do cargo;
+- cargo criado, ou renomeado para um nome já usado por servidores sem
+  cargo_id, passa a ser o cargo desses servidores;
+- cargo renomeado tem o novo nome copiado para os seus servidores.
+
+As cargas em lote (bulk_*_mappings) não disparam esses eventos e usam as
+funções públicas deste módulo diretamente.
+"""
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+
+from src.models.prestacao_contas import Servidor, Cargo
+
+
+def ids_cargos_por_nome(conexao, nomes):
+    """Retorna {nome_cargo: id} dos cargos com os nomes informados."""
+    nomes = set(nomes)
+    if not nomes:
+        return {}
+    return dict(conexao.execute(select(Cargo.nome_cargo, Cargo.id).where(Cargo.nome_cargo.in_(nomes))).all())
+
+
+def vincular_servidores(conexao, nomes):
+    """Associa aos cargos com os nomes informados os servidores ainda sem cargo_id."""
+    if not nomes:
+        return
+    conexao.execute(
+        update(Servidor)
+        .where(Servidor.cargo_id.is_(None), Servidor.cargo.in_(set(nomes)))
+        .values(cargo_id=select(Cargo.id).where(Cargo.nome_cargo == Servidor.cargo).scalar_subquery())
+    )
+
+
+def renomear_servidores(conexao, cargo_id, nome_cargo):
+    """Copia o nome atual do cargo para os servidores associados a ele."""
+    conexao.execute(
+        update(Servidor).where(Servidor.cargo_id == cargo_id, Servidor.cargo != nome_cargo).values(cargo=nome_cargo)
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _sincronizar_servidores(session, flush_context, instances):
+    """Ajusta cargo_id ou o nome do cargo dos servidores novos e alterados."""
+    por_nome = []
+    for servidor in list(session.new) + list(session.dirty):
+        if not isinstance(servidor, Servidor):
+            continue
+        estado = inspect(servidor)
+        if estado.attrs.cargo_associado.history.added and servidor.cargo_associado is not None:
+            servidor.cargo = servidor.cargo_associado.nome_cargo
+        elif estado.attrs.cargo_id.history.added and servidor.cargo_id is not None:
+            with session.no_autoflush:
+                cargo = session.get(Cargo, servidor.cargo_id)
+            if cargo is not None:
+                servidor.cargo = cargo.nome_cargo
+        elif estado.attrs.cargo.history.added or (estado.pending and servidor.cargo_id is None):
+            por_nome.append(servidor)
+
+    if por_nome:
+        with session.no_autoflush:
+            ids = ids_cargos_por_nome(session.connection(), {servidor.cargo for servidor in por_nome})
+        for servidor in por_nome:
+            servidor.cargo_id = ids.get(servidor.cargo)
+
+
+@event.listens_for(Session, "after_flush")
+def _sincronizar_cargos(session, flush_context):
+    """Propaga para os servidores os cargos criados e renomeados no flush."""
+    conexao = None
+    nomes = set()
+    for cargo in list(session.new) + list(session.dirty):
+        if not isinstance(cargo, Cargo):
+            continue
+        estado = inspect(cargo)
+        if not estado.attrs.nome_cargo.history.added:
+            continue
+        conexao = conexao or session.connection()
+        if cargo in session.dirty:
+            renomear_servidores(conexao, cargo.id, cargo.nome_cargo)
+        nomes.add(cargo.nome_cargo)
+    if nomes:
+        vincular_servidores(conexao, nomes)
@@ -0,0 +1,88 @@
+"""Fixtures dos testes do backend (executar em backend/: python -m pytest).
+
+A aplicação de src/main.py é importada uma única vez, sobre um banco SQLite
+em memória criado pelas migrações; cada teste começa com as tabelas vazias e
+os caches limpos.
+"""
+from datetime import date
+import os
+
+# Configuração lida por src/main.py na importação.
+os.environ.update({
+    "SQLALCHEMY_DATABASE_URI": "sqlite://",
+    "MIGRACOES_AUTOMATICAS": "1",
+    "PDF_CACHE_DIR": "",
+    "PDF_RENDER_WORKERS": "0",
+    "INSTRUMENTACAO": "0",
+    "CONSULTAS_LENTAS_MS": "0",
+    "CONSULTAS_REPETIDAS_LIMITE": "0",
+})
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from src.main import app as aplicacao
+from src.extensions import db
+from src.models.prestacao_contas import (
+    Servidor, Cargo, Presidente, PrestacaoContas,
+    Adiantamento, DespesaDiaria, DocumentoComprovacao, DespesaPassagem
+)
+from src.services.dados_referencia import cache_referencia
+from src.services.relatorios import cache_relatorios
+from src.services.migracoes import tabela_versao
+
+aplicacao.config["TESTING"] = True
+
+
+@pytest.fixture
+def app():
+    with aplicacao.app_context():
+        yield aplicacao
+        db.session.remove()
+        # Esvazia as tabelas (menos o registro das migrações) para o próximo teste.
+        with db.engine.begin() as conexao:
+            for tabela in reversed(db.metadata.sorted_tables):
+                if tabela.name != tabela_versao.name:
+                    conexao.execute(tabela.delete())
+    cache_referencia.limpar()
+    cache_relatorios.limpar()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def cabecalhos(app):
+    return {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+
+
+@pytest.fixture
+def prestacao(app):
+    """Prestação com adiantamentos, despesa de diária, vários documentos e passagens; retorna o ID."""
+    cargo = Cargo(nome_cargo="Assessor", valor_diaria_dentro_estado=200.0, valor_diaria_fora_estado=350.0)
+    servidor = Servidor(nome="Maria Souza", cargo_associado=cargo)
+    presidente = Presidente(nome="João Lima")
+    prestacao = PrestacaoContas(servidor=servidor, presidente=presidente)
+    db.session.add_all([cargo, servidor, presidente, prestacao])
+    db.session.flush()
+    db.session.add_all([
+        Adiantamento(prestacao_id=prestacao.id, tipo="diaria", numero_adiantamento="10/2025",
+                     numero_empenho="20/2025", valor=800.0, data_adiantamento=date(2025, 3, 1)),
+        Adiantamento(prestacao_id=prestacao.id, tipo="passagem", numero_adiantamento="11/2025",
+                     numero_empenho="21/2025", valor=400.0, data_adiantamento=date(2025, 3, 1)),
+        DespesaDiaria(prestacao_id=prestacao.id, diarias_dentro_estado=2, refeicoes_dentro_estado=1,
+                      diarias_fora_estado=1, refeicoes_fora_estado=0),
+    ])
+    db.session.add_all(
+        DocumentoComprovacao(prestacao_id=prestacao.id, tipo_documento="nota_fiscal", descricao=f"Hotel {i}",
+                             data_documento=date(2025, 3, 2), valor=100.0 + i)
+        for i in range(3)
+    )
+    db.session.add_all(
+        DespesaPassagem(prestacao_id=prestacao.id, bpe=f"BPE{i}", valor=90.0, tipo_viagem=("ida", "volta")[i % 2])
+        for i in range(4)
+    )
+    db.session.commit()
+    return prestacao.id
@@ -0,0 +1,61 @@
+"""CacheLeitura com o diretório compartilhado entre processos (<PREFIXO>_DIR)."""
+import os
+
+from flask import Flask
+import pytest
+
+from src.services.cache_leitura import CacheLeitura
+
+
+def criar_cache(diretorio, ttl=10, max_entradas=3):
+    """Cria um cache como o de outro worker: memória própria, mesmo diretório."""
+    app = Flask(__name__)
+    app.config.update(TESTE_TTL=ttl, TESTE_MAX_ENTRADAS=max_entradas, TESTE_DIR=str(diretorio))
+    return CacheLeitura("TESTE", ttl_padrao=ttl, app=app)
+
+
+def arquivos(diretorio):
+    return sorted(nome for _, _, nomes in os.walk(diretorio) for nome in nomes if nome.endswith(".json"))
+
+
+def test_valor_compartilhado_pelo_disco(tmp_path):
+    primeiro, segundo = criar_cache(tmp_path), criar_cache(tmp_path)
+
+    assert primeiro.obter_ou_calcular("a", lambda: {"total": 1}, agora=0) == {"total": 1}
+    assert segundo.obter_ou_calcular("a", pytest.fail, agora=5) == {"total": 1}
+    assert segundo.estatisticas()["grupos"]["geral"]["acertos_disco"] == 1
+
+    primeiro.invalidar("geral")
+    assert segundo.obter_ou_calcular("a", lambda: {"total": 2}, agora=6) == {"total": 2}
+
+
+def test_arquivo_vencido_removido_na_leitura(tmp_path):
+    criar_cache(tmp_path).obter_ou_calcular("a", lambda: 1, agora=0)
+    assert len(arquivos(tmp_path)) == 1
+
+    def falhar():
+        raise RuntimeError("falha no cálculo")
+
+    with pytest.raises(RuntimeError):
+        criar_cache(tmp_path).obter_ou_calcular("a", falhar, agora=10)
+    assert arquivos(tmp_path) == []
+
+
+def test_disco_limitado_por_grupo(tmp_path):
+    cache = criar_cache(tmp_path, max_entradas=3)
+
+    # Chaves com a versão dos dados: cada alteração cria uma entrada nova.
+    for versao in range(3):
+        cache.obter_ou_calcular(("v", versao), lambda: versao, agora=versao)
+    assert len(arquivos(tmp_path)) == 3
+
+    # As duas primeiras já venceram (validade 10) e são removidas juntas.
+    cache.obter_ou_calcular(("v", 3), lambda: 3, agora=11)
+    assert len(arquivos(tmp_path)) == 2
+
+    # Sem vencidas, saem as que vencem primeiro.
+    for versao in range(4, 8):
+        cache.obter_ou_calcular(("v", versao), lambda: versao, agora=versao + 8)
+        assert len(arquivos(tmp_path)) == 3
+    outro = criar_cache(tmp_path)
+    assert [outro.obter_ou_calcular(("v", versao), lambda: None, agora=16) for versao in (5, 6, 7)] == [5, 6, 7]
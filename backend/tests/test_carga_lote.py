@@ -0,0 +1,68 @@
+"""Cargas em lote de servidores, cargos e presidentes (POST /api/<cadastro>/lote)."""
+import json
+
+from src.extensions import db
+from src.models.prestacao_contas import Cargo, Servidor
+from src.services.carga_lote import carregar_presidentes
+
+
+def test_servidores_com_id_invalido(client, cabecalhos, prestacao):
+    servidor = db.session.query(Servidor).one()
+    resposta = client.post("/api/servidores/lote", headers=cabecalhos, json=[
+        {"id": [1], "nome": "Lista"},
+        {"id": True, "nome": "Booleano"},
+        {"id": "1", "nome": "Texto"},
+        {"id": servidor.id + 100, "nome": "Inexistente"},
+        {"id": servidor.id, "nome": "Maria Souza Lima"},
+        {"nome": "Carlos Dias", "cargo": "Assessor"},
+    ])
+
+    assert resposta.status_code == 200
+    resumo = resposta.get_json()
+    assert (resumo["total"], resumo["criados"], resumo["atualizados"], resumo["erros"]) == (6, 1, 1, 4)
+    assert [r["status"] for r in resumo["resultados"]] == ["erro"] * 4 + ["atualizado", "criado"]
+    assert resumo["resultados"][1]["erro"] == "id deve ser um número inteiro"
+    db.session.expire_all()
+    assert db.session.get(Servidor, servidor.id).nome == "Maria Souza Lima"
+    assert db.session.query(Servidor).filter_by(nome="Carlos Dias").one().cargo_id == servidor.cargo_id
+
+
+def test_cargos_upsert_pelo_nome(client, cabecalhos, prestacao):
+    resposta = client.post("/api/cargos/lote", headers=cabecalhos, json=[
+        {"nome_cargo": ["Assessor"], "valor_diaria_dentro_estado": 1, "valor_diaria_fora_estado": 1},
+        {"nome_cargo": {"x": 1}},
+        {"nome_cargo": "Assessor", "valor_diaria_dentro_estado": 220.0},
+        {"nome_cargo": "Diretor", "valor_diaria_dentro_estado": 300.0, "valor_diaria_fora_estado": 500.0},
+        {"nome_cargo": "Diretor", "valor_diaria_fora_estado": 550.0},
+        "texto",
+    ])
+
+    resultados = resposta.get_json()["resultados"]
+    assert [r["status"] for r in resultados] == ["erro", "erro", "atualizado", "criado", "atualizado", "erro"]
+    assert resultados[0]["erro"] == "nome_cargo deve ser um texto não vazio"
+    valores = {c.nome_cargo: (c.valor_diaria_dentro_estado, c.valor_diaria_fora_estado) for c in db.session.query(Cargo)}
+    assert valores == {"Assessor": (220.0, 350.0), "Diretor": (300.0, 550.0)}
+
+
+def test_presidentes_em_ndjson(client, cabecalhos, app):
+    corpo = "\n".join([json.dumps({"nome": "Ana"}), "{inválido", "", json.dumps({"nome": ""})])
+    resposta = client.post("/api/presidentes/lote", headers={**cabecalhos, "Content-Type": "application/x-ndjson"},
+                           data=corpo)
+
+    resultados = resposta.get_json()["resultados"]
+    assert [(r["linha"], r["status"]) for r in resultados] == [(1, "criado"), (2, "erro"), (4, "erro")]
+    assert resultados[0]["id"] is not None
+
+
+def test_carga_em_varios_blocos(app):
+    resumo = carregar_presidentes(enumerate([{"nome": f"P{i}"} for i in range(5)] + [{"id": [2]}], start=1),
+                                  tamanho_lote=2)
+
+    assert (resumo["total"], resumo["criados"], resumo["erros"]) == (6, 5, 1)
+    assert [r["linha"] for r in resumo["resultados"]] == list(range(1, 7))
+
+
+def test_corpo_que_nao_e_lista(client, cabecalhos, app):
+    resposta = client.post("/api/servidores/lote", headers=cabecalhos, json={"nome": "x"})
+
+    assert resposta.status_code == 400
@@ -0,0 +1,34 @@
+from sqlalchemy import update
+
+from src.extensions import db
+from src.models.prestacao_contas import Cargo
+from src.services.versoes import incrementar_versoes
+
+
+def test_relatorio_em_cache_acompanha_alteracao(client, cabecalhos, prestacao):
+    primeira = client.get("/api/relatorios/gastos?agrupar_por=ano", headers=cabecalhos)
+    assert primeira.status_code == 200
+    assert primeira.get_json()["grupos"][0]["total_diarias"] == 750.0
+
+    client.put(f"/api/prestacoes/{prestacao}/despesas-diarias", headers=cabecalhos,
+               json={"diarias_dentro_estado": 4})
+    segunda = client.get("/api/relatorios/gastos?agrupar_por=ano", headers=cabecalhos)
+    assert segunda.headers["ETag"] != primeira.headers["ETag"]
+    assert segunda.get_json()["grupos"][0]["total_diarias"] == 800.0
+
+    # Com o ETag antigo o cliente recebe o relatório atualizado, não 304.
+    revalidada = client.get("/api/relatorios/gastos?agrupar_por=ano",
+                            headers={**cabecalhos, "If-None-Match": primeira.headers["ETag"]})
+    assert revalidada.status_code == 200
+    assert revalidada.get_json() == segunda.get_json()
+
+
+def test_cargos_alterados_por_outro_processo(client, cabecalhos, prestacao):
+    assert client.get("/api/cargos", headers=cabecalhos).get_json()[0]["nome_cargo"] == "Assessor"
+
+    # Alteração gravada por outro worker: a versão muda, mas o cache deste processo não é invalidado.
+    with db.engine.begin() as conexao:
+        conexao.execute(update(Cargo).values(nome_cargo="Assessor Especial"))
+        incrementar_versoes(conexao, ["cargos"])
+
+    assert client.get("/api/cargos", headers=cabecalhos).get_json()[0]["nome_cargo"] == "Assessor Especial"
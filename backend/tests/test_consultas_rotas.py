@@ -0,0 +1,53 @@
+"""Número de consultas SQL das rotas que carregam a prestação com todos os filhos."""
+from datetime import date
+
+import pytest
+
+from src.extensions import db
+from src.models.prestacao_contas import DocumentoComprovacao, DespesaPassagem
+
+ORCAMENTO = {
+    "GET /api/prestacoes/<int:prestacao_id>/calcular-totais": 2,
+    "GET /api/prestacoes/<int:prestacao_id>/pdf/<string:tipo>": 5,
+    "POST /api/prestacoes/pdf/lote": 5,
+}
+
+
+def adicionar_filhos(prestacao_id, quantidade):
+    db.session.add_all(
+        DocumentoComprovacao(prestacao_id=prestacao_id, tipo_documento="recibo", descricao=f"Extra {i}",
+                             data_documento=date(2025, 3, 3), valor=10.0)
+        for i in range(quantidade)
+    )
+    db.session.add_all(
+        DespesaPassagem(prestacao_id=prestacao_id, bpe=f"EXTRA{i}", valor=50.0, tipo_viagem="ida")
+        for i in range(quantidade)
+    )
+    db.session.commit()
+
+
+def requisitar_todas(client, cabecalhos, prestacao_id):
+    respostas = [client.get(f"/api/prestacoes/{prestacao_id}/calcular-totais", headers=cabecalhos)]
+    respostas += [
+        client.get(f"/api/prestacoes/{prestacao_id}/pdf/{tipo}", headers=cabecalhos)
+        for tipo in ("diaria", "passagem", "parecer")
+    ]
+    respostas.append(client.post("/api/prestacoes/pdf/lote", headers=cabecalhos,
+                                 json={"prestacao_ids": [prestacao_id]}))
+    assert [r.status_code for r in respostas] == [200] * 5
+
+
+@pytest.mark.orcamento_consultas(ORCAMENTO)
+def test_orcamento_com_varios_filhos(client, cabecalhos, prestacao):
+    requisitar_todas(client, cabecalhos, prestacao)
+
+
+def test_consultas_nao_crescem_com_os_filhos(client, cabecalhos, prestacao, consultas_requisicoes):
+    requisitar_todas(client, cabecalhos, prestacao)
+    antes = [r.total for r in consultas_requisicoes]
+    consultas_requisicoes.clear()
+
+    adicionar_filhos(prestacao, 30)
+    requisitar_todas(client, cabecalhos, prestacao)
+
+    assert [r.total for r in consultas_requisicoes] == antes
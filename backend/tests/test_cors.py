@@ -0,0 +1,7 @@
+def test_preflight_do_patch_em_lote(client):
+    resposta = client.options("/api/prestacoes/1/batch", headers={
+        "Origin": "http://localhost:5173",
+        "Access-Control-Request-Method": "PATCH",
+        "Access-Control-Request-Headers": "Content-Type, Authorization",
+    })
+    assert "PATCH" in resposta.headers["Access-Control-Allow-Methods"]
@@ -0,0 +1,49 @@
+from sqlalchemy import select
+
+from src.extensions import db
+from src.models.prestacao_contas import DespesaPassagem, DocumentoComprovacao, PrestacaoContas, Servidor
+from src.services.dados_sinteticos import Distribuicoes, gerar_dados
+
+
+def _linhas(modelo):
+    return [tuple(linha) for linha in db.session.execute(select(modelo.__table__).order_by(modelo.id))]
+
+
+def test_mesma_semente_gera_os_mesmos_dados(app):
+    with db.engine.begin() as conexao:
+        gerar_dados(conexao, 20, 150, semente=3, tamanho_bloco=40)
+    primeira = [_linhas(modelo) for modelo in (Servidor, PrestacaoContas, DocumentoComprovacao, DespesaPassagem)]
+    with db.engine.begin() as conexao:
+        for tabela in reversed(db.metadata.sorted_tables):
+            if tabela.name in ("prestacao_totais", "despesas_passagens", "documentos_comprovacao", "despesas_diarias",
+                               "adiantamentos", "prestacoes_contas", "servidores"):
+                conexao.execute(tabela.delete())
+
+    # Outro tamanho de bloco não muda os registros gerados.
+    with db.engine.begin() as conexao:
+        gerar_dados(conexao, 20, 150, semente=3, tamanho_bloco=150)
+    segunda = [_linhas(modelo) for modelo in (Servidor, PrestacaoContas, DocumentoComprovacao, DespesaPassagem)]
+    assert primeira == segunda
+
+
+def test_distribuicoes_ajustaveis(app):
+    distribuicoes = Distribuicoes(adiantamento_passagem=1, viagens_media=0, documentos_media=0)
+    with db.engine.begin() as conexao:
+        contagem = gerar_dados(conexao, 5, 50, distribuicoes=distribuicoes)
+    assert contagem.prestacoes == 50
+    assert contagem.documentos == contagem.passagens == 0
+
+
+def test_carga_altera_os_etags(client, cabecalhos):
+    with db.engine.begin() as conexao:
+        gerar_dados(conexao, 5, 10)
+    antes = client.get("/api/servidores", headers=cabecalhos)
+    lista_antes = client.get("/api/prestacoes", headers=cabecalhos)
+
+    with db.engine.begin() as conexao:
+        gerar_dados(conexao, 5, 10, semente=2)
+    depois = client.get("/api/servidores", headers={**cabecalhos, "If-None-Match": antes.headers["ETag"]})
+    assert depois.status_code == 200
+    assert len(depois.get_json()) == 10
+    lista_depois = client.get("/api/prestacoes", headers={**cabecalhos, "If-None-Match": lista_antes.headers["ETag"]})
+    assert lista_depois.status_code == 200
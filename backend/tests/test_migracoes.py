@@ -0,0 +1,48 @@
+"""Aplicação das migrações por mais de um processo no mesmo banco SQLite."""
+import threading
+
+import sqlalchemy as sa
+
+from src.services.migracoes import _bloqueio, migrar, versao_atual, versao_mais_recente
+
+
+def test_migrar_aguarda_o_bloqueio_do_sqlite(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    aplicadas = []
+    outro_processo = threading.Thread(target=lambda: aplicadas.extend(migrar(engine)))
+
+    with _bloqueio(engine):
+        outro_processo.start()
+        outro_processo.join(0.3)
+        assert outro_processo.is_alive()
+        assert not sa.inspect(engine).has_table("schema_versao")
+    outro_processo.join(10)
+
+    assert [m.versao for m in aplicadas] == list(range(1, versao_mais_recente() + 1))
+    assert (tmp_path / "app.db.migracao.lock").exists()
+    with engine.connect() as conexao:
+        assert versao_atual(conexao) == versao_mais_recente()
+    # Quem obtém o bloqueio depois encontra o esquema atualizado.
+    assert migrar(engine) == []
+    engine.dispose()
+
+
+def test_migracoes_simultaneas_no_sqlite(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    aplicadas, erros = [], []
+
+    def _migrar():
+        try:
+            aplicadas.extend(migrar(engine))
+        except Exception as e:
+            erros.append(e)
+
+    workers = [threading.Thread(target=_migrar) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(10)
+
+    assert erros == []
+    assert sorted(m.versao for m in aplicadas) == list(range(1, versao_mais_recente() + 1))
+    engine.dispose()
@@ -0,0 +1,65 @@
+"""ZIP de PDFs em lote (POST /api/prestacoes/pdf/lote)."""
+from concurrent.futures import Future
+import io
+import zipfile
+
+from src.services import pdf_renderer
+from src.services.pdf_renderer import TempoRenderizacaoEsgotado, renderizador_pdf
+
+
+def test_falha_de_um_pdf_vai_para_erros_txt(client, cabecalhos, prestacao, monkeypatch):
+    renderizar = pdf_renderer._renderizar
+
+    def _renderizar(tipo, prestacao_data):
+        if tipo == "parecer":
+            raise ValueError("dados incompletos")
+        return renderizar(tipo, prestacao_data)
+
+    monkeypatch.setattr(pdf_renderer, "_renderizar", _renderizar)
+    resposta = client.post("/api/prestacoes/pdf/lote", headers=cabecalhos, json={"prestacao_ids": [prestacao]})
+
+    assert resposta.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(resposta.data)) as arquivo_zip:
+        assert arquivo_zip.testzip() is None
+        nomes = arquivo_zip.namelist()
+        erros = arquivo_zip.read("erros.txt").decode("utf-8")
+    assert nomes == [
+        f"{prestacao}/prestacao_contas_diaria_Maria_Souza.pdf",
+        f"{prestacao}/prestacao_contas_passagem_Maria_Souza.pdf",
+        "erros.txt",
+    ]
+    assert erros == f"{prestacao}/parecer_tecnico_Maria_Souza.pdf: falha na geração do PDF (dados incompletos)\n"
+
+
+def test_tempo_esgotado_e_desconexao(client, cabecalhos, prestacao, monkeypatch):
+    futuros = []
+
+    def submeter(tipo, prestacao_data, bloquear=False):
+        futuros.append(Future())
+        return futuros[-1]
+
+    def aguardar(futuro, timeout=None):
+        if futuro is futuros[0]:
+            raise TempoRenderizacaoEsgotado("Tempo limite excedido na geração do PDF")
+        return io.BytesIO(b"%PDF")
+
+    # Três PDFs em paralelo: o primeiro é gravado quando o terceiro é agendado.
+    monkeypatch.setattr(renderizador_pdf, "workers", 3)
+    monkeypatch.setattr(renderizador_pdf, "submeter", submeter)
+    monkeypatch.setattr(renderizador_pdf, "aguardar", aguardar)
+    completa = client.post("/api/prestacoes/pdf/lote", headers=cabecalhos, json={"prestacao_ids": [prestacao]})
+    with zipfile.ZipFile(io.BytesIO(completa.data)) as arquivo_zip:
+        assert arquivo_zip.read("erros.txt").decode("utf-8") == (
+            f"{prestacao}/prestacao_contas_diaria_Maria_Souza.pdf: tempo limite excedido na geração do PDF\n"
+        )
+        assert len(arquivo_zip.namelist()) == 3
+
+    futuros.clear()
+    resposta = client.post("/api/prestacoes/pdf/lote", headers=cabecalhos,
+                           json={"prestacao_ids": [prestacao]}, buffered=False)
+
+    next(iter(resposta.response))
+    resposta.close()
+
+    assert len(futuros) == 3
+    assert [futuro.cancelled() for futuro in futuros] == [False, True, True]
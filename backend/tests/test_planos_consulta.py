@@ -0,0 +1,12 @@
+"""As consultas das rotas não podem ler por inteiro as tabelas volumosas."""
+from src.services.planos_consulta import cenarios, criar_dados_exemplo, verificar_planos
+
+
+def test_rotas_sem_varreduras_completas(app):
+    criar_dados_exemplo()
+
+    resultados = list(verificar_planos(incluir_escritas=True))
+
+    assert len(resultados) == len(cenarios(incluir_escritas=True))
+    assert [(r.nome, r.status) for r in resultados if r.status >= 400] == []
+    assert [(r.nome, detalhe, sql) for r in resultados for detalhe, sql in r.varreduras] == []
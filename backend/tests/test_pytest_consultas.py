@@ -0,0 +1,124 @@
+"""Testes do plugin src/pytest_consultas.py (marcador orcamento_consultas)."""
+from collections import Counter
+
+import pytest
+
+from src.pytest_consultas import limite_da_requisicao, requisicoes_excedentes
+from src.services.diagnostico_consultas import ResumoRequisicao
+
+# Aplicação mínima usada pelos testes gerados com pytester: GET /itens/<n> executa n consultas.
+APLICACAO = '''
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+engine = create_engine("sqlite://")
+app = Flask(__name__)
+
+
+@app.route("/itens/<int:n>", methods=["GET", "POST"])
+def itens(n):
+    with engine.connect() as conexao:
+        for _ in range(n):
+            conexao.execute(text("SELECT 1"))
+    return {"n": n}
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+'''
+
+
+def resumo(metodo, rota, total):
+    return ResumoRequisicao(metodo=metodo, rota=rota, status=200, total=total,
+                            repeticoes=Counter({"SELECT 1": total}))
+
+
+def test_limite_numero_vale_para_todas_as_requisicoes():
+    assert limite_da_requisicao(3, resumo("GET", "/api/servidores", 10)) == 3
+    assert limite_da_requisicao(3, resumo("POST", "/api/cargos", 10)) == 3
+
+
+def test_limite_dicionario_por_metodo_e_rota():
+    orcamento = {"GET /api/servidores": 2, "/api/servidores": 5, "/api/cargos": 4}
+
+    assert limite_da_requisicao(orcamento, resumo("GET", "/api/servidores", 0)) == 2
+    assert limite_da_requisicao(orcamento, resumo("POST", "/api/servidores", 0)) == 5
+    assert limite_da_requisicao(orcamento, resumo("DELETE", "/api/cargos", 0)) == 4
+    assert limite_da_requisicao(orcamento, resumo("GET", "/api/presidentes", 0)) is None
+
+
+def test_requisicoes_excedentes():
+    resumos = [resumo("GET", "/api/servidores", 3), resumo("GET", "/api/cargos", 9), resumo("GET", "/api/presidentes", 2)]
+
+    mensagens = requisicoes_excedentes({"/api/servidores": 3, "/api/presidentes": 1}, resumos)
+
+    assert mensagens == ["GET /api/presidentes: 2 consultas (máximo 1); mais repetida (2x): SELECT 1"]
+
+
+@pytest.fixture
+def rodar(pytester):
+    """Executa um módulo de testes com a aplicação mínima e o plugin ativado."""
+    def _rodar(testes):
+        pytester.makeconftest(APLICACAO)
+        pytester.makepyfile(testes)
+        return pytester.runpytest("-p", "src.pytest_consultas")
+    return _rodar
+
+
+def test_marcador_numero(rodar):
+    resultado = rodar('''
+        import pytest
+
+        @pytest.mark.orcamento_consultas(2)
+        def test_dentro(client):
+            client.get("/itens/2")
+
+        @pytest.mark.orcamento_consultas(2)
+        def test_acima(client):
+            client.get("/itens/1")
+            client.get("/itens/3")
+
+        def test_sem_marcador(client):
+            client.get("/itens/10")
+    ''')
+
+    resultado.assert_outcomes(passed=2, failed=1)
+    resultado.stdout.fnmatch_lines([
+        "*test_acima*",
+        "*Orçamento de consultas excedido:",
+        "GET /itens/<int:n>: 3 consultas (máximo 2); mais repetida (3x): SELECT 1",
+    ])
+
+
+def test_marcador_dicionario(rodar):
+    resultado = rodar('''
+        import pytest
+
+        @pytest.mark.orcamento_consultas({"GET /itens/<int:n>": 1, "/itens/<int:n>": 3})
+        def test_metodo_tem_prioridade(client):
+            client.post("/itens/3")
+            client.get("/itens/2")
+    ''')
+
+    resultado.assert_outcomes(failed=1)
+    resultado.stdout.fnmatch_lines(["GET /itens/<int:n>: 2 consultas (máximo 1)*"])
+    resultado.stdout.no_fnmatch_line("POST /itens/<int:n>:*")
+
+
+def test_marcador_com_argumento_invalido(rodar):
+    resultado = rodar('''
+        import pytest
+
+        @pytest.mark.orcamento_consultas("3")
+        def test_argumento_texto(client):
+            pass
+
+        @pytest.mark.orcamento_consultas(1, 2)
+        def test_dois_argumentos(client):
+            pass
+    ''')
+
+    resultado.assert_outcomes(failed=2)
+    resultado.stdout.fnmatch_lines(["*UsageError: orcamento_consultas espera um número ou um dicionário*"])
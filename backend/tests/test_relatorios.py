@@ -0,0 +1,43 @@
+"""Relatório de gastos agrupados (GET /api/relatorios/gastos)."""
+from sqlalchemy import delete
+
+from src.extensions import db
+from src.models.prestacao_contas import DespesaDiaria, DespesaPassagem, PrestacaoContas, PrestacaoTotais
+from src.services.relatorios import cache_relatorios
+
+
+def test_totais_do_relatorio_conferem_com_os_da_prestacao(client, cabecalhos, prestacao):
+    totais = client.get(f"/api/prestacoes/{prestacao}/calcular-totais", headers=cabecalhos).get_json()
+    grupo, = client.get("/api/relatorios/gastos?agrupar_por=servidor", headers=cabecalhos).get_json()["grupos"]
+
+    assert grupo["total_diarias"] + grupo["total_refeicoes"] == totais["total_geral"]
+    assert grupo["total_passagens"] == 360.0
+    assert grupo["total_com_passagens"] == totais["total_geral"] + 360.0
+    assert "total_geral" not in grupo
+
+
+def test_prestacoes_sem_totais_materializados(client, cabecalhos, prestacao):
+    # Segunda prestação do mesmo servidor, com despesa e passagem próprias.
+    original = db.session.get(PrestacaoContas, prestacao)
+    outra = PrestacaoContas(servidor_id=original.servidor_id, presidente_id=original.presidente_id,
+                            data_criacao=original.data_criacao)
+    db.session.add(outra)
+    db.session.flush()
+    db.session.add_all([
+        DespesaDiaria(prestacao_id=outra.id, diarias_dentro_estado=1, refeicoes_dentro_estado=0,
+                      diarias_fora_estado=0, refeicoes_fora_estado=0),
+        DespesaPassagem(prestacao_id=outra.id, bpe="BPE9", valor=25.5, tipo_viagem="ida"),
+    ])
+    db.session.commit()
+    url = "/api/relatorios/gastos?agrupar_por=servidor,mes"
+    materializado = client.get(url, headers=cabecalhos).get_json()["grupos"]
+
+    # Banco atualizado sem reconstruir-totais: uma ou nenhuma prestação com a linha materializada.
+    for removidas in ([outra.id], [prestacao, outra.id]):
+        with db.engine.begin() as conexao:
+            conexao.execute(delete(PrestacaoTotais).where(PrestacaoTotais.prestacao_id.in_(removidas)))
+        cache_relatorios.limpar()
+        assert client.get(url, headers=cabecalhos).get_json()["grupos"] == materializado
+
+    assert materializado[0]["quantidade_prestacoes"] == 2
+    assert materializado[0]["total_passagens"] == 385.5
@@ -37,14 +37,10 @@ function TelaAdiantamentos({ prestacaoId }) {
 
   const carregarDados = async () => {
     try {
-      // Carregar dados da prestação
-      const prestacaoRes = await fetch(`/api/prestacoes/${prestacaoId}`)
-      const prestacaoData = await prestacaoRes.json()
+      // Carregar dados da prestação com os adiantamentos existentes
+      const prestacaoRes = await fetch(`/api/prestacoes/${prestacaoId}/full?include=adiantamentos`)
+      const { adiantamentos, ...prestacaoData } = await prestacaoRes.json()
       setPrestacao(prestacaoData)
-
-      // Carregar adiantamentos existentes
-      const adiantamentosRes = await fetch(`/api/prestacoes/${prestacaoId}/adiantamentos`)
-      const adiantamentos = await adiantamentosRes.json()
       
       const diaria = adiantamentos.find(a => a.tipo === 'diaria')
       const passagem = adiantamentos.find(a => a.tipo === 'passagem')
@@ -28,15 +28,13 @@ function TelaPassagens({ prestacaoId }) {
 
   const carregarDados = async () => {
     try {
-      // Carregar passagens existentes
-      const passagensRes = await fetch(`/api/prestacoes/${prestacaoId}/despesas-passagens`)
-      const passagensData = await passagensRes.json()
-      setPassagens(passagensData)
+      // Carregar passagens existentes e adiantamentos em uma única requisição
+      const response = await fetch(`/api/prestacoes/${prestacaoId}/full?include=despesas_passagens,adiantamentos`)
+      const dados = await response.json()
+      setPassagens(dados.despesas_passagens)
 
-      // Carregar adiantamento de passagem
-      const adiantamentosRes = await fetch(`/api/prestacoes/${prestacaoId}/adiantamentos`)
-      const adiantamentos = await adiantamentosRes.json()
-      const passagem = adiantamentos.find(a => a.tipo === 'passagem')
+      // Adiantamento de passagem
+      const passagem = dados.adiantamentos.find(a => a.tipo === 'passagem')
       setAdiantamentoPassagem(passagem)
     } catch (error) {
       console.error('Erro ao carregar dados:', error)